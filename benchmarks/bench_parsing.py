@@ -0,0 +1,120 @@
+"""逐单元格 clean_money / clean_date vs 向量化 parse_* 的基准对比。
+
+用法 (仓库根目录)::
+
+    python -m benchmarks.bench_parsing                 # 10k / 100k / 1M，低基数与高基数两种取值池
+    python -m benchmarks.bench_parsing --sizes 10000 --json
+
+低基数 (``MONEY_POOL`` 的 14 种字符串) 是去重解析的最好情况；真实数据 1723 行中 Total 有 779 种取值，
+高基数池 (随机整数金额、一位小数的 万 值、千分位与区间，另混入少量占位符) 的去重比例不低于此，两者都报告。
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from mconly.parsing import clean_money, clean_date, parse_money, parse_years, parse_dates
+
+MONEY_POOL = ['7.7万', '13.3万', '15万', '135434', '9019.5', '1万', '不适用', 'hidden', '--', '-', '0', '1,250', '5万-10万', '8-12万']
+YOE_POOL = ['0年', '3年', '7年', '12年', '5-10年', '11+年', np.nan]
+PLACEHOLDERS = ['不适用', 'hidden', '--', '-']
+CARDINALITIES = ('low', 'high')
+
+
+def _high_money(rng, n):
+    usd = rng.lognormal(np.log(150_000), 0.6, n).round(-2).astype(np.int64)
+    wan = pd.Series(rng.lognormal(np.log(60), 0.6, n).round(1)).astype(str) + '万'
+    lo = rng.integers(1, 60, n)
+    kind = rng.random(n)
+    out = np.where(kind < 0.45, pd.Series(usd).astype(str), wan)
+    out = np.where((kind >= 0.8) & (kind < 0.88), pd.Series(usd).map('{:,}'.format), out)
+    out = np.where((kind >= 0.88) & (kind < 0.94), pd.Series(lo).astype(str) + '万-' + pd.Series(lo + rng.integers(1, 20, n)).astype(str) + '万', out)
+    return np.where(kind >= 0.94, rng.choice(np.array(PLACEHOLDERS + ['0'], dtype=object), n), out).astype(object)
+
+
+def _high_years(rng, n):
+    years = pd.Series(rng.integers(0, 31, n)).astype(str)
+    out = np.where(rng.random(n) < 0.15, years + '-' + pd.Series(rng.integers(31, 41, n)).astype(str), years) + '年'
+    return np.where(rng.random(n) < 0.05, np.nan, out).astype(object)
+
+
+def synth_frame(n, seed=0, cardinality='low'):
+    """n 行原始字符串；``cardinality='high'`` 时金额 / 年限大多互不相同。"""
+    rng = np.random.default_rng(seed)
+    capture = pd.Timestamp('2026-01-27 23:26:24') + pd.to_timedelta(rng.integers(0, 86400 * 30, n), unit='s')
+    abs_dates = (pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 700, n), unit='D')).strftime('%Y/%m/%d')
+    # 'today' 依赖 datetime.now()，无法与逐单元格版本逐行比对，这里只生成绝对日期与 'N days ago'
+    rel_dates = pd.Series(rng.integers(0, 30, n)).astype(str) + ' days ago'
+    dates = np.where(rng.random(n) < 0.6, abs_dates, rel_dates)
+    if cardinality == 'high':
+        money, years = lambda: _high_money(rng, n), _high_years(rng, n)
+    else:
+        money, years = lambda: rng.choice(np.array(MONEY_POOL, dtype=object), n), rng.choice(np.array(YOE_POOL, dtype=object), n)
+    return pd.DataFrame({
+        'Total': money(), 'Base': money(), 'Stock': money(), 'Bonus': money(),
+        'YOE': years, 'Date': dates, 'Capture_Time': capture.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+
+def run_legacy(df):
+    out = {f'{c}_Clean': df[c].apply(clean_money) for c in ['Total', 'Base', 'Stock', 'Bonus']}
+    out['YOE_Clean'] = df['YOE'].apply(lambda x: clean_money(str(x).replace('年', '')))
+    out['Date_Clean'] = df.apply(lambda x: clean_date(x['Date'], x.get('Capture_Time')), axis=1)
+    return out
+
+
+def run_vectorized(df):
+    out = {f'{c}_Clean': parse_money(df[c]) for c in ['Total', 'Base', 'Stock', 'Bonus']}
+    out['YOE_Clean'] = parse_years(df['YOE'])
+    out['Date_Clean'] = parse_dates(df['Date'], df['Capture_Time'])
+    return out
+
+
+def _timed(fn, df):
+    t0 = time.perf_counter()
+    res = fn(df)
+    return time.perf_counter() - t0, res
+
+
+def check_parity(legacy, vec):
+    for col, ref in legacy.items():
+        got = vec[col]
+        if col == 'Date_Clean':
+            ref, got = pd.to_datetime(ref), pd.to_datetime(got)
+            same = (ref == got) | (ref.isna() & got.isna())
+        else:
+            same = np.isclose(ref.astype(float), got.astype(float), rtol=0, atol=0)
+        if not same.all(): raise AssertionError(f"{col}: {int((~same).sum())} mismatched rows")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    ap.add_argument('--legacy-max', type=int, default=1_000_000, help='超过该行数时跳过逐单元格版本')
+    ap.add_argument('--cardinality', nargs='+', choices=CARDINALITIES, default=list(CARDINALITIES))
+    ap.add_argument('--json', action='store_true')
+    args = ap.parse_args(argv)
+
+    results = []
+    for n in args.sizes:
+        for cardinality in args.cardinality:
+            df = synth_frame(n, cardinality=cardinality)
+            t_vec, vec = _timed(run_vectorized, df)
+            row = {'rows': n, 'cardinality': cardinality, 'distinct_total': int(df['Total'].nunique()),
+                   'vectorized_s': round(t_vec, 4), 'legacy_s': None, 'speedup': None}
+            if n <= args.legacy_max:
+                t_leg, leg = _timed(run_legacy, df)
+                check_parity(leg, vec)
+                row.update(legacy_s=round(t_leg, 4), speedup=round(t_leg / t_vec, 1))
+            results.append(row)
+            if not args.json:
+                print(f"{n:>9,} rows | {cardinality:<4} ({row['distinct_total']:>9,} distinct Total) | vectorized {row['vectorized_s']:>8.3f}s"
+                      f" | legacy {row['legacy_s'] or float('nan'):>8.3f}s | x{row['speedup']}")
+    if args.json: print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == '__main__':
+    main()
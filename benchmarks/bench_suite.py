@@ -0,0 +1,290 @@
+"""ETL、筛选与各维度视图在不同数据规模下的基准套件。
+
+按 mconly/sources.json 中真实源文件的表头生成合成 CSV (万 格式金额与区间、'N days ago' 日期、
+逗号分隔的标签列表)，依次计时：
+
+* ETL 各阶段 —— 读取源文件、清洗 + UID、流式全量构建 Arrow 产物 (冷启动)、命中缓存的加载、紧凑化；
+* 筛选索引 / 预聚合立方体 / 技能倒排索引的构建，以及按 公司 × 职位 × 区域 的筛选与 KPI；
+* 每个 ``dim_*`` 维度的聚合 (``analytics.Engine``)；
+* 在无浏览器的 Streamlit AppTest 中渲染 Overview 与每个维度视图 (聚合 + 图表构建 + 降采样 + 序列化)。
+
+每个阶段记录耗时与峰值内存：Linux 下为阶段内进程 RSS 高水位相对阶段开始时的增量
+(进程池 worker 的内存不计入)，其他平台为 tracemalloc 峰值。结果以 JSON 输出，便于跟踪回归。
+
+用法 (仓库根目录)::
+
+    python -m benchmarks.bench_suite                                  # 1k / 10k / 100k / 1M
+    python -m benchmarks.bench_suite --sizes 1000 10000 --json --output bench.json
+    python -m benchmarks.bench_suite --views-max 0                    # 跳过看板视图渲染
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_parsing import MONEY_POOL, YOE_POOL
+from mconly import analytics, dimensions, etl, quality, store
+from mconly.compact import compact_frame
+from mconly.cube import ALL, build_cube
+from mconly.views import FilterIndex
+
+try:
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+except ImportError:
+    st = AppTest = None
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard_pro.py')
+
+COMPANIES = ['Binance', 'Coinbase', 'OKX', 'Bybit', 'Kraken', 'Ripple', 'Circle', 'Gemini', 'Crypto.com', 'Consensys',
+             'Chainalysis', 'Fireblocks', 'Anchorage Digital', 'Paxos', 'Jump Trading', 'Hudson River Trading',
+             'Jane Street', 'Wintermute', 'Galaxy Digital', 'Blockchain.com', 'Uniswap Labs', 'OpenSea', 'Polygon',
+             'Alchemy', 'Ledger', 'Bitpanda', 'Gate.io', 'KuCoin', 'HTX', 'Matrixport']
+ROLES = ['软件工程师', '产品经理', '软件工程经理', '产品设计师', '招聘专员', '市场营销', '技术项目经理', '数据科学家',
+         '数据分析师', '数据科学经理', '用户体验研究员', '业务分析师', '硬件工程师', 'Software Engineer', 'Product Manager']
+# (地区, 地点去掉公司名前缀的部分)；真实 地点 为 公司名 + 城市
+PLACES = [('Singapore', 'Singapore, SG, Singapore'), ('United States - New York City Area', 'New York, NY'),
+          ('United States', 'San Francisco, CA'), ('Hong Kong (SAR)', 'Hong Kong, HK, Hong Kong (SAR)'),
+          ('Malaysia', 'Kuala Lumpur, KL, Malaysia'), ('United Kingdom', 'London, EN, United Kingdom'),
+          ('Remote', 'Remote'), ('United Arab Emirates', 'Dubai, DU, United Arab Emirates'), (np.nan, np.nan)]
+LEVELS = ['L3', 'L4', 'L5', 'L6', 'IC4', 'P7.2', '1.1(入门级)', '31', '-', np.nan]
+TAGS = ['API Development (Back-End)', 'Web Development (Front-End)', 'DevOps', 'Distributed Systems (Back-End)',
+        'Blockchain', 'Security', 'Machine Learning', 'Data', 'Mobile (iOS + Android)', 'Full Stack', 'User Research',
+        'General', 'hidden', 'Trading', 'Infrastructure', 'Smart Contracts']
+LATEST_SHARE = 0.3
+
+
+def _columns(name):
+    # 源表头 = 注册表映射的原始列名 + 未映射的 Capture_Time
+    return list(etl.SOURCES[name].columns) + ['Capture_Time']
+
+
+def _tag_pool(rng, size=256):
+    lists = [', '.join(rng.choice(TAGS, rng.integers(1, 4), replace=False)) for _ in range(size)]
+    return np.array(lists + [np.nan] * (size // 8), dtype=object)
+
+
+def synth_rows(n, rng, offset=0):
+    """n 行与两个源共用的逻辑字段 (英文列名)，公司按长尾分布，规模越大公司越多。"""
+    companies = np.array(COMPANIES + [f'Exchange {i:04d}' for i in range(n // 2000)], dtype=object)
+    weights = 1 / np.arange(1, len(companies) + 1)
+    company = rng.choice(companies, n, p=weights / weights.sum())
+    place = rng.integers(0, len(PLACES), n)
+    region = np.array([p[0] for p in PLACES], dtype=object)[place]
+    location = pd.Series(company) + pd.Series(np.array([p[1] for p in PLACES], dtype=object)[place])
+    capture = pd.Timestamp('2026-01-27 23:26:24') + pd.to_timedelta(rng.integers(0, 86400 * 30, n), unit='s')
+    abs_dates = (pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 1100, n), unit='D')).strftime('%Y/%m/%d')
+    rel_dates = pd.Series(rng.integers(1, 30, n)).astype(str) + ' days ago'
+    kind = rng.random(n)
+    dates = np.where(kind < 0.6, abs_dates, np.where(kind < 0.97, rel_dates, 'today'))
+    money = lambda: rng.choice(np.array(MONEY_POOL, dtype=object), n)
+    usd = rng.lognormal(np.log(150_000), 0.6, n).round().astype(np.int64).astype(str)
+    return pd.DataFrame({
+        'Company': company, 'Role': rng.choice(np.array(ROLES, dtype=object), n), 'Region': region,
+        'Location': location.where(pd.notna(region)), 'Date': dates,
+        'Level': rng.choice(np.array(LEVELS, dtype=object), n), 'Tags': rng.choice(_tag_pool(rng), n),
+        'YOE': rng.choice(np.array(YOE_POOL, dtype=object), n), 'Tenure': rng.choice(np.array(YOE_POOL, dtype=object), n),
+        'Total_USD': np.where(rng.random(n) < 0.9, usd, money()), 'Total': money(),
+        'Base': money(), 'Stock': money(), 'Bonus': money(),
+        'URL': 'https://www.levels.fyi/zh-cn/companies/offer/' + pd.Series(np.arange(offset, offset + n)).astype(str),
+        'Capture_Time': capture.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+
+def synth_sources(data_dir, n, seed=0):
+    """在 data_dir 写出 n 行合成数据 (latest 约占 LATEST_SHARE)，返回 {文件名: 字节数}。"""
+    rng = np.random.default_rng(seed)
+    n_latest = int(n * LATEST_SHARE)
+    frames = {'latest': synth_rows(n_latest, rng), 'general': synth_rows(n - n_latest, rng, offset=n_latest)}
+    # latest 的 总薪酬USD 为纯数字，general 的 总计 为 万 格式字符串
+    renames = {'latest': {'Total_USD': 'Total'}, 'general': {}}
+    sizes = {}
+    for name, frame in frames.items():
+        source = etl.SOURCES[name]
+        frame = frame.drop(columns=['Total'] if name == 'latest' else ['Total_USD']).rename(columns=renames[name])
+        inverse = {v: k for k, v in source.columns.items()}
+        out = frame.rename(columns=inverse)[_columns(name)]
+        if name == 'latest': out.insert(out.columns.get_loc('总计工作年数') + 1, '该公司工作年数', frame['Tenure'])
+        path = os.path.join(data_dir, source.glob)
+        out.to_csv(path, index=False, encoding='utf-8-sig')
+        sizes[source.glob] = os.path.getsize(path)
+    return sizes
+
+
+# ==========================================
+# 计时与峰值内存
+# ==========================================
+def _rss_peak_supported():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f: f.write('5')
+        return True
+    except OSError:
+        return False
+
+RSS_PEAK = _rss_peak_supported()
+
+
+def _status_mb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field): return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def _measure(fn):
+    gc.collect()
+    if RSS_PEAK:
+        with open('/proc/self/clear_refs', 'w') as f: f.write('5')
+        base = _status_mb('VmRSS')
+    else:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    res = fn()
+    elapsed = time.perf_counter() - t0
+    if RSS_PEAK: peak = _status_mb('VmHWM') - base
+    else:
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return {'s': round(elapsed, 4), 'peak_mb': round(max(peak, 0), 1)}, res
+
+
+# ==========================================
+# 各阶段
+# ==========================================
+def _scopes(master, k=3):
+    # 筛选组合：头部公司 × 头部职位 × (全部 / USA)，外加全不筛选
+    top = lambda c: master[c].value_counts().index[:k].astype(str).tolist()
+    scopes = [(ALL, ALL, ALL)]
+    scopes += [(c, r, g) for c in top('Company') for r in top('Role')[:2] for g in (ALL, 'USA')]
+    return scopes
+
+
+def check_missing_yoe(engine):
+    """注册表中没有 YOE 列的源 (如 General)，健康度视图的 Missing_YOE 必须为 100%。"""
+    health = engine.dimension('dim_health')['health_source'].set_index('Source')['Missing_YOE']
+    for source in etl.SOURCES.values():
+        if 'YOE' in source.columns.values() or source.label not in health.index: continue
+        if health[source.label] != 1.0: raise AssertionError(f"{source.label}: Missing_YOE {health[source.label]:.3f}, expected 1.0")
+
+
+def bench_pipeline(data_dir, compact=True):
+    """ETL、索引构建、筛选与各维度聚合；返回 {阶段: 指标}。"""
+    stages = {}
+    stages['etl.read'], (raw, _) = _measure(lambda: etl.read_sources(data_dir))
+    stages['etl.clean'], _ = _measure(lambda: etl.process(raw))
+    del raw, _
+    stages['store.build'], master = _measure(lambda: store.load_master(data_dir))
+    del master
+    stages['store.load'], master = _measure(lambda: store.load_master(data_dir))
+    if compact:
+        stages['compact'], master = _measure(lambda: compact_frame(master))
+    stages['quality'], master = _measure(lambda: quality.annotate(master))
+
+    stages['index.filter'], index = _measure(lambda: FilterIndex(master))
+    stages['index.cube'], cube = _measure(lambda: build_cube(master))
+    engine = analytics.Engine(master, cube, index)
+    src = engine.source()
+    stages['index.skills'], _ = _measure(lambda: dimensions.skill_index(src))
+    stages['index.series'], _ = _measure(lambda: [dimensions.series_index(src).series(src.filters, freq) for freq in 'DWM'])
+
+    scopes = _scopes(master)
+    stages['filter'], _ = _measure(lambda: [engine.source(*s) for s in scopes])
+    stages['kpis'], _ = _measure(lambda: [engine.kpis(*s) for s in scopes])
+    for m in ('filter', 'kpis'): stages[m]['calls'] = len(scopes)
+
+    pair = master['Company'].value_counts().index[:2].astype(str).tolist()
+    for dim in dimensions.DIMENSIONS:
+        params = {'companies': pair} if dim == 'dim_compare' else {}
+        stages[f'dim.{dim}'], _ = _measure(lambda: engine.dimension(dim, **params))
+    check_missing_yoe(engine)
+    return stages
+
+
+def bench_views(timeout=600):
+    """在当前目录 (合成数据目录) 用 AppTest 渲染看板：首次运行含数据加载，之后逐个维度视图。"""
+    st.cache_resource.clear(); st.cache_data.clear()
+    dimensions.clear()
+    stages = {}
+
+    def run(view, dim=None):
+        at = AppTest.from_file(DASHBOARD, default_timeout=timeout)
+        at.session_state.view = view
+        if dim: at.session_state.sel_dim = dim
+        at.run()
+        return at
+
+    for name, view, dim in [('view.startup', 'Overview', None), ('view.Overview', 'Overview', None)] + \
+                           [(f'view.{d}', 'Dimension_View', d) for d in dimensions.DIMENSIONS]:
+        stages[name], at = _measure(lambda: run(view, dim))
+        if at.exception: stages[name]['error'] = at.exception[0].message.splitlines()[0][:200]
+    return stages
+
+
+def run_size(n, seed=0, views=True, compact=True, keep=False):
+    data_dir = tempfile.mkdtemp(prefix=f'mconly-bench-{n}-')
+    cwd = os.getcwd()
+    try:
+        t0 = time.perf_counter()
+        files = synth_sources(data_dir, n, seed)
+        row = {'rows': n, 'files': files, 'synth_s': round(time.perf_counter() - t0, 3)}
+        # 看板使用相对路径 ('.' 与 store.CACHE_DIR)，整段在数据目录内执行
+        os.chdir(data_dir)
+        dimensions.clear()
+        row['stages'] = bench_pipeline('.', compact)
+        if views: row['stages'].update(bench_views())
+        if keep: row['data_dir'] = data_dir
+        return row
+    finally:
+        os.chdir(cwd)
+        dimensions.clear()
+        if not keep: shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def meta():
+    return {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'workers': store.WORKERS,
+            'chunk_rows': etl.CHUNK_ROWS, 'compact': analytics.COMPACT_MODE,
+            'memory': 'rss_hwm_delta' if RSS_PEAK else 'tracemalloc_peak',
+            'streamlit': getattr(st, '__version__', None)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    ap.add_argument('--views-max', type=int, default=100_000, help='超过该行数时跳过 AppTest 视图渲染 (0 为全部跳过)')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--full', action='store_true', help='维度阶段使用完整 master 而非紧凑模式')
+    ap.add_argument('--keep', action='store_true', help='保留合成数据目录')
+    ap.add_argument('--json', action='store_true')
+    ap.add_argument('--output', default=None, help='JSON 结果写入该文件 (隐含 --json)')
+    args = ap.parse_args(argv)
+    if AppTest is None and args.views_max:
+        print('streamlit 未安装，跳过视图渲染', file=sys.stderr)
+
+    results = []
+    for n in args.sizes:
+        views = AppTest is not None and n <= args.views_max
+        row = run_size(n, args.seed, views, compact=not args.full, keep=args.keep)
+        results.append(row)
+        if not (args.json or args.output):
+            print(f"{n:>9,} rows | synth {row['synth_s']:.2f}s")
+            for name, m in row['stages'].items():
+                print(f"    {name:<22} {m['s']:>9.3f}s {m['peak_mb']:>9.1f} MB" + (f"  ! {m['error']}" if 'error' in m else ''))
+    report = {'meta': meta(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(report, f, indent=2, ensure_ascii=False)
+    elif args.json: print(json.dumps(report, indent=2, ensure_ascii=False))
+    return report
+
+
+if __name__ == '__main__':
+    main()
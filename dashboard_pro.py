@@ -3,9 +3,17 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-import re
-import hashlib
-from datetime import datetime, timedelta
+import time
+
+from mconly import analytics, dimensions, listing, profiling, quality, refresh
+from mconly.cache import RESULTS
+from mconly.figures import FigureCache, build_chart, downsample_figure, figure_points, register_template
+from mconly.etl import uid_index
+from mconly.specs import SPECS
+
+if int(pd.__version__.split('.')[0]) < 3:
+    # pandas 3 起默认写时复制；旧版本在看板进程中显式开启，会话共享的视图与结果不会被误写回 master
+    pd.set_option('mode.copy_on_write', True)
 
 # ==========================================
 # 1. 系统配置 (SYSTEM CONFIG)
@@ -27,6 +35,14 @@ if 'sel_uid' not in st.session_state: st.session_state.sel_uid = None
 if 'filter_company' not in st.session_state: st.session_state.filter_company = 'All'
 if 'filter_role' not in st.session_state: st.session_state.filter_role = 'All'
 if 'filter_region' not in st.session_state: st.session_state.filter_region = 'All'
+# 排除数据质量标记行 (解析失败 / 总包为 0 / 离群)，默认关闭
+if 'exclude_flagged' not in st.session_state: st.session_state.exclude_flagged = False
+# 列表视图的检索 / 排序 / 分页状态
+if 'list_search' not in st.session_state: st.session_state.list_search = ''
+if 'list_sort' not in st.session_state: st.session_state.list_sort = '(默认)'
+if 'list_desc' not in st.session_state: st.session_state.list_desc = True
+if 'list_page_size' not in st.session_state: st.session_state.list_page_size = listing.PAGE_SIZE
+if 'list_page' not in st.session_state: st.session_state.list_page = 1
 # 对比维度专用状态
 if 'compare_companies' not in st.session_state: st.session_state.compare_companies = []
 if 'compare_roles' not in st.session_state: st.session_state.compare_roles = []
@@ -39,6 +55,9 @@ def change_view(target_view, uid=None, dim=None, list_filters=None):
         if 'Company' in list_filters: st.session_state.filter_company = list_filters['Company']
         if 'Role' in list_filters: st.session_state.filter_role = list_filters['Role']
 
+def reset_list_page():
+    st.session_state.list_page = 1
+
 def go_back_callback():
     if st.session_state.view == 'Profile':
         if st.session_state.sel_dim: change_view('Dimension_View')
@@ -251,128 +270,44 @@ st.markdown("""
 # ==========================================
 # 4. 鲁棒 ETL 引擎
 # ==========================================
-@st.cache_data
-def load_and_process_data():
-    frames = []
-    
-    def clean_money(val):
-        if pd.isna(val): return 0
-        s = str(val).strip().lower()
-        if s in ['hidden', '不适用', '-', '', 'nan', 'none']: return 0
-        try:
-            if '-' in s:
-                parts = s.split('-')
-                v1 = clean_money(parts[0])
-                v2 = clean_money(parts[1])
-                return (v1+v2)/2 if v1>0 and v2>0 else v1
-            mul = 10000 if '万' in s else 1
-            matches = re.findall(r"(\d+\.?\d*)", s.replace(',', ''))
-            return float(matches[0]) * mul if matches else 0
-        except: return 0
-
-    def clean_date(val, capture_time=None):
-        s = str(val).strip()
-        base = pd.to_datetime(capture_time) if pd.notnull(capture_time) else datetime.now()
-        try:
-            if 'days ago' in s:
-                days = int(re.search(r'(\d+)', s).group(1))
-                return base - timedelta(days=days)
-            if 'today' in s.lower(): return base
-            return pd.to_datetime(s, errors='coerce')
-        except: return pd.NaT
-
-    try:
-        try: df1 = pd.read_csv('crypto_companies_salary_latest.csv')
-        except: df1 = pd.read_csv('crypto_companies_salary_latest.csv', encoding='gbk')
-        df1['Source'] = 'Latest'
-        map1 = {'总薪酬USD':'Total', '基本工资':'Base', '股票(年)':'Stock', '奖金':'Bonus', 
-                '日期':'Date', '公司':'Company', '职位':'Role', '总计工作年数':'YOE', 
-                '地区':'Region', '地点':'Location', '级别名称':'Level', '标签':'Tags', 'Source_URL': 'URL'}
-        df1.rename(columns={k:v for k,v in map1.items() if k in df1.columns}, inplace=True)
-        frames.append(df1)
-    except: pass
-
-    try:
-        try: df2 = pd.read_csv('crypto_companies_salary.csv')
-        except: df2 = pd.read_csv('crypto_companies_salary.csv', encoding='gbk')
-        df2['Source'] = 'General'
-        map2 = {'总计':'Total', '基本工资':'Base', '股票':'Stock', '奖金':'Bonus', 
-                '公司':'Company', '职位':'Role', '地区':'Region', '级别名称':'Level', 'Source_URL': 'URL'}
-        df2.rename(columns={k:v for k,v in map2.items() if k in df2.columns}, inplace=True)
-        frames.append(df2)
-    except: pass
-
-    if not frames: return pd.DataFrame()
-    df = pd.concat(frames, ignore_index=True)
-
-    for col in ['Total', 'Base', 'Stock', 'Bonus', 'Company', 'Role', 'Region', 'Location', 'YOE', 'Date', 'Tags', 'Level', 'URL', 'Capture_Time']:
-        if col not in df.columns: df[col] = np.nan
-    
-    df['UID'] = [hashlib.md5(f"{r['Company']}{r['Role']}{i}".encode()).hexdigest()[:8] for i, r in df.iterrows()]
-    
-    for c in ['Total', 'Base', 'Stock', 'Bonus']:
-        df[f'{c}_Clean'] = df[c].apply(clean_money)
-    
-    df['Final_Comp'] = np.where(df['Total_Clean']>0, df['Total_Clean'], df['Base_Clean']+df['Stock_Clean']+df['Bonus_Clean'])
-    df['YOE_Clean'] = df['YOE'].apply(lambda x: clean_money(str(x).replace('年','')))
-    df['Date_Clean'] = df.apply(lambda x: clean_date(x['Date'], x.get('Capture_Time')), axis=1)
-    
-    df['Equity_Ratio'] = df['Stock_Clean'] / df['Final_Comp'].replace(0, 1)
-    df['Hourly_Rate'] = df['Final_Comp'] / 2000
-    df['Net_Pay_Est'] = df['Final_Comp'] * 0.7
-    
-    def extract_skills(tags_str):
-        if pd.isna(tags_str): return []
-        return [t.strip() for t in str(tags_str).split(',') if t.strip()]
-    df['Skills_List'] = df['Tags'].apply(extract_skills)
-
-    def norm_geo(row):
-        txt = (str(row.get('Region','')) + str(row.get('Location',''))).lower()
-        if 'singapore' in txt: return 'Singapore'
-        if 'united states' in txt or 'ny' in txt or 'ca' in txt or 'san francisco' in txt: return 'USA'
-        if 'remote' in txt: return 'Remote'
-        if 'hong kong' in txt: return 'Hong Kong'
-        if 'uk' in txt or 'london' in txt: return 'UK'
-        return 'Global'
-    df['Region_Group'] = df.apply(norm_geo, axis=1)
-    
-    def norm_role(r):
-        s = str(r).lower()
-        if 'engineer' in s or 'developer' in s or '开发' in s: return 'Engineering'
-        if 'product' in s or '产品' in s: return 'Product'
-        if 'design' in s or '设计' in s: return 'Design'
-        if 'data' in s or 'analy' in s: return 'Data'
-        return 'Other'
-    df['Role_Group'] = df['Role'].apply(norm_role)
-
-    return df
-
-df_master = load_and_process_data()
-df_skills = df_master.explode('Skills_List')
-df_skills = df_skills[df_skills['Skills_List'].notna()]
-df_skills = df_skills[df_skills['Skills_List'] != '']
+@st.cache_resource(on_release=lambda r: r.stop())
+def get_refresher():
+    # 进程内唯一的后台刷新线程：每 SOURCE_TTL 秒检查源文件指纹，变化时在请求路径之外重建
+    # master (Arrow 产物 + 紧凑模式)、筛选索引与立方体，完成后原子切换；构建期间各会话继续使用旧版本
+    return refresh.Refresher().start()
+
+@st.cache_resource(max_entries=4)
+def get_uid_index(data_version, _df):
+    # 每个数据版本只建一次 UID -> 行位置索引 (_df 不参与 Streamlit 的参数哈希)
+    return uid_index(_df)
+
+@st.cache_resource(max_entries=4)
+def get_list_index(data_version, _df):
+    # 列表视图的排序名次与检索词元索引
+    return listing.ListIndex(_df)
+
+@st.cache_resource
+def get_figure_cache():
+    # 序列化图表跨会话共享，键中含数据版本，数据刷新后旧条目随 LRU 淘汰
+    return FigureCache()
+
+# 热路径计时 (MCONLY_PROFILE=1 或 URL 参数 ?profile=1)，结果见页面底部的调试面板
+prof = profiling.Profiler(enabled=profiling.ENABLED or st.query_params.get('profile') == '1')
+
+register_template()
+refresher = get_refresher()
+with prof.stage('load') as s:
+    # 本次 rerun 固定使用同一个快照，刷新线程切换版本不影响进行中的渲染
+    snapshot = refresher.snapshot()
+    # 开启排除时改用去掉标记行的引擎 (首次开启时构建)，全部聚合、列表与下钻都基于它
+    engine = snapshot.engine.screened if st.session_state.exclude_flagged else snapshot.engine
+    df_master, cube, filter_index = engine.master, engine.cube, engine.index
+    s['rows'] = len(df_master)
 
 # ==========================================
 # 5. 智能归因引擎
 # ==========================================
-def get_crypto_insight(context, df):
-    if df.empty: return {'obs':"暂无数据", 'dia':"需补充数据源", 'act':"请清除筛选条件"}
-    avg = df['Final_Comp'].median()
-    res = {'obs':"", 'dia':"", 'act':""}
-    
-    if context == 'Overview':
-        res['obs'] = f"**[样本监测]** 实时追踪 `{len(df)}` 个薪酬数据点。全市场中位数 `${avg:,.0f}`。"
-        res['dia'] = "**[市场特征]** 数据呈现明显的分层结构。Tier 1 交易所与 DAO 组织的薪酬体系差异显著。"
-        res['act'] = "**[操作建议]** 探索下方的 **'⚔️ 竞对深度对标'** 模块，进行 Company vs Company 的精确比对。"
-    elif context == 'dim_compare':
-        res['obs'] = f"**[对标状态]** 正在对比 `{len(df['Company'].unique())}` 家公司的 `{len(df)}` 个 Offer。"
-        res['dia'] = "**[差异分析]** 箱线图的上限代表了该公司的最高支付意愿，下限代表起薪门槛。请注意各公司在同一岗位上的定价断层。"
-        res['act'] = "**[决策辅助]** 利用上方的控制器切换对标公司和岗位。点击图表中的点可直接查看对应的 JD/Offer 详情。"
-    else:
-        res['obs'] = f"**[当前维度]** 有效样本 N=`{len(df)}`。该维度下的薪酬峰值为 `${df['Final_Comp'].max():,.0f}`。"
-        res['dia'] = "**[分布诊断]** 请注意图表中的异常高值点，它们通常代表了该细分领域的定价天花板。"
-        res['act'] = "**[交互提示]** 所有的柱状图和散点图均支持点击交互，可直接穿透至原始数据列表。"
-    return res
+# KPI 与诊断文案由 mconly.analytics 计算，与离线报表 (python -m mconly.report) 共用
 
 # ==========================================
 # 6. UI 渲染：顶部导航 & 筛选器
@@ -384,14 +319,14 @@ st.markdown(f"""
         🦅 GATE Command Center
         <span class="nav-tag">v21.0 Battle Mode</span>
     </div>
-    <div class="nav-status">VIEW: {st.session_state.view}</div>
+    <div class="nav-status">VIEW: {st.session_state.view} · DATA: {snapshot.version[:8]} · BUILT {time.strftime('%Y-%m-%d %H:%M', time.localtime(snapshot.built_at))} ({snapshot.build_s:.1f}s){' · 🧹 SCREENED' if st.session_state.exclude_flagged else ''}{' · ⟳ REFRESHING' if refresher.building else ''}</div>
 </div>
 """, unsafe_allow_html=True)
 
 if st.session_state.view in ['Overview', 'List']:
     with st.container():
         st.write("") 
-        f1, f2, f3, f4 = st.columns([1.5, 1.5, 1.5, 1])
+        f1, f2, f3, f4, f5 = st.columns([1.5, 1.5, 1.5, 1, 1])
         all_comps = ['All'] + sorted(df_master['Company'].dropna().astype(str).unique().tolist())
         all_roles = ['All'] + sorted(df_master['Role'].dropna().astype(str).unique().tolist())
         all_regions = ['All'] + sorted(df_master['Region_Group'].dropna().unique().tolist())
@@ -402,15 +337,19 @@ if st.session_state.view in ['Overview', 'List']:
             st.markdown('<div style="height: 28px;"></div>', unsafe_allow_html=True) 
             if st.button("🔄 Reset Filter", use_container_width=True):
                 st.session_state.filter_company = 'All'; st.session_state.filter_role = 'All'; st.session_state.filter_region = 'All'; st.rerun()
+        with f5:
+            st.markdown('<div style="height: 28px;"></div>', unsafe_allow_html=True)
+            st.toggle("🧹 排除异常数据", key='exclude_flagged', on_change=reset_list_page, help="排除原始金额解析失败、总包为 0 或公司 × 职能内离群的 Offer")
         if sel_comp != st.session_state.filter_company: st.session_state.filter_company = sel_comp; st.rerun()
         if sel_role != st.session_state.filter_role: st.session_state.filter_role = sel_role; st.rerun()
         if sel_region != st.session_state.filter_region: st.session_state.filter_region = sel_region; st.rerun()
     st.markdown("---")
 
-df_ctx = df_master.copy()
-if st.session_state.filter_company != 'All': df_ctx = df_ctx[df_ctx['Company'] == st.session_state.filter_company]
-if st.session_state.filter_role != 'All': df_ctx = df_ctx[df_ctx['Role'] == st.session_state.filter_role]
-if st.session_state.filter_region != 'All': df_ctx = df_ctx[df_ctx['Region_Group'] == st.session_state.filter_region]
+# 只读视图: 按预建的行位置索引取子集并跨会话缓存，全部为 'All' 时 df_ctx 就是 df_master 本身 (不可原地修改)
+ctx_key = dimensions.normalize_filters((st.session_state.filter_company, st.session_state.filter_role, st.session_state.filter_region))
+with prof.stage('filter') as s:
+    df_ctx = dimensions.view(df_master, filter_index, ctx_key, engine.version)
+    s['rows'] = len(df_ctx)
 
 # ==========================================
 # 7. 增强组件渲染
@@ -424,56 +363,25 @@ def render_kpi_card(label, value, sub_text=""):
     </div>
     """, unsafe_allow_html=True)
 
-def render_chart_box(title, fig, insight, explanation, chart_key, height=380):
+def render_chart_box(title, build, insight, explanation, chart_key, height=380, state=None):
+    # build: 返回 Plotly 图表的无参函数，仅在 (chart_key, 筛选状态, 数据版本) 未命中缓存时调用
     st.markdown(f"<div class='chart-box'><div class='chart-title'>{title}</div>", unsafe_allow_html=True)
     
-    # ----------------------------------------------------
-    # World-Class Plotly Configuration (Visual Overhaul)
-    # ----------------------------------------------------
-    fig.update_layout(
-        font=dict(family="Inter, sans-serif", size=11, color="#64748B"),
-        margin=dict(l=0, r=0, t=20, b=0),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=height,
-        xaxis=dict(
-            showgrid=False, 
-            showline=True, 
-            linecolor="#E2E8F0", 
-            tickfont=dict(color="#94A3B8")
-        ),
-        yaxis=dict(
-            showgrid=True, 
-            gridcolor="#F1F5F9", 
-            gridwidth=1, 
-            zeroline=False, 
-            tickfont=dict(color="#94A3B8")
-        ),
-        hoverlabel=dict(
-            bgcolor="white", 
-            bordercolor="#E2E8F0", 
-            font_size=12, 
-            font_family="Inter, sans-serif"
-        ),
-        legend=dict(
-            orientation="h", 
-            yanchor="bottom", 
-            y=1.02, 
-            xanchor="right", 
-            x=1,
-            font=dict(size=10)
-        ),
-        colorway=["#2563EB", "#3B82F6", "#60A5FA", "#93C5FD", "#1E40AF"] # GATE Brand Blues
-    )
+    # 主题由已注册的 'gate' 模板统一提供，这里只设置高度；大数据量时在服务端降采样 / 分箱
+    key = (chart_key, ctx_key if state is None else state, engine.version, height)
+    with prof.stage(f'figure:{chart_key}') as s:
+        fig = get_figure_cache().get(key, lambda: downsample_figure(build()).update_layout(height=height), info=s)
+        if prof.enabled: s['rows'] = figure_points(fig)
     
-    event = st.plotly_chart(
-        fig,
-        use_container_width=True, 
-        on_select="rerun", 
-        selection_mode="points", 
-        key=f"chart_{chart_key}",
-        config={'displayModeBar': False}
-    )
+    with prof.stage(f'plotly_chart:{chart_key}'):
+        event = st.plotly_chart(
+            fig,
+            use_container_width=True, 
+            on_select="rerun", 
+            selection_mode="points", 
+            key=f"chart_{chart_key}",
+            config={'displayModeBar': False}
+        )
     if event and event.selection and event.selection.points:
         point = event.selection.points[0]
         if 'customdata' in point: change_view('Profile', uid=point['customdata'][0])
@@ -529,13 +437,14 @@ def render_floating_buttons():
 # --- A. Overview ---
 if st.session_state.view == 'Overview':
     k1, k2, k3, k4, k5 = st.columns(5)
-    with k1: render_kpi_card("有效样本 (N)", len(df_ctx), "Validated Offers")
-    with k2: render_kpi_card("中位年薪 (P50)", f"${df_ctx['Final_Comp'].median():,.0f}", "Market Benchmark")
-    with k3: render_kpi_card("时薪估算 (Hourly)", f"${df_ctx['Hourly_Rate'].mean():.1f}", "Approx Rate")
-    with k4: render_kpi_card("最高年薪 (Max)", f"${df_ctx['Final_Comp'].max():,.0f}", "Talent Ceiling")
-    with k5: render_kpi_card("变异系数 (CV)", f"{df_ctx['Final_Comp'].std() / df_ctx['Final_Comp'].mean():.2f}", "Market Volatility")
-
-    si = get_crypto_insight('Overview', df_ctx)
+    with prof.stage('kpis'): kpi = analytics.kpis(cube, ctx_key)
+    with k1: render_kpi_card("有效样本 (N)", kpi['n'], "Validated Offers")
+    with k2: render_kpi_card("中位年薪 (P50)", f"${kpi['p50']:,.0f}", f"P25 ${kpi['p25']/1e3:,.0f}k · P75 ${kpi['p75']/1e3:,.0f}k")
+    with k3: render_kpi_card("时薪估算 (Hourly)", f"${kpi['hourly']:.1f}", "Approx Rate")
+    with k4: render_kpi_card("最高年薪 (Max)", f"${kpi['max']:,.0f}", "Talent Ceiling")
+    with k5: render_kpi_card("变异系数 (CV)", f"{kpi['cv']:.2f}", "Market Volatility")
+
+    si = analytics.insight('Overview', df_ctx)
     render_smart_insight(si, "EXECUTIVE SUMMARY")
 
     st.markdown("#### 🔭 ANALYTIC DIMENSIONS ")
@@ -579,6 +488,8 @@ elif st.session_state.view == 'Dimension_View':
     
     render_floating_buttons() 
     curr_dim = st.session_state.sel_dim
+    # 维度聚合惰性计算: 只算当前视图需要的部分，并按 (维度, 筛选状态, 数据版本) 记忆化
+    dim_src = dimensions.DimSource(df_ctx, df_master, cube, filter_index, ctx_key, engine.version)
     titles = {
         'dim_compare': '⚔️ 竞对深度对标 (Competitor Battle)',
         'dim_market':'🏦 市场竞争格局', 'dim_structure':'💰 薪酬结构工程', 'dim_levels':'🪜 职级架构分析', 
@@ -606,43 +517,40 @@ elif st.session_state.view == 'Dimension_View':
                 sel_roles = st.multiselect("选择对标岗位 (Select Roles - Optional)", all_r, default=[], key='cmp_r')
             
             # Filter Data (Use df_master to ignore global filter)
-            df_battle = df_master[df_master['Company'].isin(sel_comps)] if sel_comps else df_master
-            if sel_roles: df_battle = df_battle[df_battle['Role'].isin(sel_roles)]
+            with prof.stage(f'aggregate:{curr_dim}') as s:
+                agg = dimensions.compute(curr_dim, dim_src, companies=sel_comps, roles=sel_roles)
+                s['rows'] = len(df_master)
+            df_battle = agg['battle']
+            battle_state = (tuple(sel_comps), tuple(sel_roles))
         
-        si_dim = get_crypto_insight(curr_dim, df_battle)
+        si_dim = analytics.insight(curr_dim, df_battle)
         render_smart_insight(si_dim, "HEAD-TO-HEAD ANALYSIS")
         
         c1, c2 = st.columns(2); c3, c4 = st.columns(2); c5, c6 = st.columns(2)
         
-        with c1: render_chart_box("全维薪酬擂台 (Box Battle)", px.box(df_battle, x='Company', y='Final_Comp', color='Company', points='all', custom_data=['UID']), "展示各公司薪酬的天花板与地板。", 
-            "**箱体**代表中位数与四分位范围，**散点**代表具体Offer。可直观对比谁家的薪酬带宽更宽、上限更高。", "bt1")
+        with c1: render_chart_box("全维薪酬擂台 (Box Battle)", lambda: px.box(df_battle, x='Company', y='Final_Comp', color='Company', points='all', custom_data=['UID']), "展示各公司薪酬的天花板与地板。", 
+            "**箱体**代表中位数与四分位范围，**散点**代表具体Offer。可直观对比谁家的薪酬带宽更宽、上限更高。", "bt1", state=battle_state)
         
-        # Role Pricing
-        role_stats = df_battle.groupby(['Company','Role'])['Final_Comp'].median().reset_index()
-        # Filter for roles present in at least 2 companies for better comparison if possible, else show all top
-        top_roles_battle = df_battle['Role'].value_counts().head(10).index
-        role_stats = role_stats[role_stats['Role'].isin(top_roles_battle)]
-        with c2: render_chart_box("核心岗位定价 PK", px.bar(role_stats, x='Final_Comp', y='Role', color='Company', barmode='group', orientation='h'), "同岗位谁给的钱多？", 
-            "分组条形图。**Y轴**为热门岗位，**条形长度**为中位薪酬。同一岗位的不同颜色条形直接对比各家出价。", "bt2")
+        # Role Pricing (top 10 roles only)
+        with c2: render_chart_box("核心岗位定价 PK", lambda: px.bar(agg['role_stats'], x='Final_Comp', y='Role', color='Company', barmode='group', orientation='h'), "同岗位谁给的钱多？", 
+            "分组条形图。**Y轴**为热门岗位，**条形长度**为中位薪酬。同一岗位的不同颜色条形直接对比各家出价。", "bt2", state=battle_state)
             
-        with c3: render_chart_box("经验回报率曲线 (Pay vs YOE)", px.scatter(df_battle, x='YOE_Clean', y='Final_Comp', color='Company', trendline='lowess'), "谁家更尊重资历？", 
-            "**斜率**越陡峭，说明随着工龄增长，薪酬涨幅越快。趋势线位于上方的公司在同等经验下给薪更高。", "bt3")
+        with c3: render_chart_box("经验回报率曲线 (Pay vs YOE)", lambda: px.scatter(df_battle, x='YOE_Clean', y='Final_Comp', color='Company', trendline='lowess'), "谁家更尊重资历？", 
+            "**斜率**越陡峭，说明随着工龄增长，薪酬涨幅越快。趋势线位于上方的公司在同等经验下给薪更高。", "bt3", state=battle_state)
             
         # Seniority Premium
-        df_battle['Is_Senior'] = df_battle['Role'].astype(str).str.contains('Senior|Lead|Staff|Manager', case=False)
-        senior_pay = df_battle[df_battle['Is_Senior']].groupby('Company')['Final_Comp'].median().reset_index()
-        with c4: render_chart_box("高级职级溢价 (Senior Premium)", px.bar(senior_pay, x='Company', y='Final_Comp', color='Company'), "Senior Title 含金量对比。", 
-            "仅统计带有 Senior/Lead/Staff 等关键词的岗位。展示各家公司对**高阶人才**的定价水位。", "bt4")
+        with c4: render_chart_box("高级职级溢价 (Senior Premium)", lambda: px.bar(agg['senior_pay'], x='Company', y='Final_Comp', color='Company'), "Senior Title 含金量对比。", 
+            "仅统计带有 Senior/Lead/Staff 等关键词的岗位。展示各家公司对**高阶人才**的定价水位。", "bt4", state=battle_state)
             
-        with c5: render_chart_box("现金/期权结构战 (Mix Battle)", px.bar(df_battle.groupby('Company')[['Base_Clean','Stock_Clean']].mean().reset_index(), x='Company', y=['Base_Clean','Stock_Clean']), "现金为王还是期权画饼？", 
-            "堆叠柱状图。**蓝色**通常为底薪，**红色/绿色**为股票。可识别哪家公司更倾向于给现金（风险低），哪家给期权（杠杆高）。", "bt5")
+        with c5: render_chart_box("现金/期权结构战 (Mix Battle)", lambda: px.bar(agg['mix'], x='Company', y=['Base_Clean','Stock_Clean']), "现金为王还是期权画饼？", 
+            "堆叠柱状图。**蓝色**通常为底薪，**红色/绿色**为股票。可识别哪家公司更倾向于给现金（风险低），哪家给期权（杠杆高）。", "bt5", state=battle_state)
             
-        with c6: render_chart_box("时薪效能对决 (Hourly Efficiency)", px.box(df_battle, x='Company', y='Hourly_Rate', color='Company'), "剥离加班因素后的真实时薪。", 
-            "假设年均工作2000小时计算出的时薪。如果某公司总包高但时薪低，说明可能存在**严重的加班文化**。", "bt6")
+        with c6: render_chart_box("时薪效能对决 (Hourly Efficiency)", lambda: px.box(df_battle, x='Company', y='Hourly_Rate', color='Company'), "剥离加班因素后的真实时薪。", 
+            "假设年均工作2000小时计算出的时薪。如果某公司总包高但时薪低，说明可能存在**严重的加班文化**。", "bt6", state=battle_state)
 
     # ---------------- Standard Dimensions ----------------
     else:
-        si_dim = get_crypto_insight(curr_dim, df_ctx)
+        si_dim = analytics.insight(curr_dim, df_ctx)
         render_smart_insight(si_dim, titles.get(curr_dim).split(' ')[1])
         
         layout_2col = ['dim_trends', 'dim_geo', 'dim_skills', 'dim_clusters', 'dim_velocity', 'dim_outliers']
@@ -651,96 +559,121 @@ elif st.session_state.view == 'Dimension_View':
         else:
             c1, c2, c3 = st.columns(3); c4, c5, c6 = st.columns(3)
 
+        with prof.stage(f'aggregate:{curr_dim}') as s:
+            agg = dimensions.compute(curr_dim, dim_src)
+            s['rows'] = len(df_ctx)
+
         if curr_dim == 'dim_market':
-            p50 = df_ctx.groupby('Company')['Final_Comp'].median().reset_index().sort_values('Final_Comp').tail(15)
-            with c1: render_chart_box("Top 15 中位薪酬", px.bar(p50, x='Final_Comp', y='Company', orientation='h', color='Final_Comp'), "头部溢价。", "Y轴为公司，X轴为薪酬中位数。", "m1")
-            with c2: render_chart_box("市场份额", px.pie(df_ctx, names='Company', hole=0.6), "头部效应。", "样本量占比。", "m2")
-            with c3: render_chart_box("薪酬带宽", px.box(df_ctx, x='Company', y='Final_Comp'), "内部差异。", "箱线图展示分布。", "m3")
-            with c4: render_chart_box("直方图分布", px.histogram(df_ctx, x='Final_Comp', nbins=40, color='Company'), "右偏分布。", "薪酬区间分布。", "m4")
-            df_s = df_ctx.sort_values('Final_Comp'); df_s['CP'] = np.linspace(0,1,len(df_s)); df_s['CC'] = df_s['Final_Comp'].cumsum()/df_s['Final_Comp'].sum()
-            with c5: render_chart_box("不平等曲线", px.line(df_s, x='CP', y='CC'), "贫富差距。", "洛伦兹曲线。", "m5")
-            with c6: render_chart_box("分层定位", px.scatter(df_ctx, x='Company', y='Final_Comp', color='Role_Group'), "人才侧重。", "公司与薪酬定位。", "m6")
+            with c1: render_chart_box("Top 15 中位薪酬", lambda: px.bar(agg['p50'], x='Final_Comp', y='Company', orientation='h', color='Final_Comp'), "头部溢价。", "Y轴为公司，X轴为薪酬中位数。", "m1")
+            with c2: render_chart_box("市场份额", lambda: px.pie(df_ctx, names='Company', hole=0.6), "头部效应。", "样本量占比。", "m2")
+            with c3: render_chart_box("薪酬带宽", lambda: px.box(df_ctx, x='Company', y='Final_Comp'), "内部差异。", "箱线图展示分布。", "m3")
+            with c4: render_chart_box("直方图分布", lambda: px.histogram(df_ctx, x='Final_Comp', nbins=40, color='Company'), "右偏分布。", "薪酬区间分布。", "m4")
+            with c5: render_chart_box("不平等曲线", lambda: px.line(agg['lorenz'], x='CP', y='CC'), "贫富差距。", "洛伦兹曲线。", "m5")
+            with c6: render_chart_box("分层定位", lambda: px.scatter(df_ctx, x='Company', y='Final_Comp', color='Role_Group'), "人才侧重。", "公司与薪酬定位。", "m6")
 
         elif curr_dim == 'dim_hourly':
-            with c1: render_chart_box("时薪分布", px.histogram(df_ctx, x='Hourly_Rate', nbins=30), "分布。", "基于2000小时计算。", "h1")
-            with c2: render_chart_box("公司平均时薪", px.bar(df_ctx.groupby('Company')['Hourly_Rate'].mean().reset_index(), x='Company', y='Hourly_Rate'), "价值。", "平均时薪。", "h2")
-            with c3: render_chart_box("时薪 vs 总薪", px.scatter(df_ctx, x='Final_Comp', y='Hourly_Rate'), "相关性。", "线性关系。", "h3")
-            with c4: render_chart_box("岗位时薪排行", px.box(df_ctx, x='Hourly_Rate', y='Role'), "高单价。", "岗位时薪分布。", "h4")
-            with c5: render_chart_box("时薪热力", px.density_heatmap(df_ctx, x='YOE_Clean', y='Hourly_Rate'), "兑换率。", "经验与时薪。", "h5")
-            with c6: render_chart_box("低时薪陷阱", px.scatter(df_ctx[df_ctx['Hourly_Rate']<50], x='Company', y='Hourly_Rate'), "低效能。", "低于$50的数据。", "h6")
+            with c1: render_chart_box("时薪分布", lambda: px.histogram(df_ctx, x='Hourly_Rate', nbins=30), "分布。", "基于2000小时计算。", "h1")
+            with c2: render_chart_box("公司平均时薪", lambda: px.bar(agg['by_company'], x='Company', y='Hourly_Rate'), "价值。", "平均时薪。", "h2")
+            with c3: render_chart_box("时薪 vs 总薪", lambda: px.scatter(df_ctx, x='Final_Comp', y='Hourly_Rate'), "相关性。", "线性关系。", "h3")
+            with c4: render_chart_box("岗位时薪排行", lambda: px.box(df_ctx, x='Hourly_Rate', y='Role'), "高单价。", "岗位时薪分布。", "h4")
+            with c5: render_chart_box("时薪热力", lambda: px.density_heatmap(df_ctx, x='YOE_Clean', y='Hourly_Rate'), "兑换率。", "经验与时薪。", "h5")
+            with c6: render_chart_box("低时薪陷阱", lambda: px.scatter(agg['low'], x='Company', y='Hourly_Rate'), "低效能。", "低于$50的数据。", "h6")
 
         elif curr_dim == 'dim_tiering':
-            meds = df_ctx.groupby('Company')['Final_Comp'].median()
-            q33 = meds.quantile(0.33); q66 = meds.quantile(0.66)
-            df_ctx['Tier'] = df_ctx['Company'].map(lambda x: 'Tier 1' if meds.get(x,0)>q66 else 'Tier 2' if meds.get(x,0)>q33 else 'Tier 3')
-            with c1: render_chart_box("分层金字塔", px.pie(df_ctx, names='Tier'), "占比。", "各层级占比。", "ti1")
-            with c2: render_chart_box("层级薪酬带宽", px.box(df_ctx, x='Tier', y='Final_Comp'), "差距。", "层级分布。", "ti2")
-            with c3: render_chart_box("Tier 1 列表", px.bar(df_ctx[df_ctx['Tier']=='Tier 1'].groupby('Company')['Final_Comp'].median().reset_index(), x='Company', y='Final_Comp'), "头部。", "第一梯队。", "ti3")
-            with c4: render_chart_box("层级技能偏好", px.histogram(df_ctx, x='Tier', color='Role_Group'), "结构。", "人才结构。", "ti4")
-            with c5: render_chart_box("层级流动性", px.scatter(df_ctx.groupby(['Tier','Role']).size().reset_index(name='c'), x='Tier', y='Role', size='c'), "分布。", "岗位气泡。", "ti5")
-            with c6: render_chart_box("层级股票比例", px.box(df_ctx, x='Tier', y='Equity_Ratio'), "激励。", "期权占比。", "ti6")
+            df_tier = agg['tiered']
+            with c1: render_chart_box("分层金字塔", lambda: px.pie(df_tier, names='Tier'), "占比。", "各层级占比。", "ti1")
+            with c2: render_chart_box("层级薪酬带宽", lambda: px.box(df_tier, x='Tier', y='Final_Comp'), "差距。", "层级分布。", "ti2")
+            with c3: render_chart_box("Tier 1 列表", lambda: px.bar(agg['tier1'], x='Company', y='Final_Comp'), "头部。", "第一梯队。", "ti3")
+            with c4: render_chart_box("层级技能偏好", lambda: px.histogram(df_tier, x='Tier', color='Role_Group'), "结构。", "人才结构。", "ti4")
+            with c5: render_chart_box("层级流动性", lambda: px.scatter(agg['mobility'], x='Tier', y='Role', size='c'), "分布。", "岗位气泡。", "ti5")
+            with c6: render_chart_box("层级股票比例", lambda: px.box(df_tier, x='Tier', y='Equity_Ratio'), "激励。", "期权占比。", "ti6")
 
         elif curr_dim == 'dim_trends':
-            trend = df_ctx.dropna(subset=['Date_Clean']).sort_values('Date_Clean')
-            with c1: render_chart_box("Offer 时间轴", px.scatter(trend, x='Date_Clean', y='Final_Comp', color='Company'), "密集期。", "时间分布。", "tr1")
-            trend['MA'] = trend['Final_Comp'].rolling(10).mean()
-            with c2: render_chart_box("趋势移动平均", px.line(trend, x='Date_Clean', y='MA'), "走势。", "MA10线。", "tr2")
-            with c3: render_chart_box("月度中位薪酬", px.bar(trend.groupby(trend['Date_Clean'].dt.to_period('M').astype(str))['Final_Comp'].median().reset_index(), x='Date_Clean', y='Final_Comp'), "波动。", "月度统计。", "tr3")
-            with c4: render_chart_box("招聘总量累积", px.line(trend, x='Date_Clean', y=range(1, len(trend)+1)), "增速。", "累积数量。", "tr4")
-            with c5: render_chart_box("公司活跃分布", px.scatter(trend, x='Date_Clean', y='Company'), "节奏。", "招聘时间点。", "tr5")
-            with c6: render_chart_box("资历要求变化", px.scatter(trend, x='Date_Clean', y='YOE_Clean', trendline='lowess'), "变化。", "年限趋势。", "tr6")
+            daily, monthly = agg['daily'], agg['monthly']
+            with c1: render_chart_box("Offer 时间轴", lambda: px.scatter(df_ctx, x='Date_Clean', y='Final_Comp', color='Company', custom_data=['UID']), "密集期。", "时间分布。", "tr1")
+            with c2: render_chart_box("趋势滚动均值", lambda: px.line(daily, x='Period', y='Roll_Comp'), "走势。", f"按日期滚动的 {dimensions.TREND_WINDOW} 时间窗平均薪酬。", "tr2")
+            with c3: render_chart_box("月度中位薪酬", lambda: px.bar(monthly, x='Period', y='P50'), "波动。", "月度统计。", "tr3")
+            with c4: render_chart_box("招聘总量累积", lambda: px.line(daily, x='Period', y='Cum_n'), "增速。", "累积数量。", "tr4")
+            with c5: render_chart_box("公司活跃分布", lambda: px.scatter(agg['activity'], x='Period', y='Company', size='n'), "节奏。", "各公司每周 Offer 数 (样本最多的 15 家)。", "tr5")
+            with c6: render_chart_box("资历要求变化", lambda: px.line(monthly, x='Period', y='YOE_Mean', markers=True), "变化。", "月度平均年限。", "tr6")
 
         elif curr_dim == 'dim_skills':
-            if df_skills.empty: st.warning("No Data")
+            if agg['empty']: st.warning("No Data")
             else:
-                top = df_skills['Skills_List'].value_counts().head(20).reset_index()
-                with c1: render_chart_box("Top 20 技能", px.bar(top, x='count', y='Skills_List', orientation='h'), "热门。", "频次排行。", "sk1")
-                with c2: render_chart_box("技能 Treemap", px.treemap(top, path=['Skills_List'], values='count'), "权重。", "矩形树图。", "sk2")
-                with c3: render_chart_box("技能-职能", px.scatter(df_skills.groupby(['Role_Group','Skills_List']).size().reset_index(name='c').nlargest(40,'c'), x='Role_Group', y='Skills_List', size='c'), "绑定。", "气泡图。", "sk3")
-                pay = df_skills.groupby('Skills_List')['Final_Comp'].median().nlargest(15).reset_index()
-                with c4: render_chart_box("高薪技能", px.bar(pay, x='Skills_List', y='Final_Comp'), "含金量。", "中位薪酬。", "sk4")
-                with c5: render_chart_box("资深技能", px.bar(df_skills.groupby('Skills_List')['YOE_Clean'].mean().nlargest(15).reset_index(), x='Skills_List', y='YOE_Clean'), "沉淀。", "平均年限。", "sk5")
-                with c6: render_chart_box("稀缺技能", px.bar(df_skills['Skills_List'].value_counts().tail(20).reset_index(), x='count', y='Skills_List'), "蓝海。", "长尾技能。", "sk6")
+                top = agg['top']
+                with c1: render_chart_box("Top 20 技能", lambda: px.bar(top, x='count', y='Skills_List', orientation='h'), "热门。", "频次排行。", "sk1")
+                with c2: render_chart_box("技能 Treemap", lambda: px.treemap(top, path=['Skills_List'], values='count'), "权重。", "矩形树图。", "sk2")
+                with c3: render_chart_box("技能-职能", lambda: px.scatter(agg['role_skill'], x='Role_Group', y='Skills_List', size='c'), "绑定。", "气泡图。", "sk3")
+                with c4: render_chart_box("高薪技能", lambda: px.bar(agg['pay'], x='Skills_List', y='Final_Comp'), "含金量。", "中位薪酬。", "sk4")
+                with c5: render_chart_box("资深技能", lambda: px.bar(agg['yoe'], x='Skills_List', y='YOE_Clean'), "沉淀。", "平均年限。", "sk5")
+                with c6: render_chart_box("稀缺技能", lambda: px.bar(agg['rare'], x='count', y='Skills_List'), "蓝海。", "长尾技能。", "sk6")
                 
         elif curr_dim == 'dim_clusters':
-             if df_skills.empty: st.warning("No Data")
+             if agg['empty']: st.warning("No Data")
              else:
-                top_tags = df_skills['Skills_List'].value_counts().head(20).index
-                df_s_filt = df_skills[df_skills['Skills_List'].isin(top_tags)]
-                with c1: render_chart_box("标签共现", px.scatter(df_s_filt, x='Company', y='Skills_List'), "指纹。", "使用情况。", "cl1")
-                with c2: render_chart_box("组合价值", px.box(df_s_filt, x='Skills_List', y='Final_Comp'), "定价。", "薪酬分布。", "cl2")
-                with c3: render_chart_box("流向映射", px.parallel_categories(df_s_filt, dimensions=['Role_Group', 'Skills_List']), "路径。", "桑基图。", "cl3")
-                with c4: render_chart_box("全景 Treemap", px.treemap(df_skills['Skills_List'].value_counts().reset_index().head(30), path=['Skills_List'], values='count'), "生态。", "全景图。", "cl4")
-                with c5: render_chart_box("技术栈偏好", px.histogram(df_s_filt, x='Company', color='Skills_List'), "构成。", "堆叠图。", "cl5")
-                with c6: render_chart_box("稀缺扫描", px.bar(df_skills['Skills_List'].value_counts().tail(20).reset_index(), x='count', y='Skills_List'), "长尾。", "低频词。", "cl6")
+                df_s_filt = agg['top_rows']
+                with c1: render_chart_box("标签共现", lambda: px.imshow(agg['cooccurrence'], color_continuous_scale='Blues'), "组合。", "Top 20 标签两两同时出现的 Offer 数。", "cl1")
+                with c2: render_chart_box("组合价值", lambda: px.box(df_s_filt, x='Skills_List', y='Final_Comp'), "定价。", "薪酬分布。", "cl2")
+                with c3: render_chart_box("流向映射", lambda: px.parallel_categories(df_s_filt, dimensions=['Role_Group', 'Skills_List']), "路径。", "桑基图。", "cl3")
+                with c4: render_chart_box("全景 Treemap", lambda: px.treemap(agg['panorama'], path=['Skills_List'], values='count'), "生态。", "全景图。", "cl4")
+                with c5: render_chart_box("技术栈偏好", lambda: px.histogram(df_s_filt, x='Company', color='Skills_List'), "构成。", "堆叠图。", "cl5")
+                with c6: render_chart_box("稀缺扫描", lambda: px.bar(agg['rare'], x='count', y='Skills_List'), "长尾。", "低频词。", "cl6")
         
         else:
-            with c1: render_chart_box("通用分布", px.histogram(df_ctx, x='Final_Comp', color='Company'), "Dist.", "分布。", "g1")
-            with c2: render_chart_box("通用箱线", px.box(df_ctx, x='Company', y='Final_Comp'), "Box.", "带宽。", "g2")
-            with c3: render_chart_box("通用散点", px.scatter(df_ctx, x='YOE_Clean', y='Final_Comp'), "Scatter.", "散点。", "g3")
-            with c4: render_chart_box("通用排行", px.bar(df_ctx.groupby('Company')['Final_Comp'].mean().reset_index(), x='Company', y='Final_Comp'), "Bar.", "排行。", "g4")
-            with c5: render_chart_box("通用趋势", px.line(df_ctx.sort_values('Date_Clean'), x='Date_Clean', y='Final_Comp'), "Line.", "趋势。", "g5")
-            with c6: render_chart_box("通用热力", px.density_heatmap(df_ctx, x='YOE_Clean', y='Final_Comp'), "Heat.", "热力。", "g6")
+            # 声明式维度：图表类型、数据集与编码均来自 mconly.specs
+            for col, chart in zip([c1, c2, c3, c4, c5, c6], SPECS[curr_dim]['charts']):
+                with col: render_chart_box(chart.title, lambda chart=chart: build_chart(chart.kind, agg[chart.data], chart.encode), chart.insight, chart.explanation, chart.key)
 
 # --- C. List View ---
 elif st.session_state.view == 'List':
     render_floating_buttons()
     st.markdown("## 📋 深度数据列表")
+    LIST_COLUMNS = ['Company', 'Role', 'Final_Comp', 'Base_Clean', 'Stock_Clean', 'YOE_Clean', 'Level', 'Location', 'Date_Clean', 'URL', 'UID']
+    LIST_SORTABLE = ['Final_Comp', 'Base_Clean', 'Stock_Clean', 'YOE_Clean', 'Date_Clean', 'Company', 'Role', 'Level', 'Location']
+    # 服务端分页：检索 / 排序 / 切页都在服务端完成，只有当前页的行序列化给浏览器
+    l1, l2, l3, l4 = st.columns([3, 1.5, 1, 1])
+    with l1: st.text_input("🔎 检索 Company / Role / Location / Tags", key='list_search', on_change=reset_list_page, placeholder="多个词之间为 AND，按前缀匹配")
+    with l2: st.selectbox("排序", ['(默认)'] + LIST_SORTABLE, key='list_sort', on_change=reset_list_page)
+    with l3: st.toggle("降序", key='list_desc', on_change=reset_list_page)
+    with l4: st.selectbox("每页", [25, 50, 100, 200], key='list_page_size', on_change=reset_list_page)
+
+    with prof.stage('list') as s:
+        list_index = get_list_index(engine.version, df_master)
+        positions = filter_index.positions(Company=ctx_key[0], Role=ctx_key[1], Region_Group=ctx_key[2])
+        sort_col = None if st.session_state.list_sort == '(默认)' else st.session_state.list_sort
+        page_pos, total = list_index.page(positions, st.session_state.list_search, sort_col, not st.session_state.list_desc,
+                                          st.session_state.list_page, st.session_state.list_page_size)
+        df_page = df_master.iloc[page_pos][LIST_COLUMNS]
+        s['rows'] = total
+
+    pages = listing.page_count(total, st.session_state.list_page_size)
+    st.session_state.list_page = min(st.session_state.list_page, pages)
     event = st.dataframe(
-        df_ctx[['Company', 'Role', 'Final_Comp', 'Base_Clean', 'Stock_Clean', 'YOE_Clean', 'Level', 'Location', 'Date_Clean', 'URL', 'UID']],
+        df_page,
         column_config={
             "Final_Comp": st.column_config.NumberColumn("Total($)", format="$%d"),
             "URL": st.column_config.LinkColumn("Source", display_text="🔗 点击校对")
         },
-        use_container_width=True, on_select="rerun", selection_mode="single-row", height=700
+        use_container_width=True, on_select="rerun", selection_mode="single-row", height=700, hide_index=True
     )
-    if len(event.selection.rows) > 0: change_view('Profile', uid=df_ctx.iloc[event.selection.rows[0]]['UID'])
+    p1, p2 = st.columns([1, 4])
+    with p1: st.number_input("页码", min_value=1, max_value=pages, step=1, key='list_page')
+    with p2: st.caption(f"共 {total:,} 条 · 第 {st.session_state.list_page} / {pages} 页")
+    if len(event.selection.rows) > 0: change_view('Profile', uid=df_page.iloc[event.selection.rows[0]]['UID'])
 
 # --- D. Profile View ---
 elif st.session_state.view == 'Profile':
     render_floating_buttons()
     uid = st.session_state.sel_uid
-    row = df_master[df_master['UID'] == uid].iloc[0]
+    uid_pos = get_uid_index(engine.version, df_master)
+    if uid not in uid_pos and engine is not snapshot.engine:
+        # 被排除的标记行仍可下钻 (此时同侪定位基于全量数据)
+        engine = snapshot.engine; df_master = engine.master
+        uid_pos = get_uid_index(engine.version, df_master)
+    if uid not in uid_pos:
+        st.warning("该记录已不在当前数据版本中 (Offer no longer available)."); st.stop()
+    pos = uid_pos.get_loc(uid)
+    row = df_master.iloc[pos]
     st.markdown(f"""
     <div style="background:white; border-radius:16px; border:1px solid #E2E8F0; padding:32px; margin-bottom:24px; box-shadow:0 4px 12px rgba(0,0,0,0.05);">
         <h1 style="margin:0; font-size:32px; font-weight:800; color:#0F172A;">{row['Role']}</h1>
@@ -750,11 +683,44 @@ elif st.session_state.view == 'Profile':
     """, unsafe_allow_html=True)
     c1, c2 = st.columns(2)
     with c1: st.write("**Comp Details**", row[['Base_Clean','Stock_Clean','Bonus_Clean','Equity_Ratio']].to_dict())
-    with c2: st.write("**Context**", row[['YOE_Clean','Level','Date_Clean','Source']].to_dict())
-    
+    with c2: st.write("**Context**", {**row[['YOE_Clean','Level','Date_Clean','Source']].to_dict(), 'Data_Quality': ', '.join(quality.reasons(row['DQ_Flags'])) or 'OK'})
+
+    # 同侪定位：百分位与市场分位为查表，相似 Offer 为一次 KD 树近邻查询 (索引随数据版本预建)
+    with prof.stage('profile:peers'):
+        peer = engine.profile(pos)
+    pct = lambda v: '—' if pd.isna(v) else f"P{v * 100:.0f}"
+    money = lambda v: '—' if pd.isna(v) else f"${v:,.0f}"
+    market = peer['market'] or {'count': 0, 'p25': np.nan, 'median': np.nan, 'p75': np.nan}
+    deviation = row['Final_Comp'] / market['median'] - 1 if market['median'] and pd.notna(market['median']) else np.nan
+    k1, k2, k3, k4 = st.columns(4)
+    with k1: render_kpi_card("公司内百分位", pct(peer['company_pct']), f"{row['Company']} 内薪酬不高于此 Offer 的占比")
+    with k2: render_kpi_card("同侪组百分位", pct(peer['peer_pct']), f"同公司 · 职能 · 区域 N={0 if pd.isna(peer['peer_n']) else int(peer['peer_n'])}")
+    with k3: render_kpi_card("市场中位 (同岗位同区域)", money(market['median']), f"P25 {money(market['p25'])} · P75 {money(market['p75'])} · N={int(market['count'])}")
+    with k4: render_kpi_card("相对市场中位", '—' if pd.isna(deviation) else f"{deviation:+.0%}", "全部公司同 Role × Region_Group")
+
+    st.markdown("**相似 Offer** (按年限、总包、股票占比的标准化距离)")
+    similar = peer['similar']
+    event = st.dataframe(similar, column_config={"Final_Comp": st.column_config.NumberColumn("Total($)", format="$%d")},
+                         use_container_width=True, hide_index=True, on_select="rerun", selection_mode="single-row", key=f"profile_similar_{uid}")
+    if len(event.selection.rows) > 0: change_view('Profile', uid=similar.iloc[event.selection.rows[0]]['UID']); st.rerun()
+
     if pd.notna(row.get('URL')) and str(row['URL']).startswith('http'):
         st.markdown(f"""
         <a href="{row['URL']}" target="_blank" style="display:block; margin-top:24px; background:#2563EB; color:white; text-align:center; padding:16px; border-radius:12px; text-decoration:none; font-weight:700; transition:all 0.2s; box-shadow: 0 4px 6px rgba(37,99,235,0.2);">
             🔗 前往原始网页校对数据 (Verify on Source)
         </a>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        """, unsafe_allow_html=True)
+
+# ==========================================
+# 9. Profiling 调试面板
+# ==========================================
+if prof.enabled:
+    with st.expander("⏱️ PROFILING - 本次 rerun 热路径耗时", expanded=False):
+        st.dataframe(prof.frame(), use_container_width=True, hide_index=True)
+        st.markdown(f"**滚动统计** (进程内各阶段最近 {profiling.WINDOW} 次，按 p95 排序)")
+        st.dataframe(profiling.STATS.summary(), use_container_width=True, hide_index=True)
+        st.markdown("**跨会话结果缓存**")
+        st.json(RESULTS.stats())
+        st.markdown("**后台数据刷新**")
+        st.json(refresher.status())
+        st.download_button("⬇️ Export JSON", profiling.STATS.to_json(), file_name="mconly-profile.json", mime="application/json")
@@ -0,0 +1 @@
+"""GATE 薪酬情报引擎 (mconly) —— dashboard_pro.py 背后的数据处理层。"""
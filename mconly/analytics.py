@@ -0,0 +1,119 @@
+"""看板与离线报表共用的分析引擎。
+
+KPI、诊断文案与各维度聚合都在这里计算，只依赖 pandas / numpy，不导入 streamlit 或 plotly；
+看板负责渲染，``python -m mconly.report`` 负责批量导出。
+"""
+import os
+from functools import cached_property
+
+import numpy as np
+
+from mconly import dimensions, quality
+from mconly.cube import ALL, build_cube
+from mconly.peers import TOP_K, PeerIndex
+from mconly.views import FilterIndex
+
+COMPACT_MODE = os.environ.get('MCONLY_COMPACT', '1') != '0'
+# 看板检查源文件是否变化的间隔 (秒)
+SOURCE_TTL = float(os.environ.get('MCONLY_SOURCE_TTL', '60'))
+
+
+def load(data_dir='.', cache_dir=None, compact=None):
+    """按看板相同的存储模式加载 master frame，并附上该数据版本的数据质量标记 (见 ``mconly.quality``)。"""
+    from mconly import store
+    from mconly.compact import load_compact
+    compact = COMPACT_MODE if compact is None else compact
+    return quality.annotate(load_compact(data_dir, cache_dir) if compact else store.load_master(data_dir, cache_dir))
+
+
+def source_version(data_dir='.', cache_dir=None):
+    from mconly import store
+    return store.data_version(data_dir, cache_dir)
+
+
+def kpis(cube, filters=(ALL, ALL, ALL)):
+    cell = cube.cell(*filters)
+    mean = cell[('Final_Comp', 'mean')]
+    return {
+        'n': int(cell[('Final_Comp', 'count')]),
+        'p50': cell[('Final_Comp', 'median')],
+        **{q: cell[('Final_Comp', q)] for q in ('p10', 'p25', 'p75', 'p90')},
+        'hourly': cell[('Hourly_Rate', 'mean')],
+        'max': cell[('Final_Comp', 'max')],
+        'cv': cell[('Final_Comp', 'std')] / mean if mean else np.nan,
+    }
+
+
+def insight(context, df):
+    if df.empty: return {'obs':"暂无数据", 'dia':"需补充数据源", 'act':"请清除筛选条件"}
+    avg = df['Final_Comp'].median()
+    res = {'obs':"", 'dia':"", 'act':""}
+
+    if context == 'Overview':
+        res['obs'] = f"**[样本监测]** 实时追踪 `{len(df)}` 个薪酬数据点。全市场中位数 `${avg:,.0f}`。"
+        res['dia'] = "**[市场特征]** 数据呈现明显的分层结构。Tier 1 交易所与 DAO 组织的薪酬体系差异显著。"
+        res['act'] = "**[操作建议]** 探索下方的 **'⚔️ 竞对深度对标'** 模块，进行 Company vs Company 的精确比对。"
+    elif context == 'dim_compare':
+        res['obs'] = f"**[对标状态]** 正在对比 `{len(df['Company'].unique())}` 家公司的 `{len(df)}` 个 Offer。"
+        res['dia'] = "**[差异分析]** 箱线图的上限代表了该公司的最高支付意愿，下限代表起薪门槛。请注意各公司在同一岗位上的定价断层。"
+        res['act'] = "**[决策辅助]** 利用上方的控制器切换对标公司和岗位。点击图表中的点可直接查看对应的 JD/Offer 详情。"
+    else:
+        res['obs'] = f"**[当前维度]** 有效样本 N=`{len(df)}`。该维度下的薪酬峰值为 `${df['Final_Comp'].max():,.0f}`。"
+        res['dia'] = "**[分布诊断]** 请注意图表中的异常高值点，它们通常代表了该细分领域的定价天花板。"
+        res['act'] = "**[交互提示]** 所有的柱状图和散点图均支持点击交互，可直接穿透至原始数据列表。"
+    return res
+
+
+class Engine:
+    """一个数据版本的分析上下文：master、筛选索引与预聚合立方体各构建一次。"""
+
+    def __init__(self, master, cube=None, index=None, version=None):
+        self.master = master
+        self.version = version or master.attrs.get('data_version')
+        self.index = index or FilterIndex(master)
+        self.cube = cube or build_cube(master)
+
+    @cached_property
+    def screened(self):
+        """排除 DQ_Exclude 行 (解析失败 / 总包为 0 / 离群) 后的引擎，首次使用时构建。
+
+        子集保留 master 的行标签与 data_version，结果缓存使用独立的版本键。
+        """
+        if 'DQ_Exclude' not in self.master.columns: return self
+        return Engine(self.master[~self.master['DQ_Exclude'].to_numpy()], version=f'{self.version}:dq')
+
+    @cached_property
+    def peers(self):
+        # Profile 下钻用的同侪索引，首次使用时构建
+        return PeerIndex(self.master)
+
+    def profile(self, pos, k=TOP_K):
+        """master 第 ``pos`` 行的同侪定位 (见 ``PeerIndex.bundle``)。"""
+        return self.peers.bundle(self.master, self.cube, pos, k)
+
+    def source(self, company=ALL, role=ALL, region=ALL):
+        filters = dimensions.normalize_filters((company, role, region))
+        ctx = dimensions.view(self.master, self.index, filters, self.version)
+        return dimensions.DimSource(ctx, self.master, self.cube, self.index, filters, self.version)
+
+    def kpis(self, company=ALL, role=ALL, region=ALL):
+        return kpis(self.cube, (company, role, region))
+
+    def insight(self, context, company=ALL, role=ALL, region=ALL):
+        return insight(context, self.source(company, role, region).ctx)
+
+    def dimension(self, dim, company=ALL, role=ALL, region=ALL, **params):
+        return dimensions.compute(dim, self.source(company, role, region), **params)
+
+    def dimension_each(self, dim, companies=None, role=ALL, region=ALL):
+        """每家公司 (缺省为全部) 在同一 role / region 筛选下的 ``dim`` 结果 {公司: 结果}。
+
+        注册了批量版本的维度 (``dimensions.EACH``) 在整个范围上计算一次再按公司拆分，其余维度逐家计算。
+        """
+        companies = self.companies() if companies is None else list(companies)
+        if dim in dimensions.EACH:
+            return dimensions.EACH[dim](self.source(ALL, role, region), companies)
+        return {c: self.dimension(dim, c, role, region) for c in companies}
+
+    def companies(self):
+        return sorted(self.master['Company'].dropna().astype(str).unique().tolist())
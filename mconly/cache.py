@@ -0,0 +1,119 @@
+"""进程内跨会话共享的结果缓存。
+
+维度聚合与筛选后的子集 frame 按 (数据版本, 归一化的筛选元组, ...) 缓存在 ``RESULTS`` 中，
+同一进程内所有会话共用：多名分析师停留在相同筛选上时，同一份 groupby 只计算一次。
+
+* LRU 淘汰，同时受条目数 (``MAX_ENTRIES``) 与估算字节数 (``MAX_BYTES``，``MCONLY_RESULT_CACHE_MB``) 约束；
+* 条目超过 ``TTL`` 秒 (``MCONLY_RESULT_TTL``，0 为不过期) 后重算；数据版本变化 (源文件指纹变化) 时
+  ``retain`` 立即丢弃旧版本的全部条目；
+* 同一键的并发构建只执行一次，其余请求等待其结果；
+* 命中 / 未命中 / 淘汰 / 过期计数见 ``stats()``。
+
+缓存的值在会话间共享，调用方视为只读。
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_ENTRIES = int(os.environ.get('MCONLY_RESULT_CACHE_ENTRIES', '512'))
+MAX_BYTES = int(float(os.environ.get('MCONLY_RESULT_CACHE_MB', '256')) * 2**20)
+TTL = float(os.environ.get('MCONLY_RESULT_TTL', '3600'))
+
+
+def nbytes(value):
+    """值的估算内存：frame 按列缓冲区 (不深入 object 单元格)，容器逐项累加。"""
+    if isinstance(value, pd.DataFrame): return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series): return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, pd.Index): return int(value.memory_usage(deep=False))
+    if isinstance(value, np.ndarray): return value.nbytes
+    if isinstance(value, dict): return sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)): return sum(nbytes(v) for v in value)
+    if hasattr(value, '__dict__'): return nbytes(vars(value))
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, ttl=TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self.counters = dict.fromkeys(['hits', 'misses', 'evictions', 'expirations'], 0)
+        # key -> (value, 字节数, 写入时间, 数据版本)
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None: return None
+        if self.ttl and time.monotonic() - entry[2] > self.ttl:
+            self._drop(key)
+            self.counters['expirations'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key):
+        self.nbytes -= self._entries.pop(key)[1]
+
+    def get(self, key, build, version=None):
+        """返回 key 的缓存值，未命中时调用 ``build()``；``version`` 供 ``retain`` 按数据版本失效。"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.counters['hits'] += 1
+                return entry[0]
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    # 等待期间已由其他会话构建完成
+                    self.counters['hits'] += 1
+                    return entry[0]
+                self.counters['misses'] += 1
+            try:
+                value = build()
+                self._put(key, value, version)
+            finally:
+                with self._lock: self._building.pop(key, None)
+        return value
+
+    def _put(self, key, value, version):
+        size = nbytes(value)
+        with self._lock:
+            if key in self._entries: self._drop(key)
+            self._entries[key] = (value, size, time.monotonic(), version)
+            self.nbytes += size
+            # 最新条目自身超过上限时也保留 (本次请求仍需返回它)，只淘汰更旧的条目
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.counters['evictions'] += 1
+
+    def retain(self, version):
+        """丢弃数据版本不是 ``version`` 的条目 (未标注版本的条目保留)。"""
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if e[3] is not None and e[3] != version]
+            for k in stale: self._drop(k)
+            self.counters['expirations'] += len(stale)
+
+    def stats(self):
+        with self._lock:
+            total = self.counters['hits'] + self.counters['misses']
+            return {**self.counters, 'hit_rate': self.counters['hits'] / total if total else None,
+                    'entries': len(self._entries), 'mb': round(self.nbytes / 2**20, 2),
+                    'max_mb': round(self.max_bytes / 2**20, 2), 'ttl_s': self.ttl}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+RESULTS = ResultCache()
@@ -0,0 +1,70 @@
+"""基于规则表的地区 / 职能归类。
+
+规则表 (默认 ``mconly/rules.json``，可用 ``MCONLY_RULES`` 指向自定义文件) 中每个分类
+给出目标列、输入列、缺省标签与有序的 (标签, 正则) 列表，先命中者优先。新增地区或岗位族
+只需编辑规则表。归类只在去重后的输入值 (多列时为值组合) 上做一次正则匹配，结果按值
+缓存，再经 factorize 编码广播回各行，代价随基数而非行数增长。
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+RULES_PATH = os.environ.get('MCONLY_RULES') or os.path.join(os.path.dirname(__file__), 'rules.json')
+SEPARATOR = ' | '
+
+_memo = {}
+_lock = threading.Lock()
+
+
+def load_rules(path=RULES_PATH):
+    with open(path, encoding='utf-8') as f: return json.load(f)
+
+RULES = load_rules()
+# 规则表参与缓存键：修改规则后旧的 master 产物自动失效
+RULES_DIGEST = hashlib.sha256(json.dumps(RULES, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:12]
+
+
+def _label(table, texts):
+    # texts: 去重后的小写文本；按规则顺序 np.select，先命中者优先
+    conds = [texts.str.contains(pattern, regex=True) for _, pattern in table['rules']]
+    return np.select(conds, [label for label, _ in table['rules']], default=table['default'])
+
+
+def _lookup(table, texts):
+    key = json.dumps(table, sort_keys=True, ensure_ascii=False)
+    with _lock:
+        known = _memo.setdefault(key, {})
+        missing = [t for t in set(texts) if t not in known]
+    if missing:
+        labels = _label(table, pd.Series(missing, dtype=object))
+        with _lock: known.update(zip(missing, labels.tolist()))
+    return np.array([known[t] for t in texts], dtype=object)
+
+
+def classify(df, name, rules=None):
+    """按规则表 ``name`` 对 df 归类，返回与 df 行对齐的标签数组。"""
+    table = (rules or RULES)[name]
+    cols = [df[c] if c in df.columns else pd.Series(np.nan, index=df.index) for c in table['columns']]
+    codes, uniques = zip(*(pd.factorize(c) for c in cols))
+    # 逐列编码组合为一个整数键 (缺失值编码为 0)，再 factorize 得到出现过的值组合
+    combined = np.zeros(len(df), dtype=np.int64)
+    for c, u in zip(codes, uniques): combined = combined * (len(u) + 1) + (c + 1)
+    row_codes, keys = pd.factorize(combined)
+
+    parts = []
+    for u in reversed(uniques):
+        width = len(u) + 1
+        parts.append(np.insert(np.asarray(u, dtype=object).astype(str), 0, '')[keys % width])
+        keys = keys // width
+    texts = [SEPARATOR.join(p).lower() for p in zip(*reversed(parts))]
+    return _lookup(table, texts)[row_codes]
+
+
+def classify_frame(df, rules=None):
+    for name, table in (rules or RULES).items():
+        df[table['target']] = classify(df, name, rules)
+    return df
@@ -0,0 +1,49 @@
+"""master frame 的紧凑存储模式。
+
+低基数维度转为 category，派生比率 / 时薪等指标降为 float32，原始字符串列
+(Total / Base / ... 等已有 ``*_Clean`` 副本的列) 从常驻内存中移除，只保留在 Arrow 产物中；
+依赖原始字符串的判断 (解析失败 ``DQ_Parse``、年限缺失 ``YOE_Missing``) 在 ETL 清洗时记为列。
+
+    python -m mconly.compact        # 打印当前数据的逐列内存报告
+"""
+import pandas as pd
+
+from mconly import store
+
+CATEGORY_COLUMNS = ['Company', 'Role', 'Region', 'Location', 'Region_Group', 'Role_Group', 'Level', 'URL', 'Source', 'Source_File', 'Tags']
+FLOAT32_COLUMNS = ['Equity_Ratio', 'Hourly_Rate', 'Net_Pay_Est']
+RESIDENT_COLUMNS = CATEGORY_COLUMNS + FLOAT32_COLUMNS + [
+    'UID', 'Total_Clean', 'Base_Clean', 'Stock_Clean', 'Bonus_Clean', 'Final_Comp', 'YOE_Clean', 'YOE_Missing', 'Date_Clean', 'Skills_List', 'DQ_Parse']
+
+
+def compact_frame(df):
+    # 不在 RESIDENT_COLUMNS 中的列 (原始金额 / 日期字符串及未映射的源列) 一律懒加载
+    out = df[[c for c in RESIDENT_COLUMNS if c in df.columns]].copy()
+    for c in CATEGORY_COLUMNS:
+        if c in out.columns: out[c] = out[c].astype('category')
+    for c in FLOAT32_COLUMNS:
+        if c in out.columns: out[c] = out[c].astype('float32')
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def load_compact(data_dir='.', cache_dir=None):
+    return compact_frame(store.load_master(data_dir, cache_dir, columns=RESIDENT_COLUMNS))
+
+
+def memory_report(before, after):
+    b = before.memory_usage(deep=True, index=False)
+    a = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str), 'bytes_before': b,
+        'dtype_after': after.dtypes.astype(str).reindex(b.index).fillna('(lazy)'), 'bytes_after': a.reindex(b.index).fillna(0).astype(int),
+    })
+    report.loc['TOTAL'] = ['', b.sum(), '', a.sum()]
+    report['ratio'] = (report['bytes_after'] / report['bytes_before']).round(3)
+    return report
+
+
+if __name__ == '__main__':
+    full = store.load_master()
+    with pd.option_context('display.max_rows', None, 'display.width', 160):
+        print(memory_report(full, compact_frame(full)))
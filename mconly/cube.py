@@ -0,0 +1,74 @@
+"""Company × Role × Region_Group 预聚合立方体。
+
+每个数据版本构建一次：对筛选维度的全部 2^3 个组合 (含 'All' 汇总) 直接 groupby 计数 / 均值等，
+中位数与 P10-P90 由有序数组分位数引擎 (mconly.quantiles) 一次排序后对全部组合给出，同样是精确值。
+看板的 KPI 与柱状图按当前筛选状态直接查表，不再对 df_ctx 做 pandas 扫描。
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from mconly.quantiles import QUANTILES, QuantileIndex
+
+ALL = 'All'
+CUBE_DIMS = ['Company', 'Role', 'Region_Group']
+CUBE_MEASURES = ['Final_Comp', 'Hourly_Rate', 'Equity_Ratio']
+
+
+def _grouping_stats(df, grouped, dims, measures):
+    by = list(grouped) if grouped else np.zeros(len(df), dtype=np.int8)
+    g = df.groupby(by, observed=True, sort=False)[measures]
+    parts = {'count': g.count(), 'mean': g.mean(), 'std': g.std(), 'max': g.max()}
+    out = pd.concat(parts, axis=1).swaplevel(axis=1)
+
+    keys = out.index.to_frame(index=False) if grouped else pd.DataFrame(index=range(len(out)))
+    for d in dims:
+        if d not in grouped: keys[d] = ALL
+    out.index = pd.MultiIndex.from_frame(keys[dims].astype(object))
+    return out
+
+
+def build_cube(df, dims=CUBE_DIMS, measures=CUBE_MEASURES):
+    frames = [_grouping_stats(df, grouped, dims, measures)
+              for r in range(len(dims) + 1) for grouped in itertools.combinations(dims, r)]
+    frame = pd.concat(frames)
+    frame = frame.join(QuantileIndex(df, dims, measures, QUANTILES).table()).sort_index(axis=1)
+    return AggregateCube(frame, dims)
+
+
+class AggregateCube:
+    """预聚合结果：``cell`` 为字典查表，``by`` 返回沿某一维展开的切片 (结果按参数缓存)。"""
+
+    def __init__(self, frame, dims):
+        self.frame = frame
+        self.dims = list(dims)
+        self._cells = dict(zip(frame.index, frame.to_dict('records')))
+        self._slices = {}
+
+    def cell(self, company=ALL, role=ALL, region=ALL):
+        # 空组合 (筛选后无样本) 返回全 NaN，count 为 0
+        key = (company, role, region)
+        if key not in self._cells:
+            return {col: (0 if col[1] == 'count' else np.nan) for col in self.frame.columns}
+        return self._cells[key]
+
+    def stat(self, measure, stat, company=ALL, role=ALL, region=ALL):
+        return self.cell(company, role, region)[(measure, stat)]
+
+    def by(self, dim, measure, stat, company=ALL, role=ALL, region=ALL):
+        key = (dim, measure, stat, company, role, region)
+        if key not in self._slices:
+            fixed = dict(zip(self.dims, (company, role, region)))
+            mask = np.ones(len(self.frame), dtype=bool)
+            for d in self.dims:
+                level = self.frame.index.get_level_values(d)
+                if d == dim:
+                    mask &= level != ALL
+                    if fixed[d] != ALL: mask &= level == fixed[d]
+                else:
+                    mask &= level == fixed[d]
+            s = self.frame.loc[mask, (measure, stat)]
+            s.index = s.index.get_level_values(dim)
+            self._slices[key] = s.sort_index().rename(measure).rename_axis(dim)
+        return self._slices[key]
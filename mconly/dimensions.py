@@ -0,0 +1,378 @@
+"""分析维度聚合注册表。
+
+每个 ``dim_*`` 维度注册一个计算函数，返回该视图图表所需的聚合结果 (dict)。
+计算是惰性的：只有进入对应视图时才执行，结果按 (维度, 筛选状态, 数据版本, 参数)
+记忆化在进程级结果缓存 (``mconly.cache.RESULTS``) 中，切换视图只付出目标视图自身的代价，
+相同筛选下的其他会话直接命中。返回的 frame 在会话间共享，调用方视为只读。
+
+``GENERIC_DIMS`` 不写专门的函数，由 ``mconly.specs`` 中的声明经 ``evaluate_spec`` 统一计算。
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from mconly import quality
+from mconly.cache import RESULTS
+from mconly.cube import ALL
+from mconly.skills import build_skill_index
+from mconly.specs import SPECS
+from mconly.timeseries import TimeSeriesIndex
+from mconly.views import filtered_view
+
+# 由声明式规格驱动的维度 (见 mconly.specs)
+GENERIC_DIMS = list(SPECS)
+# dim_trends 的滚动时间窗
+TREND_WINDOW = '28D'
+
+# ctx: 全局筛选后的视图; master: 全量只读 frame; cube / index: 预聚合立方体与筛选索引;
+# filters: (company, role, region); version: 数据版本
+DimSource = namedtuple('DimSource', ['ctx', 'master', 'cube', 'index', 'filters', 'version'])
+
+DIMENSIONS = {}
+# 批量导出用的逐公司版本：fn(src, companies) -> {公司: 结果}，src 的公司筛选为 'All'
+EACH = {}
+
+
+def register(*keys, uses_filters=True):
+    # uses_filters=False 的维度不受全局筛选影响，记忆化键中不含筛选状态
+    def deco(fn):
+        for k in keys: DIMENSIONS[k] = (fn, uses_filters)
+        return fn
+    return deco
+
+
+def register_each(*keys):
+    def deco(fn):
+        for k in keys: EACH[k] = fn
+        return fn
+    return deco
+
+
+def _freeze(v):
+    return tuple(v) if isinstance(v, (list, tuple)) else v
+
+
+def normalize_filters(filters):
+    # 缺省 / 空值视为 'All'，取值统一为 str，保证不同会话的同一筛选得到同一个缓存键
+    return tuple(ALL if f is None or (isinstance(f, float) and np.isnan(f)) or f == '' else str(f) for f in filters)
+
+
+def compute(dim, src, **params):
+    fn, uses_filters = DIMENSIONS.get(dim, DIMENSIONS['dim_structure'])
+    key = (dim, normalize_filters(src.filters) if uses_filters else None, src.version, tuple(sorted((k, _freeze(v)) for k, v in params.items())))
+    return RESULTS.get(key, lambda: fn(src, **params), src.version)
+
+
+def view(master, index, filters, version):
+    """筛选后的子集 frame，按 (数据版本, 筛选元组) 跨会话缓存；全部为 'All' 时即 master 本身，不入缓存。"""
+    filters = normalize_filters(filters)
+    build = lambda: filtered_view(master, index, Company=filters[0], Role=filters[1], Region_Group=filters[2])
+    if all(f == ALL for f in filters): return build()
+    return RESULTS.get(('_view', filters, version), build, version)
+
+
+def clear():
+    RESULTS.clear()
+
+
+# ==========================================
+# 维度实现 (Dimension Implementations)
+# ==========================================
+def skill_index(src):
+    # 倒排索引与 master 行位置对齐，每个数据版本只构建一次
+    return RESULTS.get(('_skills', src.version), lambda: build_skill_index(src.master), src.version)
+
+
+def series_index(src):
+    # 日 / 周 / 月分桶的时间序列，每个数据版本一份，构建时各频率一并分桶
+    return RESULTS.get(('_series', src.version), lambda: TimeSeriesIndex(src.master), src.version)
+
+
+def quality_index(src):
+    # 按 (筛选维度, 源文件, 标记组合) 预聚合的数据质量计数，每个数据版本一份
+    return RESULTS.get(('_quality', src.version), lambda: quality.QualityIndex(src.master), src.version)
+
+
+@register('dim_market')
+def dim_market(src):
+    comp = np.sort(src.ctx['Final_Comp'].to_numpy())
+    return {
+        'p50': src.cube.by('Company', 'Final_Comp', 'median', *src.filters).reset_index().sort_values('Final_Comp').tail(15),
+        'lorenz': pd.DataFrame({'CP': np.linspace(0, 1, len(comp)), 'CC': comp.cumsum() / comp.sum()}),
+    }
+
+
+@register('dim_hourly')
+def dim_hourly(src):
+    return {
+        'by_company': src.cube.by('Company', 'Hourly_Rate', 'mean', *src.filters).reset_index(),
+        'low': src.ctx[src.ctx['Hourly_Rate'] < 50],
+    }
+
+
+@register('dim_tiering')
+def dim_tiering(src):
+    meds = src.cube.by('Company', 'Final_Comp', 'median', *src.filters)
+    q33 = meds.quantile(0.33); q66 = meds.quantile(0.66)
+    # 先对每家公司定层，再按公司一次向量化映射到行；不在 meds 中的公司 (中位数视为 0) 落入 Tier 3
+    tiers = pd.Series(np.select([meds > q66, meds > q33], ['Tier 1', 'Tier 2'], 'Tier 3'), index=meds.index)
+    tiered = src.ctx.assign(Tier=src.ctx['Company'].map(tiers).astype(object).fillna('Tier 3'))
+    return {
+        'tiered': tiered,
+        'quantiles': {'q33': q33, 'q66': q66},
+        'tier1': meds[meds > q66].reset_index(),
+        'mobility': tiered.groupby(['Tier', 'Role'], observed=True).size().reset_index(name='c'),
+    }
+
+
+MARKET_BANDS = ['<P10', 'P10-P25', 'P25-P50', 'P50-P75', 'P75-P90', '>P90']
+
+
+def market_deviation(src, measure='Final_Comp'):
+    """每行相对同 Role × Region_Group 市场 (全部公司) 分位数的偏离：Market_P50 与 Deviation (比值 - 1)，
+    以及行所在的市场分位区间 (<P10 ... >P90)。市场分位数取自立方体，按行键一次向量化对齐；返回与 ctx 对齐的列。"""
+    ctx = src.ctx
+    market = src.cube.frame.xs(ALL, level='Company', drop_level=False)[measure]
+    keys = pd.MultiIndex.from_arrays([np.full(len(ctx), ALL, dtype=object), ctx['Role'].astype(object), ctx['Region_Group'].astype(object)])
+    q = market.reindex(keys)
+    cuts = q[['p10', 'p25', 'median', 'p75', 'p90']].to_numpy()
+    value = ctx[measure].to_numpy(dtype=float, na_value=np.nan)
+    band = np.array(MARKET_BANDS, dtype=object)[(value[:, None] > cuts).sum(axis=1)]
+    p50 = q['median'].to_numpy()
+    deviation = np.divide(value, p50, out=np.full(len(ctx), np.nan), where=p50 > 0) - 1
+    return {'Market_P50': p50, 'Deviation': deviation, 'Market_Band': pd.Categorical(np.where(np.isnan(value) | np.isnan(p50), None, band), categories=MARKET_BANDS, ordered=True)}
+
+
+@register('dim_trends')
+def dim_trends(src):
+    ts = series_index(src)
+    return {
+        'daily': ts.series(src.filters, 'D', window=TREND_WINDOW),
+        'monthly': ts.series(src.filters, 'M'),
+        'activity': ts.series(src.filters, 'W', by='Company', top=15),
+    }
+
+
+@register_each('dim_trends')
+def dim_trends_each(src, companies):
+    ts = series_index(src)
+    daily = ts.series_each(src.filters, companies, 'D', window=TREND_WINDOW)
+    monthly = ts.series_each(src.filters, companies, 'M')
+    activity = ts.series_each(src.filters, companies, 'W', by='Company', top=15)
+    return {c: {'daily': daily[c], 'monthly': monthly[c], 'activity': activity[c]} for c in companies}
+
+
+@register('dim_skills', uses_filters=False)
+def dim_skills(src):
+    idx = skill_index(src)
+    if idx.empty: return {'empty': True}
+    counts = idx.counts().reset_index()
+    return {
+        'empty': False,
+        'top': counts.head(20),
+        'role_skill': idx.crosstab(src.master['Role_Group']).nlargest(40, 'c'),
+        'pay': idx.agg(src.master['Final_Comp'], 'median').nlargest(15).reset_index(),
+        'yoe': idx.agg(src.master['YOE_Clean'], 'mean').nlargest(15).reset_index(),
+        'rare': counts.tail(20),
+    }
+
+
+@register('dim_clusters', uses_filters=False)
+def dim_clusters(src):
+    idx = skill_index(src)
+    if idx.empty: return {'empty': True}
+    counts = idx.counts()
+    top = counts.head(20).index
+    return {
+        'empty': False,
+        'cooccurrence': idx.cooccurrence(top),
+        'top_rows': idx.long(src.master, top, ['Company', 'Role_Group', 'Final_Comp']),
+        'panorama': counts.reset_index().head(30),
+        'rare': counts.tail(20).reset_index(),
+    }
+
+
+@register('dim_compare', uses_filters=False)
+def dim_compare(src, companies=(), roles=()):
+    # 对标视图忽略全局筛选，只按控制器选中的公司 / 岗位取子集
+    battle = filtered_view(src.master, src.index, Company=list(companies), Role=list(roles))
+    role_stats = battle.groupby(['Company','Role'], observed=True)['Final_Comp'].median().reset_index()
+    top_roles = battle['Role'].value_counts().head(10).index
+    is_senior = battle['Role'].astype(str).str.contains('Senior|Lead|Staff|Manager', case=False)
+    return {
+        'battle': battle,
+        'role_stats': role_stats[role_stats['Role'].isin(top_roles)],
+        'senior_pay': battle[is_senior].groupby('Company', observed=True)['Final_Comp'].median().reset_index(),
+        'mix': battle.groupby('Company', observed=True)[['Base_Clean','Stock_Clean']].mean().reset_index(),
+    }
+
+
+# ==========================================
+# 声明式维度 (Spec-Driven Dimensions)
+# ==========================================
+# 派生列：名称 -> fn(ctx, src)，返回与 ctx 行对齐的 {列名: 数组}，由规格的 'derive' 引用
+DERIVED = {}
+LEVEL_NUMBER = r'(\d+(?:\.\d+)?)'
+QUALITY_FLAGS = ['Missing_YOE', 'Missing_Date', 'Missing_Level', 'Missing_Tags']
+
+
+def derived(name):
+    def deco(fn):
+        DERIVED[name] = fn
+        return fn
+    return deco
+
+
+@derived('shares')
+def _shares(ctx, src):
+    total = ctx['Final_Comp'].where(ctx['Final_Comp'] > 0)
+    return {'Cash_Share': ctx['Base_Clean'] / total, 'Equity_Share': ctx['Stock_Clean'] / total, 'Bonus_Share': ctx['Bonus_Clean'] / total}
+
+
+@derived('level_num')
+def _level_num(ctx, src):
+    # 职级名称中的数字 (L5 -> 5, P7.2 -> 7.2)，只在去重值上解析
+    levels = ctx['Level'].astype(object)
+    uniq = pd.Series(levels.dropna().unique(), dtype=object)
+    nums = pd.to_numeric(uniq.astype(str).str.extract(LEVEL_NUMBER, expand=False), errors='coerce')
+    return {'Level_Num': levels.map(dict(zip(uniq, nums))).astype(float)}
+
+
+@derived('level_gap')
+def _level_gap(ctx, src):
+    # 相对全市场同职级年限中位数的资历差；市场基准每个数据版本只算一次
+    market = RESULTS.get(('_level_yoe', src.version),
+                         lambda: src.master.groupby('Level', observed=True)['YOE_Clean'].median(), src.version)
+    return {'Level_YOE_Gap': ctx['YOE_Clean'] - ctx['Level'].astype(object).map(market).astype(float)}
+
+
+@derived('comp_per_yoe')
+def _comp_per_yoe(ctx, src):
+    return {'Comp_per_YOE': ctx['Final_Comp'] / ctx['YOE_Clean'].clip(lower=1)}
+
+
+@derived('tax_wedge')
+def _tax_wedge(ctx, src):
+    return {'Tax_Wedge': ctx['Final_Comp'] - ctx['Net_Pay_Est']}
+
+
+@derived('month')
+def _month(ctx, src):
+    return {'Month': ctx['Date_Clean'].dt.to_period('M').dt.to_timestamp()}
+
+
+@derived('outliers')
+def _outliers(ctx, src):
+    # 离群标记与稳健 z 在加载时按 Company × Role_Group 预计算 (见 mconly.quality)，这里只解码
+    flags = ctx['DQ_Flags']
+    high, low = quality.has(flags, quality.BITS['Final_Comp:outlier_high']), quality.has(flags, quality.BITS['Final_Comp:outlier_low'])
+    z = ctx['DQ_Robust_Z']
+    return {'Z_Score': z, 'Abs_Z': z.abs(), 'Outlier': np.select([high, low], ['High', 'Low'], 'Normal'), 'Is_Outlier': high | low}
+
+
+@derived('market')
+def _market(ctx, src):
+    return market_deviation(src)
+
+
+@derived('quality')
+def _quality(ctx, src):
+    # YOE_Clean 把缺失 / 占位符解析为 0，缺失与否取 ETL 时按原始值记下的 YOE_Missing
+    flags = {'Missing_YOE': ctx['YOE_Missing'], 'Missing_Date': ctx['Date_Clean'].isna(),
+             'Missing_Level': ctx['Level'].isna(), 'Missing_Tags': ctx['Tags'].isna(),
+             'Zero_Comp': quality.has(ctx['DQ_Flags'], quality.BITS['Final_Comp:zero'])}
+    return {**flags, 'Missing_Fields': sum(flags[f].astype(int) for f in QUALITY_FLAGS),
+            'Parse_Error': quality.has(ctx['DQ_Flags'], quality.PARSE_MASK), 'Flagged': ctx['DQ_Exclude'],
+            'DQ_Status': quality.status(ctx['DQ_Flags'])}
+
+
+def _finish(frame, ds):
+    if 'where' in ds: frame = frame[frame[ds['where']]]
+    if 'top' in ds: frame = frame.nlargest(ds['top'][1], ds['top'][0])
+    if 'sort' in ds: frame = frame.sort_values(ds['sort'])
+    return frame
+
+
+def _derive(spec, src):
+    rows = src.ctx
+    cols = {}
+    for name in spec['derive']: cols.update(DERIVED[name](rows, src))
+    return rows.assign(**cols) if cols else rows
+
+
+def _passes(spec):
+    # by 相同的数据集合并为一次 groupby
+    passes = {}
+    for name, ds in spec['data'].items():
+        if 'by' in ds: passes.setdefault(tuple(ds['by']), []).append(name)
+    return passes
+
+
+def _grouped(spec, rows, by, names):
+    # 一次 groupby 算出 names 中各数据集 (未经 top / sort)，重复的 (列, 函数) 只聚合一次
+    aliases = {}
+    for name in names:
+        for agg in spec['data'][name]['agg'].values(): aliases.setdefault(agg, f'_{len(aliases)}')
+    table = rows.groupby(list(by), observed=True).agg(**{alias: agg for agg, alias in aliases.items()})
+    return {name: pd.DataFrame({col: table[aliases[agg]] for col, agg in spec['data'][name]['agg'].items()}, index=table.index).reset_index()
+            for name in names}
+
+
+def _indexed(spec, src, filters):
+    # 时间序列与数据质量计数直接取自预建索引
+    out = {}
+    for name, ds in spec['data'].items():
+        if 'series' in ds:
+            out[name] = _finish(series_index(src).series(filters, ds['series'], by=ds.get('split'), top=ds.get('split_top'), window=ds.get('window')), ds)
+        elif 'quality' in ds: out[name] = _finish(quality_index(src).counts(filters, ds['quality']), ds)
+    return out
+
+
+def _split(frame, values, key='Company'):
+    # 按 key 稳定排序一次，各取值即为连续切片 (不逐值 take)；组内保持原行序与行标签，没有行的取值得到空子集
+    codes, uniques = pd.factorize(frame[key])
+    order = np.argsort(codes, kind='stable')
+    frame, codes = frame.take(order), codes[order]
+    at = pd.Index(uniques).get_indexer(list(values))
+    lo, hi = np.searchsorted(codes, at, 'left'), np.searchsorted(codes, at, 'right')
+    return {v: frame.iloc[a:b] if i >= 0 else frame.iloc[:0] for v, i, a, b in zip(values, at, lo, hi)}
+
+
+def evaluate_spec(spec, src):
+    """按 ``mconly.specs`` 的声明计算一个维度：派生列只追加一次；``by`` 相同的数据集合并为一次 groupby，
+    重复的 (列, 函数) 只聚合一次，再按各数据集的 top / sort 拆分。时间序列与数据质量计数直接取自预建索引。"""
+    rows = _derive(spec, src)
+    out = _indexed(spec, src, src.filters)
+    for name, ds in spec['data'].items():
+        if ds.get('rows'): out[name] = _finish(rows, ds)
+    for by, names in _passes(spec).items():
+        for name, frame in _grouped(spec, rows, by, names).items(): out[name] = _finish(frame, spec['data'][name])
+    return {name: out[name] for name in spec['data']}
+
+
+def evaluate_spec_each(spec, src, companies):
+    """``src`` (公司为 'All' 的筛选范围) 内每家公司的 ``evaluate_spec`` 结果 {公司: 结果}，供批量导出。
+
+    派生列、每个 ``by`` 分组以及时间序列 / 数据质量查询在整个范围上只算一次 (分组键前加 Company)，再按公司拆分；
+    逐家计算时每个维度的固定开销 (派生 / assign / 多次小 groupby) 不再随公司数成倍增长。
+    """
+    rows = _derive(spec, src)
+    parts = {name: _split(rows, companies) for name, ds in spec['data'].items() if ds.get('rows')}
+    for by, names in _passes(spec).items():
+        keys = by if 'Company' in by else ('Company',) + by
+        for name, frame in _grouped(spec, rows, keys, names).items():
+            split = _split(frame, companies)
+            if 'Company' not in by: split = {c: f.drop(columns='Company') for c, f in split.items()}
+            parts[name] = {c: f.reset_index(drop=True) for c, f in split.items()}
+    for name, ds in spec['data'].items():
+        if 'series' in ds:
+            parts[name] = series_index(src).series_each(src.filters, companies, ds['series'], by=ds.get('split'),
+                                                        top=ds.get('split_top'), window=ds.get('window'))
+        elif 'quality' in ds: parts[name] = quality_index(src).counts_each(src.filters, companies, ds['quality'])
+    return {c: {name: _finish(parts[name][c], ds) for name, ds in spec['data'].items()} for c in companies}
+
+
+for _dim, _spec in SPECS.items():
+    register(_dim)(lambda src, spec=_spec: evaluate_spec(spec, src))
+    register_each(_dim)(lambda src, companies, spec=_spec: evaluate_spec_each(spec, src, companies))
@@ -0,0 +1,258 @@
+"""鲁棒 ETL 引擎：读取抓取的薪酬 CSV 并清洗为 master frame。"""
+import binascii
+import codecs
+import glob
+import hashlib
+import io
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from mconly.classify import classify_frame
+from mconly.parsing import is_placeholder, parse_money, parse_years, parse_dates
+from mconly.quality import parse_flags
+
+# 清洗逻辑变更时递增，使磁盘上的缓存产物失效
+ETL_VERSION = 5
+
+RAW_COLUMNS = ['Total', 'Base', 'Stock', 'Bonus', 'Company', 'Role', 'Region', 'Location', 'YOE', 'Date', 'Tags', 'Level', 'URL', 'Capture_Time']
+
+SAMPLE_BYTES = 1 << 16
+# 全量构建时每块的行数，决定 ETL 的峰值内存
+CHUNK_ROWS = int(os.environ.get('MCONLY_CHUNK_ROWS', '50000'))
+
+# ==========================================
+# 源注册表 (Source Registry)
+# ==========================================
+# 每个源声明文件 glob (相对数据目录)、Source 标签与 原始列名 -> 标准列名 映射。
+# 默认注册表为 mconly/sources.json，可用 MCONLY_SOURCES 指向自定义文件；新增抓取格式只需加一条配置。
+SOURCES_PATH = os.environ.get('MCONLY_SOURCES') or os.path.join(os.path.dirname(__file__), 'sources.json')
+
+Source = namedtuple('Source', ['name', 'glob', 'label', 'columns'])
+SOURCES = {}
+
+
+def register_source(name, glob, label, columns):
+    SOURCES[name] = Source(name, glob, label, dict(columns))
+
+
+def load_sources(path=SOURCES_PATH):
+    with open(path, encoding='utf-8') as f:
+        for entry in json.load(f): register_source(**entry)
+
+load_sources()
+# 注册表参与缓存键：修改列映射后旧的 master 产物自动失效
+SOURCES_DIGEST = hashlib.sha256(json.dumps(SOURCES, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:12]
+
+
+def discover(data_dir='.'):
+    """返回 {相对路径: Source}。按注册顺序、同一源内按文件名排序；一个文件只归属第一个匹配它的源。"""
+    files = {}
+    for src in SOURCES.values():
+        for path in sorted(glob.glob(os.path.join(data_dir, src.glob))):
+            name = os.path.relpath(path, data_dir)
+            if os.path.isfile(path) and name not in files: files[name] = src
+    return files
+
+
+# UID 只由 offer 的自然键决定，与 CSV 行序无关
+UID_KEY = ['Company', 'Role', 'Level', 'Region', 'Capture_Time', 'URL']
+
+
+# ==========================================
+# 流式读取 (Streaming Reader)
+# ==========================================
+def detect_encoding(path):
+    """按文件开头的小样本判断编码 (只读一次)：UTF-8 BOM -> utf-8-sig，可按 UTF-8 解码 -> utf-8，否则 gbk。"""
+    with open(path, 'rb') as f: sample = f.read(SAMPLE_BYTES + 1)
+    if sample.startswith(codecs.BOM_UTF8): return 'utf-8-sig'
+    # 样本可能截断在多字节字符中间，只校验到最后一个换行
+    if len(sample) > SAMPLE_BYTES: sample = sample[:sample.rfind(b'\n') + 1]
+    try: sample.decode('utf-8')
+    except UnicodeDecodeError: return 'gbk'
+    return 'utf-8'
+
+
+def _last_newline(f, size, floor):
+    # 从文件末尾向前按块查找最后一个换行，返回其后的偏移 (找不到时为 floor)
+    pos = size
+    while pos > floor:
+        step = min(SAMPLE_BYTES, pos - floor)
+        f.seek(pos - step)
+        i = f.read(step).rfind(b'\n')
+        if i >= 0: return pos - step + i + 1
+        pos -= step
+    return floor
+
+
+class _Span(io.RawIOBase):
+    """表头行 + 文件中 [start, end) 字节的只读视图，供 read_csv 逐块读取，不整体载入内存。"""
+
+    def __init__(self, path, header, start, end):
+        self._f = open(path, 'rb')
+        self._f.seek(start)
+        self._head = header
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]; self._head = self._head[n:]
+            return n
+        n = self._f.readinto(memoryview(b)[:min(len(b), self._left)]) if self._left > 0 else 0
+        self._left -= n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+def _line_start(f, pos, size):
+    # 上一次读取止于 pos。pos 前一字节是换行时即为行首；否则上次全量读取已计入了没有换行符的末行，
+    # 之后追加的内容先补完该行，跳到其后第一个换行之后。尚未出现换行时返回 None
+    f.seek(pos - 1)
+    if f.read(1) == b'\n': return pos
+    while pos < size:
+        block = f.read(min(SAMPLE_BYTES, size - pos))
+        i = block.find(b'\n')
+        if i >= 0: return pos + i + 1
+        pos += len(block)
+    return None
+
+
+def open_source(path, start=0, chunksize=None):
+    """打开 ``path`` 中 ``start`` 字节之后的完整行 (start=0 为全文件)。
+
+    返回 (reader, end_offset)：chunksize 为 None 时 reader 为单个 DataFrame，否则为逐块产出的
+    DataFrame 迭代器；无新行时为 None。全量读取时文件末尾即行尾 (末行没有换行符也计入)；
+    增量读取时末尾未写完的半行不计入 end_offset，留给下一次。
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        if start:
+            begin = _line_start(f, start, size)
+            if begin is None: return None, start
+            start, end = begin, _last_newline(f, size, begin)
+        else:
+            start, end = len(header), size
+    if end <= start: return None, end
+    # 原始列一律按字符串读取，避免不同批次 / 增量片段推断出不同的列类型
+    reader = pd.read_csv(io.BufferedReader(_Span(path, header, start, end), SAMPLE_BYTES),
+                         dtype=str, encoding=detect_encoding(path), chunksize=chunksize)
+    return reader, end
+
+
+def label_source(df, source, name=None):
+    # name: 源文件相对数据目录的路径，数据质量按文件统计
+    df['Source'] = source.label
+    df['Source_File'] = name
+    return df.rename(columns={k:v for k,v in source.columns.items() if k in df.columns})
+
+
+def read_sources(data_dir='.', offsets=None):
+    """读取并重命名注册表匹配到的全部源文件；``offsets`` 给出时只读取各文件该偏移之后的新行。
+
+    返回 (df, cursors)，cursors 为每个文件本次读到的字节偏移。
+    """
+    frames, cursors = [], {}
+    for name, source in discover(data_dir).items():
+        path = os.path.join(data_dir, name)
+        try:
+            df, cursors[name] = open_source(path, (offsets or {}).get(name, 0))
+            if df is not None: frames.append(label_source(df, source, name))
+        except: pass
+
+    if not frames: return pd.DataFrame(), cursors
+    return pd.concat(frames, ignore_index=True), cursors
+
+
+def source_columns(data_dir='.', files=None):
+    """各源重命名后的表头并集 (按出现顺序)，与 ``read_sources`` 拼接后的列顺序一致。"""
+    columns = []
+    for name, source in (files or discover(data_dir)).items():
+        path = os.path.join(data_dir, name)
+        try: head = pd.read_csv(path, nrows=0, encoding=detect_encoding(path))
+        except: continue
+        columns += [c for c in label_source(head, source, name).columns if c not in columns]
+    return columns
+
+
+def _hash_rows(frame):
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+def assign_uids(df, taken=None):
+    """按 UID_KEY 批量生成 16 位十六进制 UID。
+
+    自然键完全相同的行 (同页面同批次的多条 offer) 按出现顺序编号区分；
+    与批内或 ``taken`` (已有 UID) 冲突的行递增序号重新哈希，直到全部唯一。
+    """
+    key = _hash_rows(pd.DataFrame({c: df[c].astype(object) for c in UID_KEY}))
+    ordinal = pd.Series(key).groupby(key).cumcount().to_numpy(dtype=np.uint64)
+    taken = pd.Index([] if taken is None else taken, dtype=object)
+    uids = np.empty(len(df), dtype=object)
+    pending = np.arange(len(df))
+    while len(pending):
+        h = _hash_rows(pd.DataFrame({'k': key[pending], 'n': ordinal[pending]}))
+        hx = pd.Index(np.frombuffer(binascii.hexlify(h.astype('>u8').tobytes()), dtype='S16').astype(str), dtype=object)
+        clash = hx.isin(taken) | hx.duplicated(keep='first')
+        uids[pending[~clash]] = hx[~clash]
+        taken = taken.append(hx[~clash])
+        pending = pending[clash]
+        ordinal[pending] += 1
+    return uids
+
+def uid_index(df):
+    # UID -> 行位置的哈希索引，Profile 视图按 UID 取行为 O(1)
+    return pd.Index(df['UID'])
+
+def clean(df):
+    """除 UID 外的全部清洗步骤；各批次互不依赖，可并行执行。UID 列先占位以固定列顺序。"""
+    for col in RAW_COLUMNS:
+        if col not in df.columns: df[col] = np.nan
+
+    df['UID'] = None
+
+    for c in ['Total', 'Base', 'Stock', 'Bonus']:
+        df[f'{c}_Clean'] = parse_money(df[c])
+
+    df['Final_Comp'] = np.where(df['Total_Clean']>0, df['Total_Clean'], df['Base_Clean']+df['Stock_Clean']+df['Bonus_Clean'])
+    df['YOE_Clean'] = parse_years(df['YOE'])
+    # 缺失 / 占位符的年限解析为 0，与真实的 0 年无法区分；紧凑模式不保留原始 YOE，缺失标记只能在这里记下
+    df['YOE_Missing'] = is_placeholder(df['YOE']).to_numpy()
+    df['Date_Clean'] = parse_dates(df['Date'], df['Capture_Time'])
+    # 非缺失、非占位符却解析失败的原始值 (原样会被当作 0 / NaT)，按原因码记位
+    df['DQ_Parse'] = parse_flags(df)
+
+    df['Equity_Ratio'] = df['Stock_Clean'] / df['Final_Comp'].replace(0, 1)
+    df['Hourly_Rate'] = df['Final_Comp'] / 2000
+    df['Net_Pay_Est'] = df['Final_Comp'] * 0.7
+
+    def extract_skills(tags_str):
+        if pd.isna(tags_str): return []
+        return [t.strip() for t in str(tags_str).split(',') if t.strip()]
+    df['Skills_List'] = df['Tags'].apply(extract_skills)
+
+    # 地区 / 职能按规则表在去重值上归类 (见 mconly/rules.json)
+    classify_frame(df)
+
+    return df
+
+
+def process(df, taken_uids=None):
+    df = clean(df)
+    df['UID'] = assign_uids(df, taken_uids)
+    return df
+
+
+def build_master(data_dir='.'):
+    df, _ = read_sources(data_dir)
+    if df.empty: return df
+    return process(df)
@@ -0,0 +1,234 @@
+"""Plotly 图表主题与序列化图表缓存。
+
+GATE 主题注册为 plotly 模板并设为默认，``px.*`` 构建时直接套用，不再逐图
+``update_layout``。构建好的图表以 JSON 形式按 (chart_key, 筛选状态, 数据版本, 高度)
+缓存，LRU 淘汰并受条目数与总字节数上限约束，点击触发的 rerun 直接复用已序列化的图表。
+
+大数据模式 (``downsample_figure``)：图表总点数超过 ``LARGE_POINTS`` 时在服务端聚合 ——
+散点改为 WebGL 并抽样 (折线等距抽取)，箱线图只发送分位数摘要并叠加带 UID 的抽样点，
+直方图 / 密度热力 / 饼图 / 平行类别图预先分箱计数，浏览器收到的数据量与总行数无关。
+"""
+import base64
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+TEMPLATE = 'gate'
+MAX_ENTRIES = 256
+MAX_BYTES = int(float(os.environ.get('MCONLY_FIG_CACHE_MB', '64')) * 2**20)
+LARGE_POINTS = int(os.environ.get('MCONLY_LARGE_POINTS', '20000'))
+SAMPLE_POINTS = 4000
+BINS = 60
+
+GATE_LAYOUT = dict(
+    font=dict(family="Inter, sans-serif", size=11, color="#64748B"),
+    margin=dict(l=0, r=0, t=20, b=0),
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    xaxis=dict(showgrid=False, showline=True, linecolor="#E2E8F0", tickfont=dict(color="#94A3B8")),
+    yaxis=dict(showgrid=True, gridcolor="#F1F5F9", gridwidth=1, zeroline=False, tickfont=dict(color="#94A3B8")),
+    hoverlabel=dict(bgcolor="white", bordercolor="#E2E8F0", font_size=12, font_family="Inter, sans-serif"),
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=10)),
+    colorway=["#2563EB", "#3B82F6", "#60A5FA", "#93C5FD", "#1E40AF"],  # GATE Brand Blues
+)
+
+
+def register_template():
+    # 叠加在 plotly 默认模板之上，保留其 colorscale 等设置
+    pio.templates[TEMPLATE] = go.layout.Template(layout=GATE_LAYOUT)
+    pio.templates.default = f'plotly+{TEMPLATE}'
+
+
+# 声明式图表规格 (mconly.specs) 的图表类型 -> plotly express 构建函数
+CHART_KINDS = {
+    'bar': px.bar, 'box': px.box, 'histogram': px.histogram, 'scatter': px.scatter, 'line': px.line,
+    'area': px.area, 'pie': px.pie, 'heatmap': px.density_heatmap, 'treemap': px.treemap,
+}
+
+
+def build_chart(kind, data, encode):
+    return CHART_KINDS[kind](data, **encode)
+
+
+class FigureCache:
+    """序列化图表的 LRU 缓存；``get`` 从缓存的 JSON 还原 Figure (比重新 ``px.*`` 构建快一个数量级)。"""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build, info=None):
+        # info: 可选的 dict，写入本次是否命中 (hit) 与 JSON 字节数 (bytes)，供 profiling 使用
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None: self._specs.move_to_end(key)
+        if info is not None: info.update(hit=spec is not None)
+        if spec is None: spec = self._put(key, pio.to_json(build(), validate=False))
+        if info is not None: info.update(bytes=len(spec))
+        return go.Figure(json.loads(spec))
+
+    def _put(self, key, spec):
+        with self._lock:
+            if key not in self._specs:
+                self._specs[key] = spec
+                self.nbytes += len(spec)
+            while self._specs and (len(self._specs) > self.max_entries or self.nbytes > self.max_bytes):
+                self.nbytes -= len(self._specs.popitem(last=False)[1])
+        return spec
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self.nbytes = 0
+
+
+# ==========================================
+# 大数据模式 (Large-Data Mode)
+# ==========================================
+_PER_POINT = ['x', 'y', 'customdata', 'text', 'hovertext', 'ids']
+
+
+def _length(v):
+    # 从缓存 JSON 还原的图表中，数值数组为 plotly 的 typed array 编码 {'dtype', 'bdata'[, 'shape']}
+    if isinstance(v, dict) and 'bdata' in v:
+        if v.get('shape'): return int(str(v['shape']).split(',')[0])
+        return len(base64.b64decode(v['bdata'])) // np.dtype(v['dtype']).itemsize
+    return len(v)
+
+
+def _size(t):
+    if t.type == 'parcats': return _length(t.dimensions[0].values) if t.dimensions else 0
+    if t.type == 'pie': return 0 if t.labels is None else _length(t.labels)
+    return max((_length(t[a]) for a in ('x', 'y') if a in t and t[a] is not None), default=0)
+
+
+def figure_points(fig):
+    return sum(_size(t) for t in fig.data)
+
+
+def _sample(n, k, rng, lines=False):
+    if n <= k: return np.arange(n)
+    # 折线按顺序等距抽取以保留形状，散点随机抽样 (固定种子，缓存与重算结果一致)
+    return np.unique(np.linspace(0, n - 1, k).astype(int)) if lines else np.sort(rng.choice(n, k, replace=False))
+
+
+def _take(props, n, idx):
+    for a in _PER_POINT:
+        if props.get(a) is not None and len(props[a]) == n: props[a] = np.asarray(props[a])[idx]
+    marker = props.get('marker') or {}
+    for a in ('color', 'size', 'symbol'):
+        v = marker.get(a)
+        if v is not None and not isinstance(v, str) and len(v) == n: marker[a] = np.asarray(v)[idx]
+    return props
+
+
+def _scatter(t, n, k, rng):
+    props = t.to_plotly_json(); props.pop('type', None)
+    idx = _sample(n, k, rng, lines='lines' in (t.mode or ''))
+    return [go.Scattergl(_take(props, n, idx), skip_invalid=True)]
+
+
+def _box(t, n, k, rng):
+    horizontal = t.orientation == 'h'
+    cat, val = ('y', 'x') if horizontal else ('x', 'y')
+    values = pd.to_numeric(pd.Series(np.asarray(t[val])), errors='coerce')
+    groups = pd.Series(np.asarray(t[cat]) if t[cat] is not None else np.full(n, t.name or ''), dtype=object)
+    g = values.groupby(groups, sort=False)
+    q1, med, q3 = g.quantile(0.25), g.median(), g.quantile(0.75)
+    iqr = (q3 - q1).reindex(groups).to_numpy()
+    lo = values.where(values >= q1.reindex(groups).to_numpy() - 1.5 * iqr).groupby(groups, sort=False).min()
+    hi = values.where(values <= q3.reindex(groups).to_numpy() + 1.5 * iqr).groupby(groups, sort=False).max()
+    summary = go.Box({cat: q1.index.tolist(), 'q1': q1.tolist(), 'median': med.tolist(), 'q3': q3.tolist(),
+                      'lowerfence': lo.tolist(), 'upperfence': hi.tolist(), 'boxpoints': False, 'orientation': t.orientation,
+                      'name': t.name, 'marker': t.marker.to_plotly_json(), 'legendgroup': t.legendgroup, 'showlegend': t.showlegend,
+                      'offsetgroup': t.offsetgroup, 'alignmentgroup': t.alignmentgroup, 'hovertemplate': None})
+    # 原 boxpoints='all' 抽样全部点，否则只抽样离群点；保留 customdata 供点击下钻
+    outside = np.ones(n, dtype=bool) if t.boxpoints == 'all' else ~(values.between(lo.reindex(groups).to_numpy(), hi.reindex(groups).to_numpy())).to_numpy()
+    pos = np.flatnonzero(outside & values.notna().to_numpy())
+    pos = pos[_sample(len(pos), k, rng)]
+    points = {cat: groups.to_numpy()[pos], val: values.to_numpy()[pos], 'mode': 'markers', 'name': t.name,
+              'legendgroup': t.legendgroup, 'showlegend': False, 'marker': {'color': t.marker.color, 'size': 4, 'opacity': 0.5},
+              'hovertemplate': t.hovertemplate}
+    if t.customdata is not None: points['customdata'] = np.asarray(t.customdata)[pos]
+    return [summary, go.Scattergl(points)]
+
+
+def _histogram(t, edges):
+    horizontal = t.orientation == 'h'
+    raw = pd.Series(np.asarray(t['y' if horizontal else 'x']))
+    num = pd.to_numeric(raw, errors='coerce')
+    bar = {'name': t.name, 'marker': t.marker.to_plotly_json(), 'legendgroup': t.legendgroup, 'showlegend': t.showlegend,
+           'offsetgroup': t.offsetgroup, 'alignmentgroup': t.alignmentgroup, 'orientation': t.orientation}
+    if edges is None or num.notna().sum() < raw.notna().sum():
+        counts = raw.value_counts(sort=False)
+        pos, vals, width = counts.index.tolist(), counts.to_numpy(), None
+    else:
+        vals, _ = np.histogram(num.dropna(), bins=edges)
+        pos, width = (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+    bar.update({'y' if horizontal else 'x': pos, 'x' if horizontal else 'y': vals})
+    if width is not None: bar['width'] = width
+    return [go.Bar(bar)]
+
+
+def _hist_edges(traces):
+    nums = [pd.to_numeric(pd.Series(np.asarray(t['y' if t.orientation == 'h' else 'x'])), errors='coerce').dropna() for t in traces]
+    nums = [v for v in nums if len(v)]
+    if not nums: return None
+    lo, hi = min(v.min() for v in nums), max(v.max() for v in nums)
+    nbins = traces[0].nbinsx or traces[0].nbinsy or BINS
+    return np.linspace(lo, hi if hi > lo else lo + 1, nbins + 1)
+
+
+def _histogram2d(t):
+    xy = pd.DataFrame({'x': pd.to_numeric(pd.Series(np.asarray(t.x)), errors='coerce'),
+                       'y': pd.to_numeric(pd.Series(np.asarray(t.y)), errors='coerce')}).dropna()
+    z, xe, ye = np.histogram2d(xy['x'], xy['y'], bins=[t.nbinsx or BINS // 2, t.nbinsy or BINS // 2])
+    return [go.Heatmap(x=(xe[:-1] + xe[1:]) / 2, y=(ye[:-1] + ye[1:]) / 2, z=z.T, coloraxis=t.coloraxis, name=t.name)]
+
+
+def _pie(t):
+    if t['values'] is not None: return [t]
+    counts = pd.Series(np.asarray(t.labels)).value_counts()
+    props = t.to_plotly_json(); props.update(labels=counts.index.tolist(), values=counts.to_numpy())
+    return [go.Pie(props)]
+
+
+def _parcats(t):
+    frame = pd.DataFrame({i: np.asarray(d.values) for i, d in enumerate(t.dimensions)})
+    combos = frame.groupby(list(frame.columns), observed=True, dropna=False).size().reset_index(name='n')
+    props = t.to_plotly_json()
+    props['dimensions'] = [dict(d.to_plotly_json(), values=combos[i].to_numpy()) for i, d in enumerate(t.dimensions)]
+    props['counts'] = combos['n'].to_numpy()
+    return [go.Parcats(props)]
+
+
+def downsample_figure(fig, limit=LARGE_POINTS, sample=SAMPLE_POINTS):
+    """总点数超过 ``limit`` 时返回服务端聚合后的新图表，使发送给浏览器的点数有界；小图原样返回。"""
+    sizes = [_size(t) for t in fig.data]
+    total = sum(sizes)
+    if total <= limit: return fig
+    rng = np.random.default_rng(0)
+    hist = [t for t in fig.data if t.type == 'histogram']
+    edges = _hist_edges(hist) if hist else None
+    traces = []
+    for t, n in zip(fig.data, sizes):
+        # 每条 trace 按其点数占比分配抽样名额
+        k = max(1, int(sample * n / total))
+        if t.type in ('scatter', 'scattergl'): traces += _scatter(t, n, k, rng)
+        elif t.type == 'box': traces += _box(t, n, k, rng)
+        elif t.type == 'histogram': traces += _histogram(t, edges)
+        elif t.type == 'histogram2d': traces += _histogram2d(t)
+        elif t.type == 'pie': traces += _pie(t)
+        elif t.type == 'parcats': traces += _parcats(t)
+        else: traces.append(t)
+    return go.Figure(data=traces, layout=fig.layout)
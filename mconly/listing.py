@@ -0,0 +1,104 @@
+"""列表视图的服务端分页、排序与全文检索。
+
+列表视图不再把整个筛选子集交给 ``st.dataframe``：``ListIndex`` 为每个数据版本预建
+
+* 排序索引：每列一次稳定排序得到各行的名次 (缺失值排在最后)，首次按该列排序时构建；
+  任意子集取一页只需按名次做一次 ``argpartition``，不对子集整体排序；
+* 词元索引：Company / Role / Location / Tags 的去重取值切分为小写词元，词元 -> 取值编号；
+  检索时按前缀在有序词表上二分，经编号查表得到命中行，多个词之间为 AND。
+
+``page`` 只返回当前页的行位置，浏览器收到的数据量与子集大小无关。
+"""
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+SEARCH_COLUMNS = ['Company', 'Role', 'Location', 'Tags']
+PAGE_SIZE = 50
+TOKEN = re.compile(r'[\w+#]+(?:\.[\w+#]+)*')
+
+
+def tokenize(text):
+    return TOKEN.findall(str(text).lower())
+
+
+def page_count(total, page_size=PAGE_SIZE):
+    return max(1, -(-total // page_size))
+
+
+def _codes(s):
+    # 取值编号 (缺失为 -1) 与去重取值；category 列直接复用其编号
+    if isinstance(s.dtype, pd.CategoricalDtype): return s.cat.codes.to_numpy(), s.cat.categories
+    return pd.factorize(s)
+
+
+class ListIndex:
+    def __init__(self, df, search_columns=SEARCH_COLUMNS):
+        self.df = df
+        self.size = len(df)
+        self._ranks = {}
+        self._lock = threading.Lock()
+        # 列 -> (行的取值编号, 取值个数, 有序词表, 各词元对应的取值编号)
+        self.tokens = {}
+        for col in search_columns:
+            if col not in df.columns: continue
+            codes, values = _codes(df[col])
+            postings = {}
+            for code, value in enumerate(values):
+                for tok in set(tokenize(value)): postings.setdefault(tok, []).append(code)
+            vocab = np.array(sorted(postings), dtype=object)
+            self.tokens[col] = (codes, len(values), vocab, [np.asarray(postings[t]) for t in vocab])
+
+    def _rank(self, col):
+        """各行在 ``col`` 上的名次 (互不相同，相等值按行位置) 与非缺失行数；每列只算一次。"""
+        with self._lock:
+            if col not in self._ranks:
+                s = self.df[col].reset_index(drop=True)
+                order = s.sort_values(kind='stable', na_position='last').index.to_numpy()
+                rank = np.empty(self.size, dtype=np.int64)
+                rank[order] = np.arange(self.size)
+                self._ranks[col] = (rank, int(s.notna().sum()))
+            return self._ranks[col]
+
+    def match(self, text):
+        """检索词全部命中 (任一检索列中有以该词开头的词元) 的行掩码；没有检索词时返回 None。"""
+        terms = tokenize(text)
+        if not terms: return None
+        mask = np.ones(self.size, dtype=bool)
+        for term in terms:
+            hit = np.zeros(self.size, dtype=bool)
+            for codes, n_values, vocab, postings in self.tokens.values():
+                lo, hi = np.searchsorted(vocab, term), np.searchsorted(vocab, term + '\uffff')
+                if lo == hi: continue
+                # 多留一格给编号 -1 (缺失)，查表结果恒为 False
+                table = np.zeros(n_values + 1, dtype=bool)
+                table[np.concatenate(postings[lo:hi])] = True
+                hit |= table[codes]
+            mask &= hit
+        return mask
+
+    def page(self, positions=None, search='', sort=None, ascending=True, page=1, page_size=PAGE_SIZE):
+        """``positions`` (全局筛选命中的行位置，None 为全部) 经检索、排序后的第 ``page`` 页 (从 1 开始)。
+
+        返回 (本页行位置, 命中总数)。
+        """
+        rows = np.arange(self.size) if positions is None else np.asarray(positions)
+        mask = self.match(search)
+        if mask is not None: rows = rows[mask[rows]]
+        total = len(rows)
+        # 超出末页 (如筛选收窄后) 时落在末页
+        page = min(max(page, 1), page_count(total, page_size))
+        start = (page - 1) * page_size
+        end = min(start + page_size, total)
+        if start >= total: return rows[:0], total
+        if sort is None: return rows[start:end], total
+        rank, valid = self._rank(sort)
+        key = rank[rows]
+        # 降序时翻转非缺失部分的名次，缺失值仍排在最后
+        if not ascending: key = np.where(key < valid, valid - 1 - key, key)
+        # 名次互不相同：先取前 end 个再对这部分排序，结果与整体排序后切片一致
+        head = np.argpartition(key, end - 1)[:end] if end < total else np.arange(total)
+        head = head[np.argsort(key[head])]
+        return rows[head[start:end]], total
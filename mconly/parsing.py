@@ -0,0 +1,128 @@
+"""薪酬 / 日期字段解析。
+
+``clean_money`` / ``clean_date`` 是原 ETL 的逐单元格实现，保留作对照与基准测试；
+``parse_money`` / ``parse_years`` / ``parse_dates`` 是基于 pandas ``.str`` 的向量化版本，
+只在去重后的取值上计算一次再按编码广播回全表，输出与逐单元格版本一致。
+"""
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+MONEY_SENTINELS = ['hidden', '不适用', '-', '', 'nan', 'none']
+_NUM_PATTERN = r"(\d+\.?\d*)"
+
+
+# ==========================================
+# 1. 逐单元格参考实现 (Legacy)
+# ==========================================
+def clean_money(val):
+    if pd.isna(val): return 0
+    s = str(val).strip().lower()
+    if s in MONEY_SENTINELS: return 0
+    try:
+        if '-' in s:
+            parts = s.split('-')
+            v1 = clean_money(parts[0])
+            v2 = clean_money(parts[1])
+            return (v1+v2)/2 if v1>0 and v2>0 else v1
+        mul = 10000 if '万' in s else 1
+        matches = re.findall(_NUM_PATTERN, s.replace(',', ''))
+        return float(matches[0]) * mul if matches else 0
+    except (ValueError, IndexError): return 0
+
+def clean_date(val, capture_time=None):
+    s = str(val).strip()
+    base = pd.to_datetime(capture_time) if pd.notnull(capture_time) else datetime.now()
+    try:
+        if 'days ago' in s:
+            days = int(re.search(r'(\d+)', s).group(1))
+            return base - timedelta(days=days)
+        if 'today' in s.lower(): return base
+        return pd.to_datetime(s, errors='coerce')
+    except (ValueError, TypeError, AttributeError, OverflowError): return pd.NaT
+
+
+# ==========================================
+# 2. 向量化引擎 (Vectorized)
+# ==========================================
+def _factorize(values):
+    # 抓取数据高度重复 ('7.7万', '不适用' ...)，只解析去重后的取值，再按 factorize 编码广播回全表
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    return values, codes, pd.Series(uniques, dtype=object).map(str)
+
+def _money_token(s):
+    s = s.astype(object).str.strip().str.lower()
+    mul = np.where(s.str.contains('万', regex=False, na=False), 10000.0, 1.0)
+    num = pd.to_numeric(s.str.replace(',', '', regex=False).str.extract(_NUM_PATTERN, expand=False), errors='coerce')
+    out = (num * mul).fillna(0.0)
+    return out.where(~s.isin(MONEY_SENTINELS), 0.0).to_numpy(dtype=float)
+
+def _money_uniques(u):
+    u = u.str.strip().str.lower()
+    # 'a-b' 区间: 取前两段的均值，任一段为 0 时退回第一段 (与 clean_money 一致)
+    ranged = (u.str.contains('-', regex=False) & ~u.isin(MONEY_SENTINELS)).to_numpy()
+    parts = u.str.split('-', n=2)
+    v1, v2 = _money_token(parts.str[0]), _money_token(parts.str[1])
+    rng = np.where((v1 > 0) & (v2 > 0), (v1 + v2) / 2, v1)
+    return np.where(ranged, rng, _money_token(u))
+
+def _broadcast_money(values, prepare=None):
+    values, codes, u = _factorize(values)
+    if prepare: u = prepare(u)
+    parsed = np.append(_money_uniques(u), 0.0)   # 末位 0.0 承接缺失值 (code == -1)
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+def parse_money(values):
+    return _broadcast_money(values)
+
+def _placeholders(u):
+    # 占位符：MONEY_SENTINELS 或不含任何字母 / 数字 ('--'、'/' 等)
+    u = u.str.strip().str.lower()
+    return (u.isin(MONEY_SENTINELS) | ~u.str.contains(r'\w')).to_numpy()
+
+def is_placeholder(values):
+    # 缺失或占位符：解析为 0 / NaT 属于预期，不算解析失败
+    values, codes, u = _factorize(values)
+    return pd.Series(np.append(_placeholders(u), True)[codes], index=values.index, name=values.name)
+
+def parse_failures(values):
+    """非缺失、非占位符却不含任何数字的取值 (如 '面议')：金额 / 年限解析会静默得到 0。"""
+    values, codes, u = _factorize(values)
+    bad = np.append(~_placeholders(u) & ~u.str.contains(r'\d').to_numpy(), False)
+    return pd.Series(bad[codes], index=values.index, name=values.name)
+
+def parse_years(values):
+    # '7年' / '5-10年' -> 与 clean_money(str(x).replace('年','')) 一致；缺失值为 0
+    return _broadcast_money(values, lambda u: u.str.replace('年', '', regex=False))
+
+def _to_datetime(u):
+    return pd.to_datetime(u, errors='coerce', format='mixed')
+
+def parse_dates(dates, capture_times=None, now=None):
+    now = pd.Timestamp(now if now is not None else datetime.now())
+    dates, codes, u = _factorize(dates)
+    u = u.str.strip()
+    rel = u.str.contains('days ago', regex=False).to_numpy()
+    today = ~rel & u.str.lower().str.contains('today', regex=False).to_numpy()
+    days = pd.to_numeric(u.str.extract(r'(\d+)', expand=False), errors='coerce').to_numpy()
+    absolute = _to_datetime(u.where(~rel & ~today))
+
+    # 缺失日期 -> str(nan) == 'nan' -> NaT
+    out = pd.Series(absolute.array.take(codes, allow_fill=True), index=dates.index, name=dates.name)
+    present = codes >= 0
+    row_rel = np.append(rel, False)[codes] & present
+    row_today = np.append(today, False)[codes] & present
+    if not (row_rel.any() or row_today.any()): return out
+
+    if capture_times is None:
+        base = pd.Series(now, index=dates.index)
+    else:
+        _, ccodes, cu = _factorize(capture_times)
+        base = pd.Series(_to_datetime(cu).array.take(ccodes, allow_fill=True), index=dates.index)
+        base = base.where(ccodes >= 0, now)
+    row_days = pd.to_timedelta(np.append(days, np.nan)[codes], unit='D')
+    out = out.where(~row_rel, base - row_days)
+    return out.where(~row_today, base)
@@ -0,0 +1,80 @@
+"""Profile 视图的同侪定位索引。
+
+每个数据版本预计算一次，单条 Offer 的下钻只做查表与一次近邻查询：
+
+* 分位名次：按 Company 以及 (Company, Role_Group, Region_Group) 分组排序后，各行在组内的
+  百分位名次 (薪酬不高于它的占比) 与同侪组样本数，按行位置存为数组，查询为 O(1)；
+* 市场基准：同 Role × Region_Group (全部公司) 的 P25 / P50 / P75 直接取自立方体；
+* 相似 Offer：在标准化后的 (YOE_Clean, log(1 + Final_Comp), Equity_Ratio) 上建 KD 树
+  (scipy 的 ``cKDTree``)，top-k 查询为对数复杂度；未安装 scipy 时退化为逐行距离的线性扫描。
+"""
+import numpy as np
+import pandas as pd
+
+from mconly.cube import ALL
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+PEER_GROUP = ['Company', 'Role_Group', 'Region_Group']
+FEATURES = ['YOE_Clean', 'Final_Comp', 'Equity_Ratio']
+SIMILAR_COLUMNS = ['Company', 'Role', 'Level', 'Final_Comp', 'YOE_Clean', 'Equity_Ratio', 'UID']
+TOP_K = 8
+
+
+def _as_float(s):
+    return s.to_numpy(dtype=float, na_value=np.nan)
+
+
+class PeerIndex:
+    def __init__(self, df):
+        self.size = len(df)
+        comp = df['Final_Comp']
+        self.company_pct = _as_float(comp.groupby(df['Company'], observed=True).rank(method='max', pct=True))
+        peers = comp.groupby([df[c] for c in PEER_GROUP], observed=True)
+        self.peer_pct = _as_float(peers.rank(method='max', pct=True))
+        self.peer_n = _as_float(peers.transform('size'))
+
+        # 三个特征都不缺失的行参与近邻；薪酬取对数以压缩长尾，再按均值 / 标准差标准化
+        x = np.column_stack([_as_float(df[c]) for c in FEATURES])
+        x[:, 1] = np.log1p(np.clip(x[:, 1], 0, None))
+        valid = ~np.isnan(x).any(axis=1)
+        self.positions = np.flatnonzero(valid)
+        x = x[valid]
+        scale = x.std(axis=0) if len(x) else np.ones(x.shape[1])
+        self.points = (x - (x.mean(axis=0) if len(x) else 0)) / np.where(scale > 0, scale, 1)
+        self.tree = cKDTree(self.points) if cKDTree is not None and len(self.points) else None
+        # 行位置 -> 近邻点编号 (-1 为不参与)
+        self.slots = np.full(self.size, -1, dtype=np.int64)
+        self.slots[self.positions] = np.arange(len(self.positions))
+
+    def neighbors(self, pos, k=TOP_K):
+        """与行 ``pos`` 最相似的 k 条 Offer (不含自身)：(行位置, 标准化空间中的距离)。"""
+        slot = self.slots[pos]
+        if slot < 0 or len(self.points) < 2: return np.empty(0, dtype=np.int64), np.empty(0)
+        n = min(k + 1, len(self.points))
+        if self.tree is not None:
+            dist, idx = self.tree.query(self.points[slot], k=n)
+            dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+        else:
+            d = np.linalg.norm(self.points - self.points[slot], axis=1)
+            idx = np.argpartition(d, n - 1)[:n]
+            idx = idx[np.argsort(d[idx])]
+            dist = d[idx]
+        keep = idx != slot
+        return self.positions[idx[keep][:k]], dist[keep][:k]
+
+    def bundle(self, df, cube, pos, k=TOP_K):
+        """行 ``pos`` 的同侪定位：公司内 / 同侪组内百分位、同岗位同区域市场分位与相似 Offer。"""
+        row = df.iloc[pos]
+        market = cube.cell(ALL, str(row['Role']), str(row['Region_Group'])) if pd.notna(row['Role']) and pd.notna(row['Region_Group']) else None
+        near, dist = self.neighbors(pos, k)
+        return {
+            'company_pct': self.company_pct[pos],
+            'peer_pct': self.peer_pct[pos],
+            'peer_n': self.peer_n[pos],
+            'market': None if market is None else {q: market[('Final_Comp', q)] for q in ('count', 'p25', 'median', 'p75')},
+            'similar': df.iloc[near][[c for c in SIMILAR_COLUMNS if c in df.columns]].assign(Distance=dist),
+        }
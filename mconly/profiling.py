@@ -0,0 +1,83 @@
+"""看板热路径的逐 rerun 计时 (可选开启)。
+
+环境变量 ``MCONLY_PROFILE=1`` 或 URL 参数 ``?profile=1`` 开启后，看板把数据加载 (缓存检查)、
+索引获取、筛选、维度聚合与每个 ``render_chart_box`` 包在 ``Profiler.stage`` 中，记录耗时、处理行数与
+负载字节数，并在页面底部的调试面板展示本次 rerun 的明细。各阶段耗时同时进入进程内的滚动窗口
+(``STATS``，每个键保留最近 ``WINDOW`` 次)，按 p50 / p95 汇总并可导出为 JSON，用于确定优先优化哪些图表。
+未开启时 ``stage`` 不计时也不记录。
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+ENABLED = os.environ.get('MCONLY_PROFILE', '0') != '0'
+WINDOW = 200
+RECORD_COLUMNS = ['stage', 'ms', 'rows', 'bytes']
+SUMMARY_COLUMNS = ['stage', 'n', 'p50_ms', 'p95_ms', 'max_ms', 'last_ms']
+
+
+class RollingStats:
+    """各阶段最近 ``window`` 次耗时 (秒)，进程内跨会话共享。"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._samples = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key, seconds):
+        with self._lock:
+            q = self._samples.get(key)
+            if q is None: q = self._samples[key] = deque(maxlen=self.window)
+            q.append(seconds)
+
+    def summary(self):
+        """按 p95 降序的汇总表 (毫秒)。"""
+        with self._lock: items = [(k, np.asarray(q) * 1e3) for k, q in self._samples.items()]
+        rows = [{'stage': k, 'n': len(v), 'p50_ms': np.percentile(v, 50), 'p95_ms': np.percentile(v, 95),
+                 'max_ms': v.max(), 'last_ms': v[-1]} for k, v in items]
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS).sort_values('p95_ms', ascending=False, ignore_index=True)
+
+    def to_json(self):
+        return json.dumps({'window': self.window, 'stages': self.summary().round(3).to_dict(orient='records')}, indent=2, ensure_ascii=False)
+
+    def clear(self):
+        with self._lock: self._samples.clear()
+
+
+STATS = RollingStats()
+
+
+class Profiler:
+    """一次 rerun 的阶段记录。
+
+    ``with prof.stage('filter') as s: ...; s['rows'] = n`` —— 阶段结束时记录耗时与 ``s`` 中填入的
+    rows / bytes 等字段，并把耗时计入 ``stats``。
+    """
+
+    def __init__(self, enabled=ENABLED, stats=STATS):
+        self.enabled = enabled
+        self.stats = stats
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, **info):
+        if not self.enabled:
+            yield info
+            return
+        t0 = time.perf_counter()
+        try:
+            yield info
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.records.append({'stage': name, 'ms': elapsed * 1e3, **info})
+            self.stats.add(name, elapsed)
+
+    def frame(self):
+        frame = pd.DataFrame(self.records)
+        return frame.reindex(columns=RECORD_COLUMNS + [c for c in frame.columns if c not in RECORD_COLUMNS])
@@ -0,0 +1,135 @@
+"""数据质量引擎：逐行解析状态、原因码与稳健离群标记。
+
+原因码按位存放在一个整数列中 (``REASONS`` 的顺序即位序)，分两步写入：
+
+* ETL 阶段 (``etl.clean``，逐块)：原始金额 / 年限 / 日期非缺失、非占位符却解析不出数值时，
+  记录 ``<字段>:unparsed``，存为 ``DQ_Parse`` 随 Arrow 产物落盘；
+* 加载阶段 (``annotate``，每个数据版本一次)：总包为 0 记 ``Final_Comp:zero``；在 Company × Role_Group 内
+  对总包为正的行同时用 IQR 围栏与 MAD 稳健 z 判定离群，两者都超出时记 ``outlier_high`` / ``outlier_low``。
+  结果为 ``DQ_Flags``、``DQ_Robust_Z`` 与 ``DQ_Exclude`` (影响总包口径的标记，看板可选择排除)。
+
+``QualityIndex`` 按 (筛选维度, Source_File, 标记组合) 预聚合条数，健康度维度按源文件 / 字段 / 原因查表。
+"""
+import numpy as np
+import pandas as pd
+
+from mconly.parsing import is_placeholder, parse_failures
+from mconly.quantiles import ALL
+
+MONEY_COLUMNS = ['Total', 'Base', 'Stock', 'Bonus']
+REASONS = [f'{c}:unparsed' for c in MONEY_COLUMNS] + ['YOE:unparsed', 'Date:unparsed',
+                                                       'Final_Comp:zero', 'Final_Comp:outlier_high', 'Final_Comp:outlier_low']
+BITS = {r: 1 << i for i, r in enumerate(REASONS)}
+PARSE_MASK = sum(BITS[r] for r in REASONS if r.endswith(':unparsed'))
+OUTLIER_MASK = BITS['Final_Comp:outlier_high'] | BITS['Final_Comp:outlier_low']
+# 排除开关只去掉影响总包口径的行；年限 / 日期解析失败的行总包仍然可信
+EXCLUDE_MASK = sum(BITS[f'{c}:unparsed'] for c in MONEY_COLUMNS) | BITS['Final_Comp:zero'] | OUTLIER_MASK
+
+STATUSES = ['Clean', 'Parse Error', 'Zero Comp', 'Outlier']
+OUTLIER_GROUP = ['Company', 'Role_Group']
+FILTER_DIMS = ['Company', 'Role', 'Region_Group']
+# 组内总包为正的样本少于该数时不判定离群
+MIN_GROUP = 8
+IQR_K = 1.5
+# Iglewicz & Hoaglin 修正 z 分数的常用阈值
+MAD_Z = 3.5
+
+
+def has(flags, mask):
+    return (np.asarray(flags) & mask) != 0
+
+
+def reasons(flags):
+    """单行标记位解码为原因码列表。"""
+    return [r for r in REASONS if int(flags) & BITS[r]]
+
+
+def status(flags):
+    # 一行多个问题时按 解析失败 > 总包为 0 > 离群 的优先级取一个状态
+    flags = np.asarray(flags)
+    label = np.select([has(flags, PARSE_MASK), has(flags, BITS['Final_Comp:zero']), has(flags, OUTLIER_MASK)], STATUSES[1:], STATUSES[0])
+    return pd.Categorical(label, categories=STATUSES)
+
+
+def parse_flags(df):
+    """ETL 清洗后的块中各行的解析失败位 (只看原始字符串，不依赖其他块)。"""
+    flags = np.zeros(len(df), dtype=np.uint16)
+    for col in MONEY_COLUMNS + ['YOE']:
+        flags[parse_failures(df[col]).to_numpy()] |= BITS[f'{col}:unparsed']
+    bad_date = ~is_placeholder(df['Date']).to_numpy() & df['Date_Clean'].isna().to_numpy()
+    flags[bad_date] |= BITS['Date:unparsed']
+    return flags
+
+
+def robust_outliers(df):
+    """Company × Role_Group 内总包的离群判定：(high, low, 稳健 z)，均与 df 行对齐。
+
+    超出 Q1 - 1.5 IQR / Q3 + 1.5 IQR 且修正 z 分数 0.6745 (x - 中位数) / MAD 的绝对值超过 3.5 才算离群。
+    组内一半以上取值与中位数相同 (薪酬常集中在整数档位) 时 MAD 为 0，修正 z 无定义，改用平均绝对偏差的
+    z 分数 0.7979 (x - 中位数) / MeanAD (Iglewicz & Hoaglin)，仍须同时超出 IQR 围栏；Q1 / Q3 不一定相同，
+    围栏宽度为 0 时由 MeanAD z 把关。取值全部相同的组 (MeanAD 也为 0) 不判定。
+    总包非正、分组键缺失或组内样本不足的行不判定。
+    """
+    comp = df['Final_Comp'].astype(float).where(df['Final_Comp'] > 0)
+    keys = [df[c] for c in OUTLIER_GROUP]
+    g = comp.groupby(keys, observed=True)
+    n = g.transform('count')
+    q1, q3, med = g.transform('quantile', 0.25), g.transform('quantile', 0.75), g.transform('median')
+    dev = comp - med
+    spread = dev.abs().groupby(keys, observed=True)
+    mad, mean_ad = spread.transform('median'), spread.transform('mean')
+    z = (0.6745 * dev / mad.where(mad > 0)).fillna(0.7979 * dev / mean_ad.where((mad == 0) & (mean_ad > 0)))
+    z = z.where(n >= MIN_GROUP)
+    fence = IQR_K * (q3 - q1)
+    high = ((comp > q3 + fence) & (z > MAD_Z)).to_numpy()
+    low = ((comp < q1 - fence) & (z < -MAD_Z)).to_numpy()
+    return high, low, z
+
+
+def annotate(df):
+    """在 master 上追加 DQ_Flags / DQ_Robust_Z / DQ_Exclude；离群需要全量数据，每个数据版本计算一次。"""
+    if 'Final_Comp' not in df.columns: return df
+    flags = df['DQ_Parse'].to_numpy(dtype=np.uint16) if 'DQ_Parse' in df.columns else np.zeros(len(df), dtype=np.uint16)
+    high, low, z = robust_outliers(df)
+    flags = flags | np.where(df['Final_Comp'].gt(0).to_numpy(), 0, BITS['Final_Comp:zero']).astype(np.uint16)
+    flags[high] |= BITS['Final_Comp:outlier_high']
+    flags[low] |= BITS['Final_Comp:outlier_low']
+    return df.assign(DQ_Flags=flags, DQ_Robust_Z=z.astype('float32'), DQ_Exclude=has(flags, EXCLUDE_MASK))
+
+
+class QualityIndex:
+    def __init__(self, df, dims=FILTER_DIMS):
+        self.dims = [d for d in dims if d in df.columns]
+        keys = self.dims + [c for c in ['Source_File'] if c in df.columns]
+        # 标记组合的种类很少：先按 (键, 标记) 计数，再在计数表上按位展开为长表
+        counts = df.groupby(keys + ['DQ_Flags'], observed=True, dropna=False).size().rename('n').reset_index()
+        self.rows = counts.groupby(keys, observed=True, dropna=False)['n'].sum().reset_index()
+        self.flags = pd.concat([counts[has(counts['DQ_Flags'], bit)].drop(columns='DQ_Flags').assign(Reason=reason)
+                                for reason, bit in BITS.items()], ignore_index=True)
+
+    def _select(self, frame, filters):
+        mask = np.ones(len(frame), dtype=bool)
+        for d, v in zip(self.dims, filters):
+            if v != ALL: mask &= (frame[d] == v).to_numpy()
+        return frame[mask]
+
+    def counts(self, filters, by=()):
+        """筛选 ``filters`` 下按 ``by`` (如 ['Source_File']) 与原因码汇总的长表。
+
+        列：[by]、Reason、Field (原始列)、Code (原因)、n (命中行数)、Rows (该分组总行数)、Rate。
+        """
+        by = list(by)
+        rows = self._select(self.rows, filters)
+        flags = self._select(self.flags, filters)
+        out = flags.groupby(by + ['Reason'], observed=True)['n'].sum().reset_index()
+        if by: out = out.join(rows.groupby(by, observed=True)['n'].sum().rename('Rows'), on=by)
+        else: out = out.assign(Rows=rows['n'].sum())
+        parts = out['Reason'].str.split(':', n=1)
+        return out.assign(Field=parts.str[0], Code=parts.str[1], Rate=out['n'] / out['Rows'])
+
+    def counts_each(self, filters, values, by=(), key='Company'):
+        """``filters`` 中 ``key`` 为 'All' 时 ``key`` 各取值的 ``counts`` 结果 {取值: 长表}：按 ``key`` 汇总一次再切分。"""
+        table = self.counts(filters, [key] + list(by))
+        parts = dict(tuple(table.groupby(key, observed=True, sort=False)))
+        table = table.drop(columns=key)
+        return {v: parts[v].drop(columns=key).reset_index(drop=True) if v in parts else table.iloc[:0] for v in values}
@@ -0,0 +1,95 @@
+"""源数据的后台刷新 (双缓冲)。
+
+``Refresher`` 在后台线程中每 ``interval`` 秒检查一次源文件指纹 (size / mtime 未变时只需 stat)。
+指纹变化时，它在请求路径之外重建清洗数据 (增量 Arrow 产物、紧凑 frame、筛选索引、立方体与同侪索引)，
+构建完成后一次赋值切换到新快照。
+
+切换完成前，所有会话继续读取旧快照，不会有访客替新数据付出加载代价。每次 rerun 开始时
+取一次 ``snapshot()``，同一次 rerun 内的数据版本保持一致。构建失败时保留旧快照，错误见 ``status()``。
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+from mconly import analytics
+from mconly.cache import RESULTS
+
+# engine: 该版本的 analytics.Engine (master / 筛选索引 / 立方体); built_at: 完成时间 (epoch 秒); build_s: 构建耗时
+Snapshot = namedtuple('Snapshot', ['engine', 'version', 'built_at', 'build_s'])
+
+
+class Refresher:
+    def __init__(self, data_dir='.', cache_dir=None, interval=analytics.SOURCE_TTL):
+        self.data_dir = os.path.abspath(data_dir)
+        self.cache_dir = cache_dir
+        self.interval = interval
+        self.last_check = None
+        self.last_error = None
+        self.building = False
+        self._active = None
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _build(self):
+        t0 = time.perf_counter()
+        master = analytics.load(self.data_dir, self.cache_dir)
+        engine = analytics.Engine(master)
+        engine.peers  # Profile 下钻的同侪索引也在切换前建好
+        return Snapshot(engine, engine.version, time.time(), time.perf_counter() - t0)
+
+    def _swap(self, snapshot):
+        self._active = snapshot
+        # 跨会话结果缓存中旧数据版本的聚合 / 子集立即失效
+        RESULTS.retain(snapshot.version)
+
+    def snapshot(self):
+        """当前生效的快照；进程内首次调用时同步构建 (此时还没有可用的旧版本)。"""
+        if self._active is None:
+            with self._build_lock:
+                if self._active is None: self._swap(self._build())
+        return self._active
+
+    def refresh(self):
+        """源文件版本变化时重建并切换；返回是否切换了版本。构建期间旧快照照常服务。"""
+        with self._build_lock:
+            self.last_check = time.time()
+            version = analytics.source_version(self.data_dir, self.cache_dir)
+            if self._active is not None and version == self._active.version: return False
+            self.building = True
+            try:
+                self._swap(self._build())
+            finally:
+                self.building = False
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f'{type(e).__name__}: {e}'
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='mconly-refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        snap = self._active
+        return {
+            'version': snap.version if snap else None,
+            'rows': len(snap.engine.master) if snap else 0,
+            'built_at': snap.built_at if snap else None,
+            'build_s': snap.build_s if snap else None,
+            'last_check': self.last_check,
+            'building': self.building,
+            'error': self.last_error,
+        }
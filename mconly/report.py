@@ -0,0 +1,126 @@
+"""离线分析报表：不经过看板，直接导出 KPI、诊断与各维度聚合。
+
+    python -m mconly.report --company Binance --dim dim_tiering --format json
+    python -m mconly.report --each-company --output report.json   # 全部公司 × 全部维度
+
+只依赖 mconly.analytics (pandas / numpy / pyarrow)，不导入 streamlit 与 plotly。
+逐行明细 (含 UID 的图表输入，如 dim_tiering 的 tiered) 默认不输出，``--rows`` 时输出。
+"""
+import argparse
+import io
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from mconly import analytics, dimensions
+from mconly.cube import ALL
+
+
+def _is_rows(frame):
+    return isinstance(frame, pd.DataFrame) and 'UID' in frame.columns
+
+
+def jsonable(value, rows=False):
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='records', date_format='iso', force_ascii=False))
+    if isinstance(value, pd.Series):
+        return jsonable(value.reset_index(), rows)
+    if isinstance(value, dict):
+        return {str(k): jsonable(v, rows) for k, v in value.items() if rows or not _is_rows(v)}
+    if isinstance(value, (list, tuple)): return [jsonable(v, rows) for v in value]
+    if isinstance(value, (np.floating, float)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.integer): return int(value)
+    if isinstance(value, np.bool_): return bool(value)
+    return value
+
+
+def scope_report(engine, dims, company=ALL, role=ALL, region=ALL, compare=None, compare_roles=(), results=None):
+    # results: 已批量算好的 {维度: 结果} (见 build_report)，其余维度在这里计算
+    filters = {'company': company, 'role': role, 'region': region}
+    out = {'filters': filters, 'kpis': engine.kpis(company, role, region),
+           'insight': engine.insight('Overview', company, role, region), 'dimensions': {}}
+    for dim in dims:
+        if results and dim in results:
+            out['dimensions'][dim] = results[dim]
+        elif dim == 'dim_compare':
+            companies = compare or engine.companies()[:2]
+            out['dimensions'][dim] = engine.dimension(dim, companies=companies, roles=list(compare_roles))
+        else:
+            out['dimensions'][dim] = engine.dimension(dim, company, role, region)
+    return out
+
+
+def build_report(engine, dims, each_company=False, **filters):
+    if not each_company: return [scope_report(engine, dims, **filters)]
+    # 逐公司导出：每个维度在整个 role / region 范围上算一次再按公司拆分
+    companies = engine.companies()
+    role, region = filters.get('role', ALL), filters.get('region', ALL)
+    each = {dim: engine.dimension_each(dim, companies, role, region) for dim in dims if dim != 'dim_compare'}
+    return [scope_report(engine, dims, **{**filters, 'company': c}, results={dim: r[c] for dim, r in each.items()}) for c in companies]
+
+
+def _tables(prefix, value, rows):
+    # 把嵌套结果展开为 (路径, DataFrame)，供 CSV 输出
+    if isinstance(value, dict):
+        if all(not isinstance(v, (dict, pd.DataFrame, pd.Series)) for v in value.values()):
+            yield prefix, pd.DataFrame([value])
+            return
+        for k, v in value.items(): yield from _tables(f"{prefix}/{k}", v, rows)
+    elif isinstance(value, pd.Series):
+        yield prefix, value.reset_index()
+    elif isinstance(value, pd.DataFrame) and (rows or not _is_rows(value)):
+        yield prefix, value
+
+
+def write_report(report, fmt='json', rows=False, out=sys.stdout):
+    if fmt == 'json':
+        json.dump(jsonable(report, rows), out, ensure_ascii=False, indent=2)
+        out.write('\n')
+        return
+    for scope in report:
+        f = scope['filters']
+        name = '/'.join([f['company'], f['role'], f['region']])
+        for path, table in _tables(name, {k: v for k, v in scope.items() if k != 'filters'}, rows):
+            out.write(f"# {path}\n")
+            buf = io.StringIO()
+            table.to_csv(buf, index=False)
+            out.write(buf.getvalue() + '\n')
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m mconly.report', description=__doc__.splitlines()[0])
+    ap.add_argument('--data-dir', default='.')
+    ap.add_argument('--cache-dir', default=None)
+    ap.add_argument('--company', default=ALL)
+    ap.add_argument('--role', default=ALL)
+    ap.add_argument('--region', default=ALL)
+    ap.add_argument('--each-company', action='store_true', help='对每家公司分别输出 (忽略 --company)')
+    ap.add_argument('--dim', action='append', help='维度 key，可重复；缺省为全部维度')
+    ap.add_argument('--compare', nargs='+', default=None, help='dim_compare 的对标公司 (缺省为前两家)')
+    ap.add_argument('--compare-roles', nargs='+', default=())
+    ap.add_argument('--rows', action='store_true', help='同时输出逐行明细')
+    ap.add_argument('--full', action='store_true', help='加载完整 master 而非紧凑模式')
+    ap.add_argument('--format', choices=['json', 'csv'], default='json')
+    ap.add_argument('--output', default='-')
+    args = ap.parse_args(argv)
+
+    dims = args.dim or list(dimensions.DIMENSIONS)
+    unknown = [d for d in dims if d not in dimensions.DIMENSIONS]
+    if unknown: ap.error(f"unknown dimension(s): {', '.join(unknown)}")
+
+    master = analytics.load(args.data_dir, args.cache_dir, compact=not args.full)
+    if master.empty: ap.error(f"no source data found in {args.data_dir}")
+    engine = analytics.Engine(master)
+    report = build_report(engine, dims, args.each_company, company=args.company, role=args.role, region=args.region,
+                          compare=args.compare, compare_roles=args.compare_roles)
+
+    if args.output == '-': write_report(report, args.format, args.rows)
+    else:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f: write_report(report, args.format, args.rows, f)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""技能标签倒排索引。
+
+每个数据版本构建一次：Skills_List 展开为 (标签, 行位置) 对，按标签排序后以 CSR 形式
+保存 (``indptr`` / ``rows``，同一行重复的标签只计一次)。热门标签、按标签的薪酬统计、
+标签 × 职能计数与标签共现都直接在位置数组上计算，不再对整行做 ``explode`` 复制，也不构造稠密指示矩阵。
+"""
+import numpy as np
+import pandas as pd
+
+TAG = 'Skills_List'
+
+
+class SkillIndex:
+    def __init__(self, skills):
+        n = len(skills)
+        lengths = skills.map(lambda v: len(v) if isinstance(v, (list, tuple, np.ndarray)) else 0).to_numpy()
+        flat = skills.explode().to_numpy(dtype=object)
+        # 空列表 explode 后留下一个 NaN 占位，与 lengths 为 0 的行对应
+        keep = pd.notna(flat) & (flat != '')
+        rows = np.repeat(np.arange(n), np.maximum(lengths, 1))[keep]
+        codes, vocab = pd.factorize(flat[keep])
+        pairs = np.unique(codes.astype(np.int64) * max(n, 1) + rows)
+        self.size = n
+        self.vocab = pd.Index(vocab, dtype=object, name=TAG)
+        self.codes = pairs // max(n, 1)
+        self.rows = pairs % max(n, 1)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.codes, minlength=len(self.vocab)))])
+
+    @property
+    def empty(self):
+        return len(self.rows) == 0
+
+    def counts(self):
+        """各标签出现的行数，降序 (同频按首次出现顺序)，与 ``value_counts`` 一致。"""
+        s = pd.Series(np.diff(self.indptr), index=self.vocab, name='count')
+        return s.sort_values(ascending=False, kind='stable')
+
+    def rows_of(self, tag):
+        i = self.vocab.get_loc(tag)
+        return self.rows[self.indptr[i]:self.indptr[i + 1]]
+
+    def agg(self, values, how):
+        """按标签聚合 ``values`` (与索引行对齐的数组)，如 median / mean。"""
+        v = pd.Series(np.asarray(values)[self.rows], name=getattr(values, 'name', None))
+        return v.groupby(self.vocab[self.codes], sort=False).agg(how).rename_axis(TAG)
+
+    def crosstab(self, labels):
+        """标签 × 行标签 (如 Role_Group) 的计数，长表列为 [labels.name, TAG, 'c']。"""
+        name = getattr(labels, 'name', None) or 'label'
+        frame = pd.DataFrame({name: np.asarray(labels, dtype=object)[self.rows], TAG: self.vocab[self.codes]})
+        return frame.groupby([name, TAG], sort=False).size().reset_index(name='c')
+
+    def long(self, frame, tags, columns):
+        """只为 ``tags`` 中的标签生成 (标签, columns...) 长表，frame 与索引按行位置对齐。"""
+        mask = np.isin(self.codes, self.vocab.get_indexer(list(tags)))
+        out = frame[columns].iloc[self.rows[mask]].reset_index(drop=True)
+        out.insert(0, TAG, self.vocab[self.codes[mask]])
+        return out
+
+    def cooccurrence(self, tags):
+        """``tags`` 两两共同出现的行数矩阵 (对角线为各自频次)。
+
+        直接在倒排上计算：依次把一个标签的行位置标记在长度为行数的布尔数组上，再数其余标签的位置中
+        被标记的个数 —— 不构造行 × 标签指示矩阵，额外内存只有这一个布尔数组。
+        """
+        tags = list(tags)
+        postings = [self.rows[self.indptr[i]:self.indptr[i + 1]] if i >= 0 else self.rows[:0] for i in self.vocab.get_indexer(tags)]
+        m = np.empty((len(tags), len(tags)), dtype=np.int64)
+        mark = np.zeros(self.size, dtype=bool)
+        for i, a in enumerate(postings):
+            mark[a] = True
+            m[i] = [np.count_nonzero(mark[b]) for b in postings]
+            mark[a] = False
+        return pd.DataFrame(m, index=tags, columns=tags)
+
+def build_skill_index(df):
+    return SkillIndex(df[TAG] if TAG in df.columns else pd.Series([], dtype=object))
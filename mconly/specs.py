@@ -0,0 +1,244 @@
+"""通用维度的声明式图表规格。
+
+每个维度声明三部分，计算与渲染都由规格驱动 (见 ``dimensions.evaluate_spec`` 与 ``figures.build_chart``)：
+
+* ``derive`` —— 需要追加到筛选子集上的派生列 (``dimensions.DERIVED`` 中的向量化函数)；
+* ``data``   —— 图表使用的数据集。``{'by': [...], 'agg': {输出列: (列, 函数)}}`` 为分组聚合，
+  同一维度内 ``by`` 相同的数据集合并为一次 groupby；``{'rows': True}`` 为行级数据 (可带 ``where`` 布尔列)；
+  ``{'series': 'D' | 'W' | 'M'}`` 取自时间序列分桶 (``mconly.timeseries``，可带 ``split`` / ``split_top`` / ``window``)；
+  ``{'quality': [...]}`` 为按给定列 (可为空) 与原因码汇总的数据质量计数 (``mconly.quality.QualityIndex``)；
+  ``top`` / ``sort`` 控制取前 N 与排序；
+* ``charts`` —— 六个图表：图表类型 (``figures.CHART_KINDS``)、数据集名与 plotly express 编码参数。
+
+行级图表带 ``custom_data=['UID']``，点击可下钻到 Profile。
+"""
+from collections import namedtuple
+
+Chart = namedtuple('Chart', ['key', 'title', 'kind', 'data', 'encode', 'insight', 'explanation'])
+
+ROWS = {'rows': True}
+UID = ['UID']
+
+
+def _top(col, n=15):
+    return (col, n)
+
+
+SPECS = {
+    'dim_structure': {
+        'derive': ['shares'],
+        'data': {
+            'rows': ROWS,
+            'mix_company': {'by': ['Company'], 'agg': {'Base': ('Base_Clean', 'mean'), 'Stock': ('Stock_Clean', 'mean'),
+                                                       'Bonus': ('Bonus_Clean', 'mean'), 'n': ('Final_Comp', 'size')},
+                            'top': _top('n')},
+            'mix_role': {'by': ['Role_Group'], 'agg': {'Cash_Share': ('Cash_Share', 'mean'), 'Equity_Share': ('Equity_Share', 'mean'),
+                                                       'Bonus_Share': ('Bonus_Share', 'mean')}},
+        },
+        'charts': [
+            Chart('st1', "公司薪酬构成", 'bar', 'mix_company', {'x': 'Company', 'y': ['Base', 'Stock', 'Bonus']}, "现金 vs 股票。", "样本最多的 15 家公司平均底薪 / 股票 / 奖金 (堆叠)。"),
+            Chart('st2', "职能薪酬构成", 'bar', 'mix_role', {'x': 'Role_Group', 'y': ['Cash_Share', 'Equity_Share', 'Bonus_Share']}, "职能差异。", "各职能总包中底薪 / 股票 / 奖金的平均占比。"),
+            Chart('st3', "现金占比带宽", 'box', 'rows', {'x': 'Role_Group', 'y': 'Cash_Share'}, "现金为王。", "底薪占总包比例的分布。"),
+            Chart('st4', "底薪杠杆", 'scatter', 'rows', {'x': 'Base_Clean', 'y': 'Final_Comp', 'color': 'Role_Group', 'custom_data': UID}, "浮动部分。", "偏离对角线越远，浮动薪酬越高。"),
+            Chart('st5', "股票占比分布", 'histogram', 'rows', {'x': 'Equity_Share', 'nbins': 30}, "期权文化。", "股票占总包比例的分布。"),
+            Chart('st6', "公司结构定位", 'scatter', 'mix_company', {'x': 'Base', 'y': 'Stock', 'size': 'n', 'hover_name': 'Company'}, "定位。", "平均底薪 vs 平均股票，气泡为样本量。"),
+        ],
+    },
+    'dim_levels': {
+        'derive': ['level_num'],
+        'data': {
+            'rows': ROWS,
+            'by_level': {'by': ['Level'], 'agg': {'P50': ('Final_Comp', 'median'), 'YOE': ('YOE_Clean', 'mean'), 'n': ('Final_Comp', 'size')},
+                         'top': _top('n', 20), 'sort': 'P50'},
+            'company_level': {'by': ['Company', 'Level'], 'agg': {'P50': ('Final_Comp', 'median'), 'n': ('Final_Comp', 'size')},
+                              'top': _top('n', 60)},
+        },
+        'charts': [
+            Chart('lv1', "职级定价", 'bar', 'by_level', {'x': 'Level', 'y': 'P50'}, "职级溢价。", "样本最多的 20 个职级的中位薪酬。"),
+            Chart('lv2', "职级样本量", 'bar', 'by_level', {'x': 'Level', 'y': 'n'}, "职级分布。", "各职级 Offer 数。"),
+            Chart('lv3', "数字职级 vs 薪酬", 'scatter', 'rows', {'x': 'Level_Num', 'y': 'Final_Comp', 'color': 'Role_Group', 'custom_data': UID}, "职级刻度。", "从职级名称提取的数字 (L5 → 5, P7.2 → 7.2)。"),
+            Chart('lv4', "职能职级带宽", 'box', 'rows', {'x': 'Role_Group', 'y': 'Level_Num'}, "职级跨度。", "各职能的数字职级分布。"),
+            Chart('lv5', "资历-职级映射", 'scatter', 'by_level', {'x': 'YOE', 'y': 'P50', 'size': 'n', 'hover_name': 'Level'}, "晋升节奏。", "职级平均年限与中位薪酬，气泡为样本量。"),
+            Chart('lv6', "公司 × 职级矩阵", 'heatmap', 'company_level', {'x': 'Company', 'y': 'Level', 'z': 'P50', 'histfunc': 'avg'}, "体系对照。", "主要 公司 × 职级 组合的中位薪酬。"),
+        ],
+    },
+    'dim_equity': {
+        'derive': [],
+        'data': {
+            'rows': ROWS,
+            'eq_company': {'by': ['Company'], 'agg': {'Equity_Ratio': ('Equity_Ratio', 'mean'), 'n': ('Final_Comp', 'size')},
+                           'top': _top('n'), 'sort': 'Equity_Ratio'},
+            'eq_role': {'by': ['Role_Group'], 'agg': {'Stock': ('Stock_Clean', 'median'), 'Equity_Ratio': ('Equity_Ratio', 'mean')}},
+        },
+        'charts': [
+            Chart('eq1', "公司股票比例", 'bar', 'eq_company', {'x': 'Company', 'y': 'Equity_Ratio'}, "期权倾向。", "样本最多的 15 家公司平均股票占比。"),
+            Chart('eq2', "股票比例分布", 'histogram', 'rows', {'x': 'Equity_Ratio', 'nbins': 30}, "集中度。", "股票占总包比例分布。"),
+            Chart('eq3', "职能股票比例", 'box', 'rows', {'x': 'Role_Group', 'y': 'Equity_Ratio'}, "激励对象。", "各职能股票占比分布。"),
+            Chart('eq4', "股票 vs 总包", 'scatter', 'rows', {'x': 'Stock_Clean', 'y': 'Final_Comp', 'color': 'Role_Group', 'custom_data': UID}, "杠杆。", "股票金额与总包。"),
+            Chart('eq5', "职能股票中位数", 'bar', 'eq_role', {'x': 'Role_Group', 'y': 'Stock'}, "绝对值。", "各职能年化股票中位数。"),
+            Chart('eq6', "资历与股票比例", 'scatter', 'rows', {'x': 'YOE_Clean', 'y': 'Equity_Ratio', 'custom_data': UID}, "长期绑定。", "工作年限与股票占比。"),
+        ],
+    },
+    'dim_geo': {
+        'derive': [],
+        'data': {
+            'rows': ROWS,
+            'geo_region': {'by': ['Region_Group'], 'agg': {'P50': ('Final_Comp', 'median'), 'Hourly': ('Hourly_Rate', 'mean'), 'n': ('Final_Comp', 'size')},
+                           'sort': 'P50'},
+            'geo_region_role': {'by': ['Region_Group', 'Role_Group'], 'agg': {'P50': ('Final_Comp', 'median'), 'n': ('Final_Comp', 'size')}},
+        },
+        'charts': [
+            Chart('ge1', "区域中位薪酬", 'bar', 'geo_region', {'x': 'Region_Group', 'y': 'P50'}, "地域溢价。", "各区域中位薪酬。"),
+            Chart('ge2', "区域样本占比", 'pie', 'geo_region', {'names': 'Region_Group', 'values': 'n', 'hole': 0.5}, "分布。", "各区域 Offer 占比。"),
+            Chart('ge3', "区域薪酬带宽", 'box', 'rows', {'x': 'Region_Group', 'y': 'Final_Comp'}, "离散度。", "各区域薪酬分布。"),
+            Chart('ge4', "区域 × 职能", 'bar', 'geo_region_role', {'x': 'Region_Group', 'y': 'P50', 'color': 'Role_Group', 'barmode': 'group'}, "结构差异。", "各区域分职能中位薪酬。"),
+            Chart('ge5', "区域平均时薪", 'bar', 'geo_region', {'x': 'Region_Group', 'y': 'Hourly'}, "真实价值。", "按 2000 小时折算的平均时薪。"),
+            Chart('ge6', "区域职能热力", 'heatmap', 'geo_region_role', {'x': 'Region_Group', 'y': 'Role_Group', 'z': 'n', 'histfunc': 'sum'}, "人才密度。", "区域 × 职能 Offer 数。"),
+        ],
+    },
+    'dim_talent': {
+        'derive': [],
+        'data': {
+            'rows': ROWS,
+            'talent_role': {'by': ['Role'], 'agg': {'P50': ('Final_Comp', 'median'), 'YOE': ('YOE_Clean', 'mean'), 'n': ('Final_Comp', 'size')},
+                            'top': _top('n'), 'sort': 'P50'},
+            'talent_group': {'by': ['Role_Group'], 'agg': {'P50': ('Final_Comp', 'median'), 'Hourly': ('Hourly_Rate', 'mean'), 'n': ('Final_Comp', 'size')}},
+        },
+        'charts': [
+            Chart('ta1', "岗位中位薪酬", 'bar', 'talent_role', {'x': 'P50', 'y': 'Role', 'orientation': 'h'}, "岗位定价。", "样本最多的 15 个岗位的中位薪酬。"),
+            Chart('ta2', "职能中位薪酬", 'bar', 'talent_group', {'x': 'Role_Group', 'y': 'P50'}, "职能溢价。", "各职能中位薪酬。"),
+            Chart('ta3', "职能薪酬带宽", 'box', 'rows', {'x': 'Role_Group', 'y': 'Final_Comp'}, "离散度。", "各职能薪酬分布。"),
+            Chart('ta4', "岗位资历定价", 'scatter', 'talent_role', {'x': 'YOE', 'y': 'P50', 'size': 'n', 'hover_name': 'Role'}, "经验门槛。", "岗位平均年限与中位薪酬，气泡为样本量。"),
+            Chart('ta5', "职能构成", 'pie', 'talent_group', {'names': 'Role_Group', 'values': 'n', 'hole': 0.5}, "人才结构。", "各职能 Offer 占比。"),
+            Chart('ta6', "职能平均时薪", 'bar', 'talent_group', {'x': 'Role_Group', 'y': 'Hourly'}, "效能。", "按 2000 小时折算的平均时薪。"),
+        ],
+    },
+    'dim_outliers': {
+        'derive': ['outliers'],
+        'data': {
+            'rows': ROWS,
+            'flagged': {'rows': True, 'where': 'Is_Outlier', 'top': ('Abs_Z', 200)},
+            'out_role': {'by': ['Role_Group', 'Outlier'], 'agg': {'n': ('Final_Comp', 'size')}},
+            'out_company': {'by': ['Company'], 'agg': {'Outliers': ('Is_Outlier', 'sum'), 'Rate': ('Is_Outlier', 'mean')},
+                            'top': _top('Outliers')},
+        },
+        'charts': [
+            Chart('ou1', "离群点识别", 'scatter', 'rows', {'x': 'YOE_Clean', 'y': 'Final_Comp', 'color': 'Outlier', 'custom_data': UID}, "异常 Offer。", "同公司同职能内超出 IQR 围栏且稳健 z 超过 3.5 的 Offer。"),
+            Chart('ou2', "稳健 Z 分布", 'histogram', 'rows', {'x': 'Z_Score', 'nbins': 40}, "偏离程度。", "基于中位数与 MAD 的修正 z 分数；样本不足 8 条的组不计算。"),
+            Chart('ou3', "职能离群构成", 'bar', 'out_role', {'x': 'Role_Group', 'y': 'n', 'color': 'Outlier'}, "离群集中度。", "各职能 High / Low / Normal 数量。"),
+            Chart('ou4', "公司离群数", 'bar', 'out_company', {'x': 'Company', 'y': 'Outliers'}, "定价激进。", "离群 Offer 最多的 15 家公司。"),
+            Chart('ou5', "职能箱线 (离群)", 'box', 'rows', {'x': 'Role_Group', 'y': 'Final_Comp', 'points': 'outliers'}, "边界。", "职能整体的分布边界；离群按公司 × 职能判定，与须线不完全一致。"),
+            Chart('ou6', "离群明细", 'scatter', 'flagged', {'x': 'Company', 'y': 'Final_Comp', 'color': 'Outlier', 'custom_data': UID}, "逐条核查。", "|z| 最大的 200 条离群 Offer，点击查看详情。"),
+        ],
+    },
+    'dim_efficiency': {
+        'derive': ['comp_per_yoe'],
+        'data': {
+            'rows': ROWS,
+            'eff_company': {'by': ['Company'], 'agg': {'Comp_per_YOE': ('Comp_per_YOE', 'median'), 'n': ('Final_Comp', 'size')},
+                            'top': _top('n'), 'sort': 'Comp_per_YOE'},
+            'eff_role': {'by': ['Role_Group'], 'agg': {'Comp_per_YOE': ('Comp_per_YOE', 'median')}},
+            'eff_yoe': {'by': ['YOE_Clean'], 'agg': {'P50': ('Final_Comp', 'median'), 'n': ('Final_Comp', 'size')}, 'sort': 'YOE_Clean'},
+        },
+        'charts': [
+            Chart('ef1', "公司每年资历薪酬", 'bar', 'eff_company', {'x': 'Company', 'y': 'Comp_per_YOE'}, "资历回报。", "总包 / 工作年限 (至少 1 年) 的中位数。"),
+            Chart('ef2', "职能每年资历薪酬", 'bar', 'eff_role', {'x': 'Role_Group', 'y': 'Comp_per_YOE'}, "职能回报。", "各职能总包 / 年限中位数。"),
+            Chart('ef3', "经验回报曲线", 'line', 'eff_yoe', {'x': 'YOE_Clean', 'y': 'P50', 'markers': True}, "拐点。", "各工作年限的中位薪酬。"),
+            Chart('ef4', "效能散点", 'scatter', 'rows', {'x': 'YOE_Clean', 'y': 'Comp_per_YOE', 'custom_data': UID}, "性价比。", "左上方为低年限高回报。"),
+            Chart('ef5', "效能分布", 'histogram', 'rows', {'x': 'Comp_per_YOE', 'nbins': 40}, "分布。", "总包 / 年限分布。"),
+            Chart('ef6', "年限样本量", 'bar', 'eff_yoe', {'x': 'YOE_Clean', 'y': 'n'}, "供给。", "各工作年限 Offer 数。"),
+        ],
+    },
+    'dim_inflation': {
+        'derive': ['level_num', 'level_gap'],
+        'data': {
+            'rows': ROWS,
+            'infl_company': {'by': ['Company'], 'agg': {'YOE_Gap': ('Level_YOE_Gap', 'median'), 'n': ('Final_Comp', 'size')},
+                             'top': _top('n'), 'sort': 'YOE_Gap'},
+            'infl_level': {'by': ['Level'], 'agg': {'YOE': ('YOE_Clean', 'median'), 'P50': ('Final_Comp', 'median'), 'n': ('Final_Comp', 'size')},
+                           'top': _top('n', 20), 'sort': 'YOE'},
+        },
+        'charts': [
+            Chart('in1', "头衔通胀指数", 'bar', 'infl_company', {'x': 'Company', 'y': 'YOE_Gap'}, "头衔含金量。", "同职级下该公司年限与市场年限中位数之差 (年)；越低说明同等头衔所需资历越少。"),
+            Chart('in2', "职级资历与定价", 'scatter', 'infl_level', {'x': 'YOE', 'y': 'P50', 'size': 'n', 'hover_name': 'Level'}, "对照。", "职级年限中位数与中位薪酬。"),
+            Chart('in3', "职能资历差", 'box', 'rows', {'x': 'Role_Group', 'y': 'Level_YOE_Gap'}, "通胀分布。", "各职能 Offer 相对同职级市场的年限差。"),
+            Chart('in4', "职级 vs 年限", 'scatter', 'rows', {'x': 'Level_Num', 'y': 'YOE_Clean', 'custom_data': UID}, "晋升速度。", "数字职级与工作年限。"),
+            Chart('in5', "职级年限中位数", 'bar', 'infl_level', {'x': 'Level', 'y': 'YOE'}, "资历门槛。", "样本最多的 20 个职级。"),
+            Chart('in6', "资历差分布", 'histogram', 'rows', {'x': 'Level_YOE_Gap', 'nbins': 30}, "整体。", "负值为同职级资历低于市场。"),
+        ],
+    },
+    'dim_velocity': {
+        'derive': [],
+        'data': {
+            'vel_month': {'series': 'M'},
+            'vel_company_month': {'series': 'M', 'split': 'Company', 'split_top': 10},
+            'vel_company_cum': {'series': 'W', 'split': 'Company', 'split_top': 10},
+            'vel_daily': {'series': 'D', 'window': '28D'},
+            'vel_company': {'by': ['Company'], 'agg': {'n': ('Final_Comp', 'size'), 'Last': ('Date_Clean', 'max')}, 'top': _top('n')},
+        },
+        'charts': [
+            Chart('ve1', "月度 Offer 数", 'bar', 'vel_month', {'x': 'Period', 'y': 'n'}, "招聘节奏。", "每月 Offer 数量。"),
+            Chart('ve2', "头部公司节奏", 'area', 'vel_company_month', {'x': 'Period', 'y': 'n', 'color': 'Company'}, "谁在扩张。", "样本最多的 10 家公司月度 Offer 数 (其余合并为 Other)。"),
+            Chart('ve3', "月度中位薪酬", 'line', 'vel_month', {'x': 'Period', 'y': 'P50', 'markers': True}, "价随量动。", "每月中位薪酬。"),
+            Chart('ve4', "累积招聘曲线", 'line', 'vel_company_cum', {'x': 'Period', 'y': 'Cum_n', 'color': 'Company'}, "增速对比。", "头部 10 家公司按周累积的 Offer 数，斜率即招聘速度。"),
+            Chart('ve5', "最近活跃", 'scatter', 'vel_company', {'x': 'Last', 'y': 'n', 'hover_name': 'Company'}, "新鲜度。", "最近一次 Offer 日期与样本量。"),
+            Chart('ve6', "28 天滚动招聘量", 'line', 'vel_daily', {'x': 'Period', 'y': 'Roll_n'}, "动量。", "按日期滚动的 28 天窗口内 Offer 数。"),
+        ],
+    },
+    'dim_netpay': {
+        'derive': ['tax_wedge'],
+        'data': {
+            'rows': ROWS,
+            'net_company': {'by': ['Company'], 'agg': {'Net': ('Net_Pay_Est', 'mean'), 'Gross': ('Final_Comp', 'mean'), 'n': ('Final_Comp', 'size')},
+                            'top': _top('n')},
+            'net_region': {'by': ['Region_Group'], 'agg': {'Net': ('Net_Pay_Est', 'median'), 'Gross': ('Final_Comp', 'median')}},
+        },
+        'charts': [
+            Chart('np1', "公司税前 / 税后", 'bar', 'net_company', {'x': 'Company', 'y': ['Gross', 'Net'], 'barmode': 'group'}, "到手差距。", "样本最多的 15 家公司平均总包与估算净收入。"),
+            Chart('np2', "区域税前 / 税后", 'bar', 'net_region', {'x': 'Region_Group', 'y': ['Gross', 'Net'], 'barmode': 'group'}, "区域差异。", "各区域中位总包与估算净收入。"),
+            Chart('np3', "净收入分布", 'histogram', 'rows', {'x': 'Net_Pay_Est', 'nbins': 40}, "到手分布。", "按 70% 估算的净收入。"),
+            Chart('np4', "总包 vs 净收入", 'scatter', 'rows', {'x': 'Final_Comp', 'y': 'Net_Pay_Est', 'custom_data': UID}, "线性折算。", "估算净收入与总包。"),
+            Chart('np5', "职能净收入", 'box', 'rows', {'x': 'Role_Group', 'y': 'Net_Pay_Est'}, "职能差异。", "各职能净收入分布。"),
+            Chart('np6', "区域税费楔子", 'box', 'rows', {'x': 'Region_Group', 'y': 'Tax_Wedge'}, "税负。", "总包与估算净收入之差。"),
+        ],
+    },
+    'dim_benchmark': {
+        'derive': ['market'],
+        'data': {
+            'rows': ROWS,
+            'bm_company': {'by': ['Company'], 'agg': {'Deviation': ('Deviation', 'median'), 'n': ('Final_Comp', 'size')},
+                           'top': _top('n'), 'sort': 'Deviation'},
+            'bm_band': {'by': ['Market_Band'], 'agg': {'n': ('Final_Comp', 'size')}},
+            'bm_role': {'by': ['Role_Group'], 'agg': {'Deviation': ('Deviation', 'median')}},
+        },
+        'charts': [
+            Chart('bm1', "公司相对市场", 'bar', 'bm_company', {'x': 'Company', 'y': 'Deviation'}, "出价水位。", "相对同岗位同区域市场中位数的偏离 (中位数)，0 为持平。"),
+            Chart('bm2', "市场分位区间", 'bar', 'bm_band', {'x': 'Market_Band', 'y': 'n'}, "落点。", "Offer 落在市场 P10-P90 各区间的数量。"),
+            Chart('bm3', "偏离度分布", 'histogram', 'rows', {'x': 'Deviation', 'nbins': 40}, "整体。", "各 Offer 相对市场中位数的偏离。"),
+            Chart('bm4', "市场基准 vs 实际", 'scatter', 'rows', {'x': 'Market_P50', 'y': 'Final_Comp', 'color': 'Market_Band', 'custom_data': UID}, "对标。", "对角线以上为高于市场。"),
+            Chart('bm5', "职能相对市场", 'bar', 'bm_role', {'x': 'Role_Group', 'y': 'Deviation'}, "职能水位。", "各职能偏离度中位数。"),
+            Chart('bm6', "职能偏离带宽", 'box', 'rows', {'x': 'Role_Group', 'y': 'Deviation'}, "离散度。", "各职能偏离度分布。"),
+        ],
+    },
+    'dim_health': {
+        'derive': ['quality', 'month'],
+        'data': {
+            'rows': ROWS,
+            'dq_files': {'quality': ['Source_File']},
+            'dq_fields': {'quality': []},
+            'health_source': {'by': ['Source'], 'agg': {'Missing_YOE': ('Missing_YOE', 'mean'), 'Missing_Date': ('Missing_Date', 'mean'),
+                                                        'Missing_Level': ('Missing_Level', 'mean'), 'Missing_Tags': ('Missing_Tags', 'mean'),
+                                                        'Zero_Comp': ('Zero_Comp', 'mean'), 'n': ('Final_Comp', 'size')}},
+            'health_status': {'by': ['DQ_Status'], 'agg': {'n': ('Final_Comp', 'size')}},
+            'health_month': {'by': ['Month'], 'agg': {'Missing_Fields': ('Missing_Fields', 'mean'), 'Flagged': ('Flagged', 'mean')}, 'sort': 'Month'},
+        },
+        'charts': [
+            Chart('he1', "源文件问题热力", 'heatmap', 'dq_files', {'x': 'Reason', 'y': 'Source_File', 'z': 'n', 'histfunc': 'sum'}, "问题出处。", "各源文件按字段与原因统计的问题行数 (解析失败 / 总包为 0 / 离群)。"),
+            Chart('he2', "字段问题构成", 'bar', 'dq_fields', {'x': 'Field', 'y': 'n', 'color': 'Code', 'hover_data': ['Rate']}, "校对优先级。", "各原始字段非空却解析失败的行数，以及总包为 0 / 离群的行数。"),
+            Chart('he3', "数据源缺失率", 'bar', 'health_source', {'x': 'Source', 'y': ['Missing_YOE', 'Missing_Date', 'Missing_Level', 'Missing_Tags', 'Zero_Comp'], 'barmode': 'group'}, "字段完整度。", "各数据源关键字段缺失 / 总包为 0 的比例。"),
+            Chart('he4', "数据状态占比", 'pie', 'health_status', {'names': 'DQ_Status', 'values': 'n', 'hole': 0.5}, "可用样本。", "Clean 之外的行可在筛选栏中排除。"),
+            Chart('he5', "月度质量趋势", 'line', 'health_month', {'x': 'Month', 'y': ['Missing_Fields', 'Flagged'], 'markers': True}, "采集质量。", "每月平均缺失字段数与被标记行的比例。"),
+            Chart('he6', "问题 Offer 分布", 'scatter', 'rows', {'x': 'YOE_Clean', 'y': 'Final_Comp', 'color': 'DQ_Status', 'custom_data': UID}, "逐条核查。", "按数据状态着色，点击查看详情与原始网页。"),
+        ],
+    },
+}
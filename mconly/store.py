@@ -0,0 +1,366 @@
+"""master frame 的列式磁盘缓存。
+
+清洗结果以 Arrow IPC (Feather v2, 未压缩) 落盘，后续进程直接 memory-map 读取。
+缓存键由 ETL_VERSION、归类规则表与源注册表摘要、各源 CSV 的 size + 内容摘要组成；manifest 中记录的 mtime
+作为快速通道 —— size/mtime 未变时复用上次的摘要，不必重新读完整个文件。
+源文件变长时先用抽样校验 (长度 + 开头与末尾各 _GUARD_BYTES 字节) 确认旧内容未被改写，摘要由上次的摘要与
+新增字节链式得到，只读新增部分；校验不通过或文件变短时整文件重新 hash。抽样校验发现不了只改动
+旧内容中段的原地编辑，这类改写需删除缓存目录或改动文件开头 / 末尾才会触发全量重建。
+源文件只是在末尾追加时走增量路径：manifest 为每个源记录已处理的字节偏移与 Capture_Time 水位线，
+只清洗新增的行 (UID 去重只读已有产物的 UID 列)，写成一个追加段 (``master-<key>.tail.arrow``)
+列在 manifest 的 ``segments`` 中，旧行的清洗结果与 UID 保持不变；一个数据版本即 基础产物 + 各追加段，
+读取时按顺序拼接。追加段超过 MAX_SEGMENTS 个时合并重写为新的基础产物。
+全量构建按块流式进行 (``stream_artifact``)：源文件由注册表 (etl.SOURCES) 发现，分块读取、逐块清洗后
+直接追加写入产物；数据量大时各文件在进程池中并行清洗。
+未安装 pyarrow 时退化为每次全量 ETL。
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from mconly import etl
+from mconly.classify import RULES_DIGEST
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = feather = None
+
+CACHE_DIR = os.environ.get('MCONLY_CACHE_DIR', '.mconly_cache')
+INCREMENTAL = os.environ.get('MCONLY_INCREMENTAL', '1') != '0'
+MANIFEST = 'manifest.json'
+ARTIFACT_PREFIX = 'master-'
+_HASH_CHUNK = 1 << 20
+_GUARD_BYTES = 1 << 16
+# 追加段超过该数目时合并为一个基础产物 (每次合并重写全量，摊到多次追加上)
+MAX_SEGMENTS = int(os.environ.get('MCONLY_MAX_SEGMENTS', '8'))
+# 全量构建的进程数；源文件总大小低于 PARALLEL_MIN_BYTES 时顺序执行 (进程启动开销大于收益)
+WORKERS = int(os.environ.get('MCONLY_WORKERS', '0')) or os.cpu_count() or 1
+PARALLEL_MIN_BYTES = 32 << 20
+
+
+# ==========================================
+# 1. 源文件指纹 (Source Fingerprint)
+# ==========================================
+def _sha256(path, start=0, seed=''):
+    # [start, EOF) 的 hash；seed 为 start 之前内容的摘要 (链式)，start=0 时即整文件的 sha256
+    h = hashlib.sha256(seed.encode())
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for block in iter(lambda: f.read(_HASH_CHUNK), b''): h.update(block)
+    return h.hexdigest()
+
+def _guard(path, size):
+    # 前 size 字节的抽样摘要：长度 + 开头与末尾各 _GUARD_BYTES 字节
+    h = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        h.update(f.read(min(_GUARD_BYTES, size)))
+        f.seek(max(size - _GUARD_BYTES, 0))
+        h.update(f.read(min(_GUARD_BYTES, size)))
+    return h.hexdigest()
+
+def fingerprint(data_dir='.', previous=None):
+    """各源文件的 {size, mtime_ns, sha256, guard}；相对 ``previous`` 只在末尾追加的文件带 ``appended``。"""
+    previous = previous or {}
+    fp = {}
+    for name in etl.discover(data_dir):
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path): continue
+        st = os.stat(path)
+        entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        old = previous.get(name)
+        if old and old.get('size') == entry['size'] and old.get('mtime_ns') == entry['mtime_ns']:
+            entry.update(sha256=old['sha256'], guard=old.get('guard'))
+        else:
+            if old and old.get('guard') and entry['size'] > old['size'] and _guard(path, old['size']) == old['guard']:
+                entry.update(sha256=_sha256(path, old['size'], old['sha256']), appended=True)
+            else: entry['sha256'] = _sha256(path)
+            entry['guard'] = _guard(path, entry['size'])
+        fp[name] = entry
+    return fp
+
+def cache_key(fp):
+    payload = {'etl': etl.ETL_VERSION, 'rules': RULES_DIGEST, 'registry': etl.SOURCES_DIGEST, 'sources': {k: [v['size'], v['sha256']] for k, v in sorted(fp.items())}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ==========================================
+# 2. Arrow 产物读写 (Artifact IO)
+# ==========================================
+def _normalize(df):
+    # 兜底: 任何混合类型的 object 列统一为字符串，保证可以按 Arrow 落盘
+    for col in df.columns:
+        if col != 'Skills_List' and df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def write_artifact(df, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(df.reset_index(drop=True), tmp, compression='uncompressed')
+    os.replace(tmp, path)
+
+def _string_columns(df):
+    # 源列与标签列 (非数值 / 日期 / 列表) 统一以 string 落盘；NA 用 None 表示
+    for c in df.columns:
+        if c != 'Skills_List' and (df[c].dtype == object or pd.api.types.is_string_dtype(df[c])):
+            yield c
+
+class _ChunkWriter:
+    """按固定列顺序把清洗后的块追加写入 Arrow IPC 文件；schema 由第一块确定，字符串列固定为 string。"""
+
+    def __init__(self, path, columns, strings, schema=None):
+        self.path, self.columns, self.strings, self.schema = path, columns, strings, schema
+        self._writer = None
+
+    def write(self, df):
+        df = df.reindex(columns=self.columns)
+        for c in self.strings:
+            # 本块中整列缺失的源列会是 float NaN，先转为 None 才能按 string 写入
+            if not pd.api.types.is_string_dtype(df[c]): df[c] = df[c].astype(object).where(df[c].notna(), None)
+        if self.schema is None:
+            inferred = pa.Schema.from_pandas(df, preserve_index=False)
+            self.schema = pa.schema([pa.field(f.name, pa.string()) if f.name in self.strings else f for f in inferred])
+        if self._writer is None: self._writer = pa.ipc.new_file(self.path, self.schema)
+        self._writer.write_table(pa.Table.from_pandas(df, preserve_index=False).cast(self.schema))
+
+    def close(self):
+        # 返回是否写入过数据
+        if self._writer is None: return False
+        self._writer.close()
+        return True
+
+    def abort(self):
+        if self._writer is not None: self._writer.close()
+        if os.path.exists(self.path): os.remove(self.path)
+
+def _clean_chunks(path, name, source, chunksize, ends):
+    # 逐块读取并清洗单个源文件 (不含 UID)；ends 记录该文件读到的字节偏移
+    reader, ends[path] = etl.open_source(path, chunksize=chunksize)
+    if reader is None: return
+    with reader:
+        for raw in reader: yield etl.clean(etl.label_source(raw, source, name))
+
+def _clean_part(task):
+    # 进程池任务：把单个源文件的清洗结果写入独立的分片文件
+    path, name, source, part, chunksize, columns, strings = task
+    ends, out = {}, _ChunkWriter(part, columns, strings)
+    try:
+        for df in _clean_chunks(path, name, source, chunksize, ends): out.write(df)
+    except BaseException:
+        out.abort()
+        raise
+    return ends[path], out.close()
+
+def _read_part(part):
+    with pa.memory_map(part) as src:
+        reader = pa.ipc.open_file(src)
+        for i in range(reader.num_record_batches): yield reader.get_batch(i).to_pandas()
+
+def _cleaned(tasks, ends, workers):
+    """按注册表顺序产出各源文件清洗后的块：数据量足够大时各文件在进程池中并行清洗为分片再读回。"""
+    workers = min(workers or WORKERS, len(tasks))
+    if workers <= 1 or sum(os.path.getsize(t[0]) for t in tasks) < PARALLEL_MIN_BYTES:
+        for path, name, source, _, chunksize, _, _ in tasks: yield from _clean_chunks(path, name, source, chunksize, ends)
+        return
+    # spawn 而非 fork：宿主 (如 Streamlit) 进程持有线程，fork 不安全
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        results = list(pool.map(_clean_part, tasks))
+    for task, (end, written) in zip(tasks, results):
+        ends[task[0]] = end
+        if written: yield from _read_part(task[3])
+
+def stream_artifact(data_dir, path, chunksize=None, workers=None):
+    """逐块清洗源 CSV 并追加写入 Arrow 产物，ETL 峰值内存只与块大小和进程数有关。
+
+    源文件总量超过 PARALLEL_MIN_BYTES 时各文件在进程池中并行清洗；UID 需要全局去重，
+    在合并时按注册表顺序逐块分配，结果与顺序构建一致。
+    返回各源文件读到的字节偏移；没有任何数据行时返回 None (不写产物)。
+    """
+    files = etl.discover(data_dir)
+    # 由空 frame 走一遍 process 得到输出列顺序，与全量拼接后的列顺序一致
+    empty = etl.process(pd.DataFrame({c: pd.Series([], dtype=str) for c in etl.source_columns(data_dir, files)}))
+    columns, strings = list(empty.columns), set(_string_columns(empty))
+    parts = f"{path}.{os.getpid()}.parts"
+    tasks = [(os.path.join(data_dir, name), name, source, os.path.join(parts, f"{i}.arrow"), chunksize or etl.CHUNK_ROWS, columns, strings)
+             for i, (name, source) in enumerate(files.items())]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    out, ends = _ChunkWriter(tmp, columns, strings), {}
+    os.makedirs(parts, exist_ok=True)
+    try:
+        taken = pd.Index([], dtype=object)
+        for df in _cleaned(tasks, ends, workers):
+            df['UID'] = etl.assign_uids(df, taken)
+            taken = taken.append(pd.Index(df['UID'], dtype=object))
+            out.write(df)
+    except BaseException:
+        out.abort()
+        raise
+    finally:
+        shutil.rmtree(parts, ignore_errors=True)
+    if not out.close(): return None
+    os.replace(tmp, path)
+    return {name: ends[os.path.join(data_dir, name)] for name in files}
+
+def read_artifact(paths, columns=None):
+    """读取一个产物或按顺序拼接的多个产物 (基础产物 + 追加段，schema 相同)。"""
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    if columns is not None:
+        names = feather.read_table(paths[0], memory_map=True).schema.names
+        columns = [c for c in columns if c in names]
+    tables = [feather.read_table(p, columns=columns, memory_map=True) for p in paths]
+    df = (tables[0] if len(tables) == 1 else pa.concat_tables(tables)).to_pandas()
+    if 'Skills_List' in df.columns: df['Skills_List'] = df['Skills_List'].map(list)
+    return df
+
+def _version_files(cache_dir, manifest):
+    # manifest 所记数据版本的 基础产物 + 追加段；任一文件缺失时为 None
+    names = [manifest.get('artifact')] + list(manifest.get('segments') or [])
+    paths = [os.path.join(cache_dir, n) for n in names if n]
+    return paths if len(paths) == len(names) and all(os.path.exists(p) for p in paths) else None
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST), encoding='utf-8') as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f: json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+def _prune(cache_dir, keep):
+    for name in os.listdir(cache_dir):
+        if name.startswith(ARTIFACT_PREFIX) and name not in keep:
+            try: os.remove(os.path.join(cache_dir, name))
+            except OSError: pass
+
+
+# ==========================================
+# 3. 增量追加 (Incremental Append)
+# ==========================================
+def _cursors(data_dir, ends, df, previous=None):
+    previous = previous or {}
+    cursors, files = {}, etl.discover(data_dir)
+    for name, end in ends.items():
+        # 水位线按 Source 标签统计 (同一标签的多个文件共享)
+        label = files[name].label if name in files else None
+        ct = pd.to_datetime(df.loc[df['Source'] == label, 'Capture_Time'], errors='coerce', format='mixed').max() if len(df) else pd.NaT
+        marks = [m for m in [previous.get(name, {}).get('watermark'), None if pd.isna(ct) else str(ct)] if m]
+        cursors[name] = {'offset': end, 'watermark': max(marks) if marks else None}
+    return cursors
+
+def _append_tail(data_dir, cache_dir, manifest, fp, key):
+    """源文件只在末尾追加时，把新增行清洗为一个追加段写入缓存目录。
+
+    返回 (追加段文件名或 None, 新增行数, cursors)；不能走增量时返回 None。
+    """
+    cursors = manifest.get('cursors') or {}
+    files = _version_files(cache_dir, manifest)
+    if manifest.get('etl_version') != etl.ETL_VERSION or manifest.get('rules') != RULES_DIGEST or manifest.get('registry') != etl.SOURCES_DIGEST or not files or set(cursors) != set(fp): return None
+    for name, cur in cursors.items():
+        old = manifest.get('sources', {}).get(name)
+        if old and old['sha256'] == fp[name]['sha256']: continue
+        # 仅当指纹确认已处理的前缀未被改写 (纯追加写入) 时才走增量
+        if not fp[name].get('appended') or fp[name]['size'] < cur['offset']: return None
+
+    tail, ends = etl.read_sources(data_dir, {k: v['offset'] for k, v in cursors.items()})
+    if set(ends) != set(cursors): return None
+    if tail.empty: return None, 0, _cursors(data_dir, ends, tail, cursors)
+    schema = feather.read_table(files[0], memory_map=True).schema
+    tail = etl.process(tail, taken_uids=read_artifact(files, ['UID'])['UID'])
+    # 新增行带来了产物中没有的列 (源表头变化)：回退全量重建
+    if set(tail.columns) - set(schema.names): return None
+    segment = f"{ARTIFACT_PREFIX}{key}.tail.arrow"
+    out = _ChunkWriter(os.path.join(cache_dir, segment), schema.names, {f.name for f in schema if f.type == pa.string()}, schema)
+    try: out.write(_normalize(tail))
+    except BaseException:
+        out.abort()
+        raise
+    out.close()
+    return segment, len(tail), _cursors(data_dir, ends, tail, cursors)
+
+
+# ==========================================
+# 4. 入口 (Entry)
+# ==========================================
+def data_version(data_dir='.', cache_dir=None):
+    """源文件当前对应的数据版本 (即 ``load_master`` 返回的 data_version)；size/mtime 未变时只需 stat。"""
+    manifest = _read_manifest(cache_dir or CACHE_DIR) if pa is not None else {}
+    return cache_key(fingerprint(data_dir, manifest.get('sources')))
+
+def _select(df, columns):
+    return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+def load_master(data_dir='.', cache_dir=None, incremental=None, columns=None):
+    """返回清洗后的 master frame；``df.attrs['data_version']`` 为本次数据版本 (缓存键)。
+
+    ``columns`` 给出时只返回这些列，命中缓存或增量追加时其余列不会被读入内存。
+    """
+    if pa is None:
+        df = _select(etl.build_master(data_dir), columns)
+        df.attrs['data_version'] = cache_key(fingerprint(data_dir))
+        return df
+    cache_dir = cache_dir or CACHE_DIR
+    incremental = INCREMENTAL if incremental is None else incremental
+
+    manifest = _read_manifest(cache_dir)
+    fp = fingerprint(data_dir, manifest.get('sources'))
+    key = cache_key(fp)
+
+    files = _version_files(cache_dir, manifest) if manifest.get('key') == key else None
+    if files:
+        try: df = read_artifact(files, columns)
+        except Exception: df = None
+        if df is not None:
+            if manifest.get('sources') != fp:
+                try: _write_manifest(cache_dir, {**manifest, 'sources': fp})
+                except OSError: pass
+            df.attrs['data_version'] = key
+            return df
+
+    try: built = _append_tail(data_dir, cache_dir, manifest, fp, key) if incremental else None
+    except (OSError, pa.ArrowException): built = None
+    if built is not None:
+        segment, added, cursors = built
+        artifact, segments, rows = manifest['artifact'], list(manifest.get('segments') or []) + ([segment] if segment else []), manifest.get('rows', 0) + added
+        files = [os.path.join(cache_dir, n) for n in [artifact] + segments]
+        mode, df = 'incremental', None
+        if len(segments) > MAX_SEGMENTS:
+            # 追加段过多：合并重写为该版本的基础产物
+            df = read_artifact(files)
+            artifact, segments, mode = f"{ARTIFACT_PREFIX}{key}.arrow", [], 'merged'
+            write_artifact(df, os.path.join(cache_dir, artifact))
+        df = read_artifact(files, columns) if df is None else _select(df, columns)
+    else:
+        artifact, segments = f"{ARTIFACT_PREFIX}{key}.arrow", []
+        path = os.path.join(cache_dir, artifact)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            ends = stream_artifact(data_dir, path)
+        except (OSError, pa.ArrowException): ends = None
+        if ends is None:
+            # 无数据或缓存目录不可写：退化为内存中全量构建
+            raw, ends = etl.read_sources(data_dir)
+            if raw.empty: return raw
+            df = _normalize(etl.process(raw))
+            try: write_artifact(df, path)
+            except (OSError, pa.ArrowException): pass
+        else: df = read_artifact(path)
+        cursors, rows, mode = _cursors(data_dir, ends, df), len(df), 'full'
+        df = _select(df, columns)
+    try:
+        _write_manifest(cache_dir, {'key': key, 'artifact': artifact, 'segments': segments, 'etl_version': etl.ETL_VERSION, 'rules': RULES_DIGEST,
+                                    'registry': etl.SOURCES_DIGEST, 'mode': mode, 'built_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'rows': rows,
+                                    'sources': fp, 'cursors': cursors})
+        _prune(cache_dir, {artifact, *segments})
+    except OSError: pass
+    df.attrs['data_version'] = key
+    return df
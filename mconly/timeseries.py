@@ -0,0 +1,140 @@
+"""按日 / 周 / 月预分桶的时间序列引擎。
+
+每个数据版本把 Offer 按 (Company, Role, Region_Group, Role_Group, 周期起点) 分桶，桶内只存条数与
+各指标的和 / 非空数 (Role_Group 由 Role 决定，不增加桶数)。趋势查询先按全局筛选在桶上取子集，
+再按周期 (及可选的 Company / Role_Group 拆分) 合并 —— 代价与桶数相关，与行数无关：
+
+* 重采样：任意频率的条数与均值；周 / 月的中位数 / P25 / P75 按 (筛选组合 × 周期) 预计算 (``QuantileIndex``)，
+  与立方体一样含 'All' 上卷，查询时直接查表；
+* 时间窗滚动 (如 ``'28D'``)：在日桶上按时间而非条数滚动求和，再由和 / 非空数得到滚动均值；
+* 累积招聘速度：周期条数的累加 (按拆分列分别累加)。
+
+各频率的桶与分位数表在构建索引时 (每个数据版本一次) 一并建好，索引只保留这些小表。
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from mconly.quantiles import ALL, QuantileIndex
+
+FILTER_DIMS = ['Company', 'Role', 'Region_Group']
+GROUP_COLUMNS = ['Role_Group']
+MEASURES = {'Final_Comp': 'Comp', 'YOE_Clean': 'YOE'}
+# 预计算分位数的频率；日频只提供条数 / 均值 / 滚动
+QUANTILE_FREQS = ('W', 'M')
+FREQS = ('D',) + QUANTILE_FREQS
+
+
+def period_start(dates, freq):
+    """各日期所在周期 (日 / 周一起始的周 / 月) 的起点。"""
+    if freq == 'D': return dates.dt.floor('D')
+    return dates.dt.to_period(freq).dt.start_time
+
+
+class TimeSeriesIndex:
+    def __init__(self, df, dims=FILTER_DIMS, measures=MEASURES, freqs=FREQS):
+        self.dims = [d for d in dims if d in df.columns]
+        self.keys = self.dims + [c for c in GROUP_COLUMNS if c in df.columns]
+        self.measures = {m: name for m, name in measures.items() if m in df.columns}
+        # 各频率的桶与分位数表在构建时一次建好，只从窄投影 (分桶键 + 指标 + 日期) 计算且不持有 master：
+        # 索引进入结果缓存前即已完整，按实际占用计量，之后不再增长
+        df = df[self.keys + list(self.measures) + ['Date_Clean']]
+        self._buckets, self._quantiles = {}, {}
+        for freq in freqs:
+            periodic = df.assign(Period=period_start(df['Date_Clean'], freq)).dropna(subset=['Period'])
+            self._buckets[freq] = self._bucket(periodic)
+            if freq in QUANTILE_FREQS: self._quantiles[freq] = self._quantile_table(periodic)
+
+    def _bucket(self, df):
+        agg = {'n': ('Period', 'size')}
+        for m, name in self.measures.items():
+            agg[f'{name}_sum'] = (m, 'sum')
+            agg[f'{name}_n'] = (m, 'count')
+        return df.groupby(self.keys + ['Period'], observed=True).agg(**agg).reset_index()
+
+    def _quantile_table(self, df):
+        qi = QuantileIndex(df, self.dims + ['Period'], ['Final_Comp'])
+        frames = [qi.grouping(grouped + ('Period',)) for r in range(len(self.dims) + 1)
+                  for grouped in itertools.combinations(self.dims, r)]
+        return pd.concat(frames)['Final_Comp'].sort_index()
+
+    def buckets(self, freq):
+        """``freq`` 频率的全部非空桶：分桶键、Period、n 以及各指标的 ``<名>_sum`` / ``<名>_n``。"""
+        return self._buckets[freq]
+
+    def quantiles(self, freq):
+        """(筛选组合含 'All' 上卷 × 周期) 的 Final_Comp 分位数表。"""
+        return self._quantiles[freq]
+
+    def _select(self, buckets, filters):
+        mask = np.ones(len(buckets), dtype=bool)
+        for d, v in zip(self.dims, filters):
+            if v != ALL: mask &= (buckets[d] == v).to_numpy()
+        return buckets[mask]
+
+    def _percentiles(self, freq, filters):
+        try:
+            q = self.quantiles(freq).xs(tuple(filters), level=self.dims)
+        except KeyError:
+            return pd.DataFrame(columns=['P25', 'P50', 'P75'], index=pd.DatetimeIndex([], name='Period'))
+        return q[['p25', 'median', 'p75']].set_axis(['P25', 'P50', 'P75'], axis=1)
+
+    def series(self, filters, freq='M', by=None, top=None, window=None):
+        """筛选 ``filters`` (与 ``FILTER_DIMS`` 对齐) 下按 ``freq`` 重采样的序列。
+
+        列：Period、[by]、n、Cum_n (累积条数) 与各指标均值 (``Comp_Mean`` / ``YOE_Mean``)；
+        不拆分且 ``freq`` 为周 / 月时附带 P25 / P50 / P75；``top`` 只保留条数最多的 N 个拆分值 (其余并为 'Other')；
+        ``window`` (如 '28D') 附带按时间窗滚动的 ``Roll_n`` 与各指标 ``Roll_<名>``。
+        """
+        b = self._select(self.buckets(freq), filters)
+        keys = ['Period']
+        if by is not None:
+            group = b[by].astype(object)
+            if top is not None:
+                keep = b.groupby(group)['n'].sum().nlargest(top).index
+                group = group.where(group.isin(keep), 'Other')
+            b = b.assign(**{by: group})
+            keys = [by, 'Period']
+        sums = b.groupby(keys, observed=True)[[c for c in b.columns if c == 'n' or c.endswith(('_sum', '_n'))]].sum()
+        # 各列先算成数组，最后一次构造 frame (逐列插入在小结果上反而是主要开销)
+        cols = {'n': sums['n'].to_numpy()}
+        for name in self.measures.values():
+            cols[f'{name}_Mean'] = _mean(sums[f'{name}_sum'], sums[f'{name}_n'])
+        cols['Cum_n'] = (sums['n'].cumsum() if by is None else sums['n'].groupby(level=by).cumsum()).to_numpy()
+        if window is not None:
+            # 按时间窗 (而非条数) 滚动：窗内的和与非空数相加后再求均值
+            if by is None: rolled = sums.rolling(window).sum()
+            else: rolled = sums.reset_index(by).groupby(by)[sums.columns.tolist()].rolling(window).sum()
+            cols['Roll_n'] = rolled['n'].to_numpy()
+            for name in self.measures.values():
+                cols[f'Roll_{name}'] = _mean(rolled[f'{name}_sum'], rolled[f'{name}_n'])
+        if by is None and freq in QUANTILE_FREQS:
+            q = self._percentiles(freq, filters).reindex(sums.index)
+            cols.update({c: q[c].to_numpy() for c in q.columns})
+        return pd.DataFrame(cols, index=sums.index).reset_index()
+
+    def series_each(self, filters, values, freq='M', by=None, top=None, window=None, key='Company'):
+        """``filters`` 中 ``key`` 为 'All' 时 ``key`` 各取值 (如每家公司) 的 ``series`` 结果 {取值: 序列}，供批量导出。
+
+        不拆分或按 ``key`` 本身拆分时只在整个范围上按 ``key`` 合并一次再切分，分位数也一次查表；其余拆分逐值查询。
+        """
+        pos = self.dims.index(key)
+        if by not in (None, key):
+            return {v: self.series(tuple(filters[:pos]) + (v,) + tuple(filters[pos + 1:]), freq, by, top, window) for v in values}
+        table = self.series(filters, freq, by=key, window=window)
+        group = table[key]
+        if by is None:
+            if freq in QUANTILE_FREQS:
+                at = pd.MultiIndex.from_arrays([group if d == key else np.full(len(table), filters[i], dtype=object)
+                                                for i, d in enumerate(self.dims)] + [table['Period']])
+                q = self.quantiles(freq).reindex(at)
+                table = table.assign(P25=q['p25'].to_numpy(), P50=q['median'].to_numpy(), P75=q['p75'].to_numpy())
+            table = table.drop(columns=key)
+        # 单个取值只有一组，top 不改变结果
+        parts = dict(tuple(table.groupby(group, sort=False)))
+        return {v: parts[v].reset_index(drop=True) if v in parts else table.iloc[:0] for v in values}
+
+def _mean(total, count):
+    total, count = np.asarray(total, dtype=float), np.asarray(count, dtype=float)
+    return np.divide(total, count, out=np.full(len(total), np.nan), where=count > 0)
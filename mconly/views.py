@@ -0,0 +1,40 @@
+"""master frame 的零拷贝筛选视图。
+
+master frame 在进程内只保留一份、视为只读。筛选不再先 ``copy()`` 全表：
+每个数据版本为筛选维度预建 值 -> 行位置 的倒排数组，筛选时对位置数组求交集，
+只对命中的子集做一次 ``iloc`` 取行；全部为 'All' 时直接返回 master 本身。
+需要追加列的维度 (如 dim_tiering 的 Tier) 用 ``assign`` 得到新 frame，不对视图或 master 原地赋值，
+因此不依赖 pandas 的写时复制开关 (不修改全局 ``pd.options``)。
+"""
+import numpy as np
+import pandas as pd
+
+ALL = 'All'
+FILTER_DIMS = ['Company', 'Role', 'Region_Group']
+
+
+class FilterIndex:
+    def __init__(self, df, dims=FILTER_DIMS):
+        self.size = len(df)
+        self.postings = {d: {k: np.asarray(v) for k, v in df.groupby(d, observed=True, sort=False).indices.items()}
+                         for d in dims if d in df.columns}
+
+    def _values(self, dim, values):
+        empty = np.empty(0, dtype=np.intp)
+        arrays = [self.postings[dim].get(v, empty) for v in values]
+        return np.sort(np.concatenate(arrays)) if len(arrays) > 1 else (arrays[0] if arrays else empty)
+
+    def positions(self, **selected):
+        """``selected`` 为 维度 -> 取值 (或取值列表)；'All' / 空列表表示不筛选。全部不筛选时返回 None。"""
+        pos = None
+        for dim, value in selected.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            if not values or ALL in values: continue
+            hit = self._values(dim, values)
+            pos = hit if pos is None else np.intersect1d(pos, hit, assume_unique=True)
+        return pos
+
+
+def filtered_view(df, index, **selected):
+    pos = index.positions(**selected)
+    return df if pos is None else df.iloc[pos]